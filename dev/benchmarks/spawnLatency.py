@@ -0,0 +1,73 @@
+"""
+Latency of starting the dummy solvers of contrib/solvers by a shell, by fork and exec, by posix_spawn and by a gated
+posix_spawn, i.e. a spawned /bin/sh which execs the solver once its limits have been applied. A competition gives every
+call a cpu limit, hence it runs gated spawns.
+
+    python3 dev/benchmarks/spawnLatency.py --calls 200 --ballast 0 1024
+
+Reported per mode are the mean time LocalProcess.start() takes, i.e. until the solver has been spawned, and the mean
+wall clock time of a whole call of gaveup-dummy.sh, which answers at once. The ballast (MiB) is memory allocated by
+this python process before, it shows how the cost of fork grows with the size of the parent.
+"""
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).absolute().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from tptp.reasoning.commandTemplate import CommandTemplate
+from tptp.utils.concurrent.localProcess import LocalProcess
+
+SOLVER = ROOT / 'contrib' / 'solvers' / 'gaveup-dummy.sh'
+COMMAND = '{} %s -t %d'.format(SOLVER)
+
+
+MODES = ['shell', 'fork+exec', 'posix_spawn', 'gated spawn']
+
+
+def measure(*, calls:int, mode:str):
+    template = CommandTemplate(COMMAND, shell=mode == 'shell')
+    # fork and exec is the fallback if posix_spawn or limiting a spawned child is not available
+    LocalProcess.POSIX_SPAWN = mode != 'fork+exec'
+    starts = []
+    totals = []
+    for i in range(calls):
+        process = LocalProcess(
+            template.call(source='/dev/null', timeout=60),
+            timeout=60,
+            # as in a competition, a forked child applies the limit before exec, a spawned one is gated
+            cpuLimit=10 ** 6 if mode in ['fork+exec', 'gated spawn'] else None,
+        )
+        begin = time.perf_counter()
+        process.start()
+        started = time.perf_counter()
+        stdout, stderr, returnCode = process.communicate()
+        end = time.perf_counter()
+        assert 'GaveUp' in stdout, stderr
+        starts.append(started - begin)
+        totals.append(end - begin)
+    LocalProcess.POSIX_SPAWN = True
+    return statistics.mean(starts), statistics.mean(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--ballast', type=int, nargs='+', default=[0, 1024])
+    args = parser.parse_args()
+
+    print('{:>8} {:>12} {:>10} {:>10}'.format('ballast', 'mode', 'start ms', 'call ms'))
+    ballast = bytearray()
+    for mib in sorted(args.ballast):
+        # touched, s.t. the pages are actually mapped
+        ballast.extend(b'\1' * ((mib * 1024 * 1024) - len(ballast)))
+        for mode in MODES:
+            start, total = measure(calls=args.calls, mode=mode)
+            print('{:>8} {:>12} {:>10.3f} {:>10.3f}'.format(mib, mode, start * 1000, total * 1000))
+
+
+if __name__ == '__main__':
+    main()
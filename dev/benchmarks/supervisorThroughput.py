@@ -0,0 +1,79 @@
+"""
+Throughput of many short solver calls, watched by one thread per call or by a single ProcessSupervisor.
+
+    python3 dev/benchmarks/supervisorThroughput.py --calls 2000 --parallel 1 8 64 256
+
+For every degree of parallelism both backends run the same calls of a dummy solver. Reported are the calls per second,
+the peak number of threads and the cpu time spent in this python process (parsing output, waking threads, the GIL),
+which does not include the cpu time of the solvers.
+"""
+import argparse
+import resource
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).absolute().parents[2]))
+
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning import ReasoningExecuter
+from tptp.reasoning.localSolver import LocalSolver
+from tptp.utils.concurrent.processSupervisor import ProcessSupervisor
+
+PROBLEM = ProblemWithStatus('P', '/dev/null', None, SZSStatus.THM)
+
+
+def measure(*, calls:int, parallel:int, command:str, supervised:bool):
+    solver = LocalSolver('dummy', command=command)
+    supervisor = ProcessSupervisor() if supervised else None
+    executer = ReasoningExecuter(threads=parallel, supervisor=supervisor)
+    results = []
+    peakThreads = [threading.active_count()]
+
+    def onResult(result):
+        results.append(result)
+        peakThreads[0] = max(peakThreads[0], threading.active_count())
+    executer.addResultCallback(onResult)
+
+    cpuBefore = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.time()
+    for i in range(calls):
+        executer.submit(solver.call(PROBLEM, timeout=60))
+    executer.wait()
+    wc = time.time() - start
+    cpuAfter = resource.getrusage(resource.RUSAGE_SELF)
+    executer.executor.shutdown()
+    if supervisor:
+        supervisor.close()
+
+    solved = sum(1 for r in results if r.szsStatus == SZSStatus.THM)
+    return {
+        'calls/s': calls / wc,
+        'wc': wc,
+        'cpu': (cpuAfter.ru_utime + cpuAfter.ru_stime) - (cpuBefore.ru_utime + cpuBefore.ru_stime),
+        'threads': peakThreads[0],
+        'solved': solved,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=500)
+    parser.add_argument('--parallel', type=int, nargs='+', default=[1, 8, 64])
+    parser.add_argument('--command', default='echo "% SZS status Theorem for %s"',
+        help='the dummy solver, %%s is replaced by the problem',
+    )
+    args = parser.parse_args()
+
+    print('{:>8} {:>10} {:>10} {:>8} {:>8} {:>8} {:>8}'.format('parallel', 'backend', 'calls/s', 'wc', 'cpu', 'threads', 'solved'))
+    for parallel in args.parallel:
+        for backend, supervised in [('threads', False), ('supervisor', True)]:
+            m = measure(calls=args.calls, parallel=parallel, command=args.command, supervised=supervised)
+            print('{:>8} {:>10} {:>10.1f} {:>8.2f} {:>8.2f} {:>8} {:>8}'.format(
+                parallel, backend, m['calls/s'], m['wc'], m['cpu'], m['threads'], m['solved'],
+            ))
+
+
+if __name__ == '__main__':
+    main()
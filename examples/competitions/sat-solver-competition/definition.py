@@ -58,8 +58,22 @@ PROBLEMS = (
     (basePath / 'Unsat8.cnf', 'Unsatisfiable'),
 )
 
+# optional: quarantine a solver, i.e. do not try its remaining problems, once one of these conditions holds
+# a solver definition may override this with its own 'circuit-breaker' entry
+#CIRCUIT_BREAKER = {
+#    'consecutive-errors': 5, # errors in a row, e.g. a missing binary
+#    'consecutive-timeouts': 20, # timeouts in a row
+#    'unsound': 1, # unsound results
+#    'error-rate': 0.5, # ratio of errors ...
+#    'min-calls': 10, # ... after this many calls
+#}
+
 # maximum wall clock time
 WC_TIMEOUT = 60
 
 # maximum cpu time
 CPU_TIMEOUT = 60
+
+# optional: maximum memory of a solver call in MiB, calls exceeding it result in MemoryOut
+# a solver definition may set a lower limit with its own 'memory-limit' entry
+#MEMORY_LIMIT = 1024
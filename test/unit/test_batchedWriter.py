@@ -0,0 +1,97 @@
+import pathlib
+import threading
+
+import pytest
+
+from tptp.utils.concurrent.batchedWriter import BatchedWriter
+
+
+def test_operations_are_applied_in_order(tmp_path):
+    writer = BatchedWriter(fsyncInterval=None)
+    calls = []
+    for i in range(100):
+        writer.append(tmp_path / 'a.log', '{}\n'.format(i))
+    writer.write(tmp_path / 'b.txt', 'replaced')
+    writer.write(tmp_path / 'b.txt', 'content')
+    writer.writeChunks(tmp_path / 'c.bin', iter([b'ab', b'cd']))
+    writer.call(calls.append, 'called')
+    writer.close()
+
+    assert (tmp_path / 'a.log').read_text() == ''.join('{}\n'.format(i) for i in range(100))
+    assert (tmp_path / 'b.txt').read_text() == 'content'
+    assert (tmp_path / 'c.bin').read_bytes() == b'abcd'
+    assert calls == ['called']
+    with pytest.raises(ValueError):
+        writer.append(tmp_path / 'a.log', 'closed')
+
+class _CountingFile:
+    """
+    An appended file counting how often it is flushed.
+    """
+    def __init__(self, f):
+        self._f = f
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        self._f.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+def test_pending_operations_are_applied_as_one_batch(tmp_path, monkeypatch):
+    opened = []
+    pathOpen = pathlib.Path.open
+    def countingOpen(path, mode='r', *args, **kwargs):
+        f = pathOpen(path, mode, *args, **kwargs)
+        if mode == 'a':
+            f = _CountingFile(f)
+            opened.append(f)
+        return f
+    monkeypatch.setattr(pathlib.Path, 'open', countingOpen)
+
+    writer = BatchedWriter(fsyncInterval=None)
+    started, blocked = threading.Event(), threading.Event()
+    writer.call(lambda: started.set() or blocked.wait())
+    started.wait()
+    # pending while the writer is busy
+    for i in range(10):
+        writer.append(tmp_path / 'a.log', '{}\n'.format(i))
+    blocked.set()
+    writer.flush()
+    writer.close()
+    assert (tmp_path / 'a.log').read_text() == ''.join('{}\n'.format(i) for i in range(10))
+    # all appends have been one batch, flushed once
+    assert [f.flushes for f in opened] == [1]
+
+def test_flush_waits_for_appended_files(tmp_path):
+    writer = BatchedWriter(fsyncInterval=None)
+    writer.append(tmp_path / 'a.log', 'line\n')
+    writer.flush()
+    # the file is still open on the writer thread, but its content is visible
+    assert (tmp_path / 'a.log').read_text() == 'line\n'
+    writer.append(tmp_path / 'a.log', 'more\n')
+    writer.close()
+    assert (tmp_path / 'a.log').read_text() == 'line\nmore\n'
+    writer.close()
+
+def test_a_failed_operation_does_not_skip_its_batch(tmp_path):
+    writer = BatchedWriter(fsyncInterval=0)
+    blocked = threading.Event()
+    writer.call(blocked.wait)
+    writer.append(tmp_path / 'before.log', 'before\n')
+    writer.write(tmp_path / 'missing' / 'file.txt', 'fails')
+    writer.append(tmp_path / 'after.log', 'after\n')
+    blocked.set()
+    with pytest.raises(FileNotFoundError):
+        writer.flush()
+    assert (tmp_path / 'before.log').read_text() == 'before\n'
+    assert (tmp_path / 'after.log').read_text() == 'after\n'
+
+    # the writer keeps running, the next error is raised by close
+    writer.call(int, 'x')
+    writer.append(tmp_path / 'after.log', 'closed\n')
+    with pytest.raises(ValueError):
+        writer.close()
+    assert not writer._thread.is_alive()
+    assert (tmp_path / 'after.log').read_text() == 'after\nclosed\n'
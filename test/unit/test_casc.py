@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from tptp.competition.casc import CASC
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning.localSolver import LocalSolver
+
+
+def _problems(tmp_path, delays):
+    """
+    Problems whose content is the seconds the solvers sleep on them.
+    """
+    problems = []
+    for i, delay in enumerate(delays):
+        source = tmp_path / 'P{}.p'.format(i)
+        source.write_text(str(delay))
+        problems.append(ProblemWithStatus(source.name, source, None, SZSStatus.THM))
+    return problems
+
+def _solvers():
+    return [LocalSolver(name, command='sleep $(cat %s); echo "% SZS status Theorem"') for name in ['a', 'b']]
+
+def _rows(outputDir):
+    lines = (outputDir / 'results.csv').read_text().splitlines()
+    return [l.split(', ') for l in lines[1:]]
+
+def test_parallel_rows_in_order_of_completion(tmp_path):
+    outputDir = tmp_path / 'output'
+    outputDir.mkdir()
+    problems = _problems(tmp_path, [1.5, 0, 0, 0])
+    casc = CASC('parallel', solvers=_solvers(), problems=problems, wcLimit=30, cpuLimit=30, outputDir=outputDir, parallelism=4, silent=True)
+    casc.run()
+
+    rows = _rows(outputDir)
+    # one row per problem, the slow problem is completed last although it has been started first
+    assert sorted(r[0] for r in rows) == sorted(p.name for p in problems)
+    assert rows[-1][0] == 'P0.p'
+    assert all(r[2:4] == ['Theorem', 'Theorem'] for r in rows)
+    # the finished calls are the history of the forecast, not half of the timeout
+    assert casc.forecaster().callEstimate(casc._solvers[0], problems[1])[0] < 1
+
+def test_parallelism_below_one_is_rejected(tmp_path):
+    for parallelism in [0, -1]:
+        with pytest.raises(ValueError):
+            CASC('parallel', solvers=_solvers(), problems=_problems(tmp_path, [0]), wcLimit=30, cpuLimit=30, parallelism=parallelism)
+
+def test_spilled_output_is_written_completely_and_released(tmp_path):
+    outputDir = tmp_path / 'output'
+    outputDir.mkdir()
+    solver = LocalSolver('verbose', command='seq 100000; echo "% SZS status Theorem" # %s')
+    casc = CASC('spill', solvers=[solver], problems=_problems(tmp_path, [0, 0, 0]), wcLimit=30, cpuLimit=30, outputDir=outputDir, parallelism=2, silent=True, captureLimit=1024, spillOutput=True)
+    casc.run()
+
+    expected = ''.join('{}\n'.format(i) for i in range(1, 100001)) + '% SZS status Theorem\n\n'
+    for p in ['P0.p', 'P1.p', 'P2.p']:
+        assert (outputDir / 'verbose-{}.stdout'.format(p)).read_text() == expected
+    assert all(r.stdoutCapture.spillPath is None for r in casc.results())
+    assert not [fd for fd in os.listdir('/proc/self/fd') if 'tptp-output-' in os.path.realpath('/proc/self/fd/' + fd)]
+
+def test_resume_writes_rows_of_restored_problems(tmp_path):
+    outputDir = tmp_path / 'output'
+    outputDir.mkdir()
+    problems = _problems(tmp_path, [0, 0, 0])
+    competition = lambda **kwargs: CASC('resume', solvers=_solvers(), problems=problems, wcLimit=30, cpuLimit=30, outputDir=outputDir, journal=outputDir / 'journal.jsonl', silent=True, **kwargs)
+    competition().run()
+    # a crash after the journal but before the csv has been synced, the last row is torn
+    results = outputDir / 'results.csv'
+    lines = results.read_text().splitlines(True)
+    results.write_text(lines[0] + lines[1] + lines[2][:5])
+
+    resumed = competition(resume=True)
+    resumed.run()
+    rows = _rows(outputDir)
+    assert sorted(r[0] for r in rows) == ['P0.p', 'P1.p', 'P2.p']
+    assert len(resumed.results()) == 6
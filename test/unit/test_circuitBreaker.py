@@ -0,0 +1,61 @@
+from tptp.competition.casc import CASC
+from tptp.competition.circuitBreaker import CircuitBreaker, SkippedSolverCall, SkippedSolverResult
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning import SolverResult
+from tptp.reasoning.localSolver import LocalSolver
+
+
+SOLVER = LocalSolver('solver', command='solver %s')
+PROBLEM = ProblemWithStatus('P.p', None, '', SZSStatus.THM)
+
+def _record(breaker, statuses):
+    """
+    The statuses after which the breaker tripped.
+    """
+    tripped = []
+    for szs in statuses:
+        if breaker.record(SolverResult(SkippedSolverCall(PROBLEM, solver=SOLVER, timeout=1), szs, 0.0, 0.0)):
+            tripped.append(szs)
+    return tripped
+
+def test_consecutive_errors_trip():
+    breaker = CircuitBreaker(consecutiveErrors=3)
+    # a success resets the errors in a row
+    assert _record(breaker, [SZSStatus.ERR, SZSStatus.OSE, SZSStatus.THM, SZSStatus.ERR, SZSStatus.ERR]) == []
+    assert not breaker.tripped
+    assert _record(breaker, [SZSStatus.OSE, SZSStatus.ERR]) == [SZSStatus.OSE]
+    assert breaker.tripped
+    assert breaker.reason == '3 consecutive errors'
+
+def test_error_rate_trips_after_min_calls():
+    breaker = CircuitBreaker(errorRate=0.5, minCalls=4)
+    # more than half of the calls are errors, but not enough calls have been made
+    assert _record(breaker, [SZSStatus.ERR, SZSStatus.ERR, SZSStatus.THM]) == []
+    # 2 of 4 is not more than half
+    assert _record(breaker, [SZSStatus.THM]) == []
+    assert _record(breaker, [SZSStatus.ERR]) == [SZSStatus.ERR]
+    assert breaker.reason == '3 errors in 5 calls'
+
+def test_conditions_which_are_not_configured_never_trip():
+    breaker = CircuitBreaker()
+    assert _record(breaker, [SZSStatus.ERR] * 20 + [SZSStatus.TMO] * 20) == []
+
+def test_quarantined_solvers_skip_their_remaining_calls(tmp_path):
+    problems = []
+    for i in range(5):
+        source = tmp_path / 'P{}.p'.format(i)
+        source.write_text('')
+        problems.append(ProblemWithStatus(source.name, source, None, SZSStatus.THM))
+    broken = LocalSolver('broken', command='/nonexistent/solver %s')
+    working = LocalSolver('working', command='echo "% SZS status Theorem" # %s')
+    casc = CASC('quarantine', solvers=[broken, working], problems=problems, wcLimit=30, cpuLimit=30, silent=True, circuitBreakers={
+        broken: CircuitBreaker(consecutiveErrors=2),
+    })
+    casc.run()
+
+    results = {(r.call.solver.name, r.call.problem.name): r for r in casc.results()}
+    assert len(results) == 10
+    assert [results['broken', p.name].szsStatus for p in problems[:2]] == [SZSStatus.OSE, SZSStatus.OSE]
+    assert all(isinstance(results['broken', p.name], SkippedSolverResult) for p in problems[2:])
+    assert all(results['broken', p.name].szsStatus == SZSStatus.NotTried for p in problems[2:])
+    assert all(results['working', p.name].szsStatus == SZSStatus.THM for p in problems)
@@ -0,0 +1,18 @@
+import pytest
+
+from tptp.reasoning.commandTemplate import CommandTemplate
+
+
+def test_placeholders_are_filled_in_one_pass():
+    template = CommandTemplate('cvc4 --tlimit=%md -t %d %s')
+    assert not template.shell
+    assert template.argv(source='/problems/a %d.p', timeout=2.5) == ['cvc4', '--tlimit=2500', '-t', '2', '/problems/a %d.p']
+    assert template.format(source='P.p', timeout=3) == 'cvc4 --tlimit=3000 -t 3 P.p'
+
+def test_shell_syntax_requires_a_shell():
+    template = CommandTemplate('picosat %s | tail -1')
+    assert template.shell
+    assert template.call(source='P.p', timeout=1) == 'picosat P.p | tail -1'
+    assert CommandTemplate('leo3 %s -t %d', shell=True).call(source='P.p', timeout=1) == 'leo3 P.p -t 1'
+    with pytest.raises(ValueError):
+        CommandTemplate('picosat %s | tail -1', shell=False)
@@ -0,0 +1,17 @@
+import pytest
+
+from tptp.utils.concurrent.coreAllocator import CoreAllocator
+
+
+def test_disjoint_slots():
+    allocator = CoreAllocator(2, cpus={0, 1, 2, 3})
+    a = allocator.acquire()
+    b = allocator.acquire()
+    assert len(a) == len(b) == 2
+    assert not a & b
+    allocator.release(a)
+    assert allocator.acquire() == a
+
+def test_too_few_cpus():
+    with pytest.raises(ValueError):
+        CoreAllocator(3, coresPerSlot=2, cpus={0, 1, 2, 3})
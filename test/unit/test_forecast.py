@@ -0,0 +1,52 @@
+from tptp.competition.forecast import Forecaster, formatDuration
+from tptp.competition.schedulingPolicy import RuntimeHistory
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning.localSolver import LocalSolver
+
+
+LEO = LocalSolver('leo3', command=None)
+E = LocalSolver('e', command=None)
+P1 = ProblemWithStatus('P1', None, None, SZSStatus.THM)
+P2 = ProblemWithStatus('P2', None, None, SZSStatus.THM)
+
+def test_forecast_known_runtimes():
+    history = RuntimeHistory()
+    history.add('leo3', 'P1', 10.0, 40.0)
+    history.add('leo3', 'P2', 30.0, 120.0)
+    forecast = Forecaster(history, timeout=60, parallelism=2).forecast([(P1, LEO), (P2, LEO)])
+    assert forecast.eta == 30.0
+    assert forecast.lower == forecast.upper == 30.0
+    assert forecast.worstCase == 60.0
+    assert forecast.wc == 40.0
+    assert forecast.cpu == 160.0
+
+def test_forecast_unknown_solver():
+    forecast = Forecaster(RuntimeHistory(), timeout=60, parallelism=1).forecast([(P1, E), (P2, E)])
+    assert forecast.eta == 60.0
+    assert 0 < forecast.lower < forecast.eta < forecast.upper <= forecast.worstCase == 120.0
+
+def test_call_estimate_of_running_call():
+    history = RuntimeHistory()
+    history.add('e', 'P1', 10.0)
+    history.add('e', 'P2', 50.0)
+    forecaster = Forecaster(history, timeout=60)
+    assert forecaster.callEstimate(E, P1, running=20.0) == (30.0, 0.0)
+
+def test_queued_calls_share_the_estimate_of_their_solver():
+    history = RuntimeHistory()
+    history.add('e', 'P1', 10.0, 20.0)
+    history.add('e', 'P2', 30.0, 60.0)
+    forecast = Forecaster(history, timeout=60).forecast([(P1, E), (P1, LEO), (P2, LEO)])
+    assert forecast.wc == 10.0 + 30.0 + 30.0
+    assert forecast.cpu == 20.0 + 30.0 + 30.0
+    # added entries are taken into account by the next forecast
+    history.add('leo3', 'P1', 5.0, 5.0)
+    history.add('leo3', 'P3', 15.0, 30.0)
+    forecast = Forecaster(history, timeout=60).forecast([(P1, LEO), (P2, LEO)])
+    assert forecast.wc == 5.0 + 10.0
+    assert forecast.cpu == 5.0 * 1.5 + 10.0 * 1.5
+
+def test_format_duration():
+    assert formatDuration(42) == '42s'
+    assert formatDuration(125) == '2m05s'
+    assert formatDuration(7260) == '2h01m'
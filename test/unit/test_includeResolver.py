@@ -0,0 +1,84 @@
+from concurrent import futures
+
+import pytest
+
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.parser.includeResolver import AxiomCache, IncludeError, IncludeResolver
+
+
+def test_expand_includes(tmp_path):
+    (tmp_path / 'Axioms').mkdir()
+    (tmp_path / 'Problems' / 'SET').mkdir(parents=True)
+    (tmp_path / 'Axioms' / 'SET000+0.ax').write_text(
+        "% fof(commented, axiom, x).\nfof(a1, axiom, p('). quoted')).\nfof(a2, axiom, q).\ninclude('Axioms/SET000+1.ax').\n"
+    )
+    (tmp_path / 'Axioms' / 'SET000+1.ax').write_text('fof(b1, axiom, r).\n')
+    source = tmp_path / 'Problems' / 'SET' / 'SET001+1.p'
+    source.write_text("include('Axioms/SET000+0.ax').\ninclude('Axioms/SET000+0.ax', [a2, b1]).\nfof(c, conjecture, q).\n")
+
+    resolver = IncludeResolver(cache=AxiomCache())
+    for i in range(3):
+        expanded = resolver.expand(ProblemWithStatus('SET001+1.p', source, None, SZSStatus.THM))
+    assert expanded.problem() == (
+        "fof(a1, axiom, p('). quoted')).\nfof(a2, axiom, q).\nfof(b1, axiom, r).\n\n"
+        "fof(a2, axiom, q).\nfof(b1, axiom, r).\n\nfof(c, conjecture, q).\n"
+    )
+    assert expanded.szsStatus == SZSStatus.THM
+    # every file is parsed once
+    assert resolver.cache.misses == 2
+
+    source.write_text("include('Axioms/Missing.ax').\n")
+    with pytest.raises(IncludeError):
+        resolver.expand(ProblemWithStatus('SET001+1.p', source, None, SZSStatus.THM))
+    kept = IncludeResolver(cache=AxiomCache(), keepUnresolved=True)
+    assert kept.expand(ProblemWithStatus('SET001+1.p', source, None, SZSStatus.THM)).problem() == "include('Axioms/Missing.ax').\n"
+
+def test_changed_files_replace_their_previous_version(tmp_path):
+    axioms = tmp_path / 'AX001+0.ax'
+    axioms.write_text('fof(a1, axiom, p).\n')
+    cache = AxiomCache()
+    resolver = IncludeResolver(cache=cache)
+    assert cache.get(axioms, resolver).text == 'fof(a1, axiom, p).\n'
+    axioms.write_text('fof(a1, axiom, p).\nfof(a2, axiom, q).\n')
+    assert cache.get(axioms, resolver).text == 'fof(a1, axiom, p).\nfof(a2, axiom, q).\n'
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (0, 2)
+
+def test_concurrent_loads_share_one_file(tmp_path):
+    axioms = tmp_path / 'AX001+0.ax'
+    axioms.write_text(''.join('fof(a{}, axiom, p{}).\n'.format(i, i) for i in range(1000)))
+    cache = AxiomCache()
+    with futures.ThreadPoolExecutor(max_workers=8) as executor:
+        loaded = list(executor.map(lambda _: cache.get(axioms, IncludeResolver(cache=cache)), range(32)))
+    assert all(l is loaded[0] for l in loaded)
+    assert len(cache) == 1
+
+def test_changed_nested_includes_are_expanded_again(tmp_path):
+    (tmp_path / 'Axioms').mkdir()
+    (tmp_path / 'Axioms' / 'A.ax').write_text("include('Axioms/B.ax').\n")
+    (tmp_path / 'Axioms' / 'B.ax').write_text('fof(x, axiom, old).\n')
+    resolver = IncludeResolver(root=tmp_path, cache=AxiomCache())
+    text = "include('Axioms/A.ax').\n"
+    assert resolver.expandText(text) == 'fof(x, axiom, old).\n\n'
+    (tmp_path / 'Axioms' / 'B.ax').write_text('fof(x, axiom, newer).\n')
+    assert resolver.expandText(text) == 'fof(x, axiom, newer).\n\n'
+
+def test_nested_includes_behave_like_top_level_ones(tmp_path):
+    (tmp_path / 'Axioms').mkdir()
+    (tmp_path / 'Axioms' / 'A.ax').write_text("include('Axioms/Missing.ax').\nfof(a, axiom, p).\n")
+    (tmp_path / 'Axioms' / 'B.ax').write_text("include('Axioms/C.ax', [c, missing]).\n")
+    (tmp_path / 'Axioms' / 'C.ax').write_text('fof(c, axiom, q).\n')
+    (tmp_path / 'Axioms' / 'D.ax').write_text("include('Axioms/D.ax').\n")
+    cache = AxiomCache()
+    kept = IncludeResolver(root=tmp_path, cache=cache, keepUnresolved=True)
+    assert kept.expandText("include('Axioms/A.ax').\n") == "include('Axioms/Missing.ax').\nfof(a, axiom, p).\n\n"
+    # the cached file still fails for a resolver which does not keep unresolved includes
+    with pytest.raises(IncludeError):
+        IncludeResolver(root=tmp_path, cache=cache).expandText("include('Axioms/A.ax').\n")
+    # unknown names of a selection fail at every level
+    with pytest.raises(IncludeError):
+        kept.expandText("include('Axioms/C.ax', [c, missing]).\n")
+    with pytest.raises(IncludeError):
+        kept.expandText("include('Axioms/B.ax').\n")
+    with pytest.raises(IncludeError):
+        kept.expandText("include('Axioms/D.ax').\n")
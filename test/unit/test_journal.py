@@ -0,0 +1,43 @@
+from tptp.core import SZSStatus
+from tptp.competition.journal import CompetitionJournal, JournalEntry
+
+
+def _entry(problem, szs):
+    return JournalEntry(
+        solverName='leo3',
+        solverVersion='1.4',
+        problemName=problem,
+        problemSource='/problems/' + problem,
+        timeout=60,
+        szs=szs,
+        wc=1.5,
+        cpu=None,
+        returnCode=0,
+        finished=0.0,
+    )
+
+def test_roundtrip(tmp_path):
+    journal = CompetitionJournal(tmp_path / 'journal.jsonl')
+    journal.appendEntry(_entry('SYN001+1.p', SZSStatus.THM))
+    journal.appendEntry(_entry('SYN002+1.p', SZSStatus.TMO))
+    journal.close()
+
+    entries = CompetitionJournal(tmp_path / 'journal.jsonl').entryDict()
+    assert len(entries) == 2
+    entry = entries[('leo3', '1.4', '/problems/SYN002+1.p', 60.0)]
+    assert entry.szsStatus == SZSStatus.Timeout
+    assert entry.wc == 1.5
+
+def test_torn_write_is_dropped(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = CompetitionJournal(path)
+    journal.appendEntry(_entry('SYN001+1.p', SZSStatus.THM))
+    journal.close()
+    with path.open('ab') as f:
+        f.write(b'{"solver": "le')
+
+    journal = CompetitionJournal(path)
+    assert len(journal.entries()) == 1
+    journal.appendEntry(_entry('SYN002+1.p', SZSStatus.CSA))
+    journal.close()
+    assert list(map(lambda e: e.problemName, journal.entries())) == ['SYN001+1.p', 'SYN002+1.p']
@@ -0,0 +1,30 @@
+from tptp.benchmark.leaderboard import Leaderboard
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning import SolverResult
+from tptp.reasoning.localSolver import LocalSolver, LocalSolverCall
+
+
+LEO = LocalSolver('leo3', command=None)
+E = LocalSolver('e', command=None)
+P1 = ProblemWithStatus('P1', None, None, SZSStatus.THM)
+P2 = ProblemWithStatus('P2', None, None, SZSStatus.THM)
+
+def _result(solver, problem, szs, wc=1.0):
+    return SolverResult(LocalSolverCall(problem, solver=solver, timeout=60), szs, None, wc)
+
+def test_incremental_standings():
+    leaderboard = Leaderboard([LEO, E])
+    leaderboard.add(_result(LEO, P1, SZSStatus.THM, wc=2.0))
+    assert leaderboard.standing(LEO).unique == 1
+
+    leaderboard.add(_result(E, P1, SZSStatus.THM))
+    assert leaderboard.standing(LEO).unique == 0
+    assert leaderboard.standing(E).unique == 0
+
+    leaderboard.add(_result(E, P2, SZSStatus.CSA))
+    leaderboard.add(_result(LEO, P2, SZSStatus.TMO))
+    assert leaderboard.standing(E).isUnsound
+    assert not leaderboard.standing(LEO).isUnsound
+    assert leaderboard.standing(LEO).solved == 1
+    assert leaderboard.standing(LEO).attempted == 2
+    assert leaderboard.standing(LEO).correctTime == 2.0
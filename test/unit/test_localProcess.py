@@ -0,0 +1,89 @@
+import os
+import signal
+import subprocess
+import time
+
+from tptp.utils.concurrent import resourceLimits
+from tptp.utils.concurrent.coreAllocator import CoreAllocator
+from tptp.utils.concurrent.localProcess import LocalProcess, _SpawnedProcess
+
+
+def test_resource_usage_of_reaped_process():
+    process = LocalProcess('python3 -c "x = bytearray(64 * 1024 * 1024); sum(range(10 ** 6))"', timeout=30)
+    assert process.resourceUsage() is None
+    stdout, stderr, returnCode = process.run()
+    assert returnCode == 0
+    usage = process.resourceUsage()
+    assert usage.cpu == usage.cpuUser + usage.cpuSystem > 0
+    assert usage.maxRss >= 64 * 1024
+    assert usage.voluntaryContextSwitches >= 0
+
+def test_memory_limit():
+    process = LocalProcess('python3 -c "x = bytearray(512 * 1024 * 1024)"', timeout=30, memoryLimit=128 * 1024 * 1024)
+    stdout, stderr, returnCode = process.run()
+    assert returnCode != 0
+    assert 'MemoryError' in stderr or process.isMemoryOut()
+
+def test_cpu_limit_is_distinct_from_wall_clock_limit():
+    process = LocalProcess('python3 -c "while True: pass"', timeout=30, cpuLimit=1)
+    process.run()
+    assert process.isTimeout()
+    assert process.exceededLimit() == LocalProcess.CPU_LIMIT
+
+    process = LocalProcess('sleep 5', timeout=0.5, cpuLimit=1)
+    process.run()
+    assert process.isTimeout()
+    assert process.exceededLimit() == LocalProcess.WC_LIMIT
+
+def test_limits_of_spawned_process():
+    cpus = sorted(os.sched_getaffinity(0))
+    process = LocalProcess(['python3', '-c', 'import os, resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0], sorted(os.sched_getaffinity(0)))'],
+        timeout=30,
+        cpuLimit=5,
+        memoryLimit=512 * 1024 * 1024,
+        coreAllocator=CoreAllocator(1, cpus={cpus[0]}),
+    )
+    stdout, stderr, returnCode = process.run()
+    assert isinstance(process._process, _SpawnedProcess)
+    assert (returnCode, stdout) == (0, '5 [{}]\n'.format(cpus[0]))
+
+    process = LocalProcess(['python3', '-c', 'x = bytearray(512 * 1024 * 1024)'], timeout=30, memoryLimit=128 * 1024 * 1024)
+    stdout, stderr, returnCode = process.run()
+    assert returnCode != 0
+    assert 'MemoryError' in stderr or process.isMemoryOut()
+
+    process = LocalProcess(['python3', '-c', 'while True: pass'], timeout=30, cpuLimit=1)
+    process.run()
+    assert isinstance(process._process, _SpawnedProcess)
+    assert process.exceededLimit() == LocalProcess.CPU_LIMIT
+
+def test_limits_of_forked_process(monkeypatch):
+    monkeypatch.setattr(LocalProcess, 'POSIX_SPAWN', False)
+    process = LocalProcess(['python3', '-c', 'import resource; print(resource.getrlimit(resource.RLIMIT_CPU)[0])'], timeout=30, cpuLimit=5)
+    stdout, stderr, returnCode = process.run()
+    assert not isinstance(process._process, _SpawnedProcess)
+    assert (returnCode, stdout) == (0, '5\n')
+
+def test_cpu_time_of_cgroup_and_process_tree(tmp_path):
+    (tmp_path / 'cpu.stat').write_text('usage_usec 2500000\nuser_usec 2000000\nsystem_usec 500000\n')
+    assert resourceLimits.cgroupCpuTime(tmp_path) == 2.5
+    assert resourceLimits.cgroupCpuTime(tmp_path / 'missing') is None
+
+    process = subprocess.Popen(['sh', '-c', 'python3 -c "import time; t = time.process_time(); exec(\'while time.process_time() - t < 0.5: pass\')"; sleep 10'], start_new_session=True)
+    try:
+        deadline = time.time() + 10
+        while resourceLimits.processTreeCpuTime(process.pid) < 0.4 and time.time() < deadline:
+            time.sleep(0.1)
+        assert 0.4 <= resourceLimits.processTreeCpuTime(process.pid) < 5
+    finally:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+
+def test_process_groups_are_scanned_once_per_interval(monkeypatch):
+    scans = []
+    scan = resourceLimits._scanGroupTicks
+    monkeypatch.setattr(resourceLimits, '_scanGroupTicks', lambda: scans.append(1) or scan())
+    monkeypatch.setattr(resourceLimits, '_groupTicks', None)
+    for pgid in range(100):
+        resourceLimits.processGroupCpuTime(pgid)
+    assert len(scans) == 1
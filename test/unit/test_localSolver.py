@@ -0,0 +1,69 @@
+import os
+
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning.localSolver import LocalSolver, SZSAnswerWatcher
+from tptp.reasoning.szsOutputScanner import SZSOutputScanner
+from tptp.utils.concurrent.outputCapture import OutputCapture
+
+
+P = ProblemWithStatus('P', '/dev/null', None, SZSStatus.THM)
+
+def test_answer_watcher_modes():
+    status = SZSAnswerWatcher(SZSAnswerWatcher.STATUS)
+    output = SZSAnswerWatcher(SZSAnswerWatcher.OUTPUT)
+    for chunk, statusAnswered, outputAnswered in [
+        (b'% SZS status The', False, False),
+        (b'orem for P\n% SZS output start\n', True, False),
+        (b'% SZS output end\n', True, True),
+    ]:
+        assert status(chunk) == statusAnswered
+        assert output(chunk) == outputAnswered
+    assert output.status == SZSStatus.THM
+
+def test_answer_watcher_does_not_await_output_without_success():
+    watcher = SZSAnswerWatcher(SZSAnswerWatcher.OUTPUT)
+    assert watcher(b'% SZS status GaveUp for P\n')
+
+def test_early_termination():
+    solver = LocalSolver('lingering', command='echo "% SZS status Theorem"; sleep 10 # %s')
+    result = solver.call(P, timeout=30, earlyTermination=SZSAnswerWatcher.STATUS).run()
+    assert result.szsStatus == SZSStatus.THM
+    assert result.answerWc < result.wc < 5
+
+def test_problem_by_stdin_and_in_memory_file(tmp_path):
+    source = tmp_path / 'P.p'
+    source.write_text('fof(a, axiom, $true).\n')
+    problem = ProblemWithStatus('P', source, None, SZSStatus.THM)
+    for command in ['wc -c %stdin', 'wc -c %fd']:
+        result = LocalSolver('wc', command=command).call(problem, timeout=30).run()
+        assert result.stdout.split()[0] == '22'
+
+def test_szs_output_blocks():
+    command = 'printf "%% SZS status Unknown\\n%% SZS output start CNFRefutation for P\\nc1\\nc2\\n%% SZS output end CNFRefutation\\n%% SZS status Theorem\\n" # %s'
+    first = LocalSolver('first', command=command).call(P, timeout=30).run()
+    last = LocalSolver('last', command=command, statusPolicy=SZSOutputScanner.LAST).call(P, timeout=30).run()
+    assert (first.szsStatus, last.szsStatus) == (SZSStatus.UNK, SZSStatus.THM)
+    assert first.proof.form == 'CNFRefutation' and first.proof.complete
+    assert first.proof.text() == 'c1\nc2\n'
+    assert first.model is None
+
+def test_szs_output_end_after_a_long_line():
+    output = b'% SZS output start Proof\nc1\n' + b'x' * 5000 + b' % SZS output end Proof\n% SZS status Theorem\n'
+    capture = OutputCapture()
+    scanner = SZSOutputScanner()
+    for i in range(0, len(output), 100):
+        capture.write(output[i:i + 100])
+        scanner(output[i:i + 100])
+    block = scanner.blocks[0].withCapture(capture)
+    assert (block.start, block.end) == (25, 28)
+    assert block.text() == 'c1\n'
+    assert scanner.status == SZSStatus.THM
+
+def test_mapped_problems_are_closed(tmp_path):
+    source = tmp_path / 'P.p'
+    source.write_text('fof(a, axiom, $true).\n')
+    problem = ProblemWithStatus('P', source, None, SZSStatus.THM)
+    fds = len(os.listdir('/proc/self/fd'))
+    results = [LocalSolver('wc', command=command).call(problem, timeout=30).run() for command in ['wc -c %stdin', 'wc -c %fd'] * 10]
+    assert all(r.stdout.split()[0] == '22' for r in results)
+    assert len(os.listdir('/proc/self/fd')) <= fds
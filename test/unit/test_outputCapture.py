@@ -0,0 +1,34 @@
+from tptp.utils.concurrent.localProcess import LocalProcess
+from tptp.utils.concurrent.outputCapture import OutputCapture
+
+
+def test_bounded_capture_keeps_head_and_tail():
+    capture = OutputCapture.bounded(10, spill=True)
+    for i in range(100):
+        capture.write(str(i % 10).encode('utf8') * 1000)
+    capture.close()
+    assert capture.size == 100000
+    assert capture.omitted == 100000 - 10
+    assert capture.bytes() == b'00000\n... 99990 bytes omitted ...\n99999'
+    assert capture.spillPath is not None
+    assert capture.readAll() == b''.join(str(i % 10).encode('utf8') * 1000 for i in range(100))
+
+def test_invalid_utf8_output_is_decoded_with_replacements():
+    process = LocalProcess('printf "\\377%% SZS status Theorem\\n"', timeout=30, captureLimit=1024)
+    stdout, stderr, returnCode = process.run()
+    assert returnCode == 0
+    assert stdout == '�% SZS status Theorem\n'
+
+def test_chunks_of_a_spilled_range():
+    capture = OutputCapture(headSize=4, tailSize=4, spill=True)
+    data = bytes(range(200)) * 1000
+    for i in range(0, len(data), 777):
+        capture.write(data[i:i + 777])
+    capture.close()
+    assert b''.join(capture.chunks(2, 150000, size=1000)) == data[2:150000]
+    assert b''.join(capture.chunks()) == data
+    dropped = OutputCapture(headSize=4, tailSize=4)
+    dropped.write(data[:100])
+    dropped.close()
+    assert dropped.isAvailable(0, 4) and dropped.isAvailable(96)
+    assert not dropped.isAvailable(0, 10)
@@ -0,0 +1,24 @@
+from tptp.core import Problem
+from tptp.core.problemContent import ProblemContentCache
+
+
+def test_bounded_text_cache(tmp_path):
+    cache = ProblemContentCache(maxSize=10)
+    a, b = tmp_path / 'a.p', tmp_path / 'b.p'
+    a.write_text('aaaaaa')
+    b.write_text('bbbbbb')
+    assert cache.text(a) == 'aaaaaa' and cache.text(a) == 'aaaaaa'
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.text(b) == 'bbbbbb'
+    # a has been evicted, both do not fit
+    assert (len(cache), cache.size) == (1, 6)
+    b.write_text('bbbbbbb')
+    assert cache.text(b) == 'bbbbbbb'
+
+def test_problem_is_mapped_not_kept(tmp_path):
+    source = tmp_path / 'P.p'
+    source.write_text('fof(a, axiom, $true).\n')
+    problem = Problem('P.p', source, None)
+    assert bytes(problem.problemBytes()) == b'fof(a, axiom, $true).\n'
+    assert problem.problem() == 'fof(a, axiom, $true).\n'
+    assert problem._problem is None
@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from tptp.benchmark.problemIndex import ProblemIndex
+from tptp.core import SZSStatus
+
+SYN001 = Path(__file__).absolute().parents[2] / 'contrib' / 'problems' / 'SYN001+1.p'
+
+
+def test_incremental_update_and_query(tmp_path):
+    library = tmp_path / 'TPTP'
+    (library / 'SYN').mkdir(parents=True)
+    (library / 'SYN' / 'SYN001+1.p').write_text(SYN001.read_text())
+    (library / 'SYN' / 'SYN002-1.p').write_text('% Status   : Satisfiable\n% Rating   : 0.50 v8.0.0, 0.20 v7.0.0\n% SPC      : CNF_SAT_PRP\ncnf(a, axiom, p).\n')
+    # neither can be scored
+    (library / 'SYN' / 'SYN003-1.p').write_text('% Status   : Mystery\ncnf(a, axiom, p).\n')
+    (library / 'SYN' / 'SYN004-1.p').write_text('cnf(a, axiom, p).\n')
+    index = ProblemIndex(tmp_path / 'index.sqlite')
+    assert index.update(library, workers=2) == (4, 0, 0)
+    assert index.update(library) == (0, 4, 0)
+    assert len(index.query()) == 2
+
+    assert [p.name for p in index.query(status=SZSStatus.SUC)] == ['SYN001+1.p', 'SYN002-1.p']
+    problems = index.query(status='Theorem', form='FOF', maxRating=0.3)
+    assert [p.name for p in problems] == ['SYN001+1.p']
+    assert problems[0].szsStatus == SZSStatus.THM and problems[0].domain == 'Syntactic'
+    assert [p.name for p in index.query(spc='CNF_SAT', minRating=0.4)] == ['SYN002-1.p']
+    assert index.metadata(library / 'SYN' / 'SYN002-1.p')['ratings'] == [(0.5, '8.0.0'), (0.2, '7.0.0')]
+
+    (library / 'SYN' / 'SYN001+1.p').unlink()
+    with (library / 'SYN' / 'SYN002-1.p').open('a') as f:
+        f.write('cnf(b, axiom, q).\n')
+    assert index.update(library) == (1, 2, 1)
+    assert len(index) == 3
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning import ReasoningExecuter
+from tptp.reasoning.localSolver import LocalSolver
+from tptp.utils.concurrent.localProcess import LocalProcess
+from tptp.utils.concurrent.processSupervisor import ProcessSupervisor
+
+
+P = ProblemWithStatus('P', '/dev/null', None, SZSStatus.THM)
+
+def test_supervised_processes_keep_their_limits():
+    supervisor = ProcessSupervisor()
+    try:
+        slow = LocalProcess('sleep 10', timeout=0.5)
+        fast = LocalProcess('echo out; echo err >&2', timeout=10)
+        slowResult = slow.runSupervised(supervisor)
+        stdout, stderr, returnCode = fast.runSupervised(supervisor).result()
+        assert (stdout.bytes(), stderr.bytes(), returnCode) == (b'out\n', b'err\n', 0)
+        assert fast.resourceUsage() is not None
+        slowResult.result()
+        assert slow.isTimeout() and slow.exceededLimit() == LocalProcess.WC_LIMIT
+    finally:
+        supervisor.close()
+
+def test_executer_runs_solver_calls_without_threads():
+    supervisor = ProcessSupervisor()
+    solver = LocalSolver('echo', command='sleep 0.5; echo "% SZS status Theorem for %s"')
+    executer = ReasoningExecuter(threads=8, supervisor=supervisor)
+    results = []
+    executer.addResultCallback(results.append)
+    # the threads running work submitted to the executor and how long it takes
+    submit = executer.executor.submit
+    threads = []
+    durations = []
+    def recordingSubmit(function, *args, **kwargs):
+        def recorded():
+            threads.append(threading.get_ident())
+            start = time.monotonic()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                durations.append(time.monotonic() - start)
+        return submit(recorded)
+    executer.executor.submit = recordingSubmit
+    try:
+        for i in range(20):
+            executer.submit(solver.call(P, timeout=10))
+        executer.wait()
+    finally:
+        supervisor.close()
+    assert [r.szsStatus for r in results] == [SZSStatus.THM] * 20
+    assert all(r.call.future.done() for r in results)
+    # the completions are run by the executor, off the loop and off the calling thread, but not the waiting
+    assert len(threads) == 20
+    assert threading.get_ident() not in threads
+    assert max(durations) < 0.4
+
+def _isAlive(pid):
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            return f.read().rsplit(')', 1)[1].split()[0] != 'Z'
+    except FileNotFoundError:
+        return False
+
+def test_failed_supervision_kills_the_process_group():
+    pids = []
+    def watcher(chunk):
+        pids.append(int(chunk.split()[0]))
+        raise ValueError('watcher failed')
+    supervisor = ProcessSupervisor()
+    try:
+        process = LocalProcess('sleep 30 & echo $!; wait', timeout=60, outputWatcher=watcher)
+        with pytest.raises(ValueError):
+            process.runSupervised(supervisor).result(timeout=10)
+        # the supervisor goes on with other processes
+        stdout, stderr, returnCode = LocalProcess('echo out', timeout=10).runSupervised(supervisor).result(timeout=10)
+        assert stdout.bytes() == b'out\n'
+    finally:
+        supervisor.close()
+    deadline = time.time() + 5
+    while _isAlive(pids[0]) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not _isAlive(pids[0])
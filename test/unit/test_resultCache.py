@@ -0,0 +1,63 @@
+import time
+
+from tptp.core import Problem, ProblemWithStatus, SZSStatus
+from tptp.reasoning.resultCache import SolverResultCache, digestProblem
+
+
+def _key(**kwargs):
+    identity = dict(problemDigest='0' * 64, command='solver %s', version='1.0', timeout=10)
+    identity.update(kwargs)
+    return SolverResultCache.key(**identity)
+
+def test_hits_and_misses(tmp_path):
+    cache = SolverResultCache(tmp_path)
+    key = _key()
+    assert cache.get(key) is None
+    cache.put(key, {'szs': 'Theorem'})
+    assert cache.get(key) == {'szs': 'Theorem'}
+    assert cache.get(_key(version='2.0')) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert str(cache) == '1 hits, 2 misses'
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    value = {'stdout': 'x' * 100}
+    # room for two entries
+    cache = SolverResultCache(tmp_path, maxSize=250)
+    keys = [_key(timeout=t) for t in range(3)]
+    cache.put(keys[0], value)
+    time.sleep(0.01)
+    cache.put(keys[1], value)
+    time.sleep(0.01)
+    # the first entry is accessed, the second one is the least recently used
+    assert cache.get(keys[0]) == value
+    time.sleep(0.01)
+    cache.put(keys[2], value)
+    assert cache.get(keys[0]) == value
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[2]) == value
+
+def test_keys_differ_by_everything_affecting_a_result():
+    keys = [
+        _key(),
+        _key(captureLimit=1024),
+        _key(encoding='fof'),
+        _key(statusPolicy='last'),
+        _key(memoryLimit=1024),
+        _key(cpuLimit=10),
+    ]
+    assert len(set(keys)) == len(keys)
+    assert _key(cpuLimit=10) == _key(cpuLimit=10.0)
+
+def test_digest_covers_included_files(tmp_path):
+    (tmp_path / 'Axioms').mkdir()
+    (tmp_path / 'Axioms' / 'A.ax').write_text('fof(a, axiom, old).\n')
+    source = tmp_path / 'P.p'
+    source.write_text("include('Axioms/A.ax').\nfof(c, conjecture, a).\n")
+    problem = ProblemWithStatus('P.p', source, None, SZSStatus.THM)
+    before = digestProblem(problem)
+    assert digestProblem(problem) == before
+    (tmp_path / 'Axioms' / 'A.ax').write_text('fof(a, axiom, newer).\n')
+    assert digestProblem(problem) != before
+    # an encoded copy elsewhere includes the files of the original
+    copy = Problem('P.p', None, source.read_text())
+    assert digestProblem(copy, directory=tmp_path) == digestProblem(problem)
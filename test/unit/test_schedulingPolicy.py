@@ -0,0 +1,37 @@
+from tptp.competition.schedulingPolicy import LongestFirst, RoundRobin, RuntimeHistory, ShortestFirst, predictMakespan
+from tptp.core import ProblemWithStatus, SZSStatus
+from tptp.reasoning.localSolver import LocalSolver
+
+
+LEO = LocalSolver('leo3', command=None)
+E = LocalSolver('e', command=None)
+P1 = ProblemWithStatus('P1', None, None, SZSStatus.THM)
+P2 = ProblemWithStatus('P2', None, None, SZSStatus.THM)
+P3 = ProblemWithStatus('P3', None, None, SZSStatus.THM)
+
+def _history():
+    history = RuntimeHistory()
+    history.add('leo3', 'P1', 10.0)
+    history.add('leo3', 'P2', 300.0)
+    history.add('e', 'P1', 1.0)
+    history.add('e', 'P2', 5.0)
+    return history
+
+def test_estimate_falls_back_to_solver_mean_and_timeout():
+    history = _history()
+    assert history.estimate(LEO, P2, 60) == 60
+    assert history.estimate(E, P3, 60) == 3.0
+    assert history.estimate(LocalSolver('vampire', command=None), P1, 60) == 60
+
+def test_orders():
+    history = _history()
+    estimate = lambda job: history.estimate(job[1], job[0], 300)
+    jobs = [(p, s) for p in [P1, P2, P3] for s in [LEO, E]]
+    assert LongestFirst().order(jobs, estimate)[:2] == [(P2, LEO), (P3, LEO)]
+    assert ShortestFirst().order(jobs, estimate)[:3] == [(P1, E), (P3, E), (P2, E)]
+    assert [s for p, s in RoundRobin().order(jobs, estimate)] == [LEO, E, LEO, E, LEO, E]
+
+def test_predicted_makespan():
+    assert predictMakespan([300, 1, 1, 1, 300], 2) == 303
+    assert predictMakespan([300, 300, 1, 1, 1], 2) == 302
+    assert predictMakespan([], 4) == 0
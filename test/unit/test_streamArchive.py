@@ -0,0 +1,45 @@
+from tptp.utils.streamArchive import StreamArchiveReader, StreamArchiveWriter, indexPath
+
+
+def test_random_access(tmp_path):
+    path = tmp_path / 'streams.tpa'
+    writer = StreamArchiveWriter(path)
+    for i in range(10):
+        writer.add('leo3-SYN00{}+1.p.stdout'.format(i), '% SZS status Theorem\n' * i)
+    writer.add('leo3-SYN001+1.p.stderr', b'\xff invalid utf8')
+    writer.close()
+
+    reader = StreamArchiveReader(path)
+    assert len(reader) == 11
+    assert reader.readText('leo3-SYN003+1.p.stdout') == '% SZS status Theorem\n' * 3
+    assert reader.read('leo3-SYN001+1.p.stderr') == b'\xff invalid utf8'
+
+def test_index_is_rebuilt(tmp_path):
+    path = tmp_path / 'streams.tpa'
+    writer = StreamArchiveWriter(path)
+    writer.add('a', 'first')
+    writer.add('b', 'second')
+    writer.close()
+    indexPath(path).unlink()
+
+    reader = StreamArchiveReader(path)
+    assert reader.names() == ['a', 'b']
+    assert reader.readText('b') == 'second'
+
+def test_torn_record_is_dropped(tmp_path):
+    path = tmp_path / 'streams.tpa'
+    writer = StreamArchiveWriter(path)
+    writer.add('a', 'first')
+    writer.add('b', 'second')
+    writer.close()
+    with path.open('r+b') as f:
+        f.truncate(path.stat().st_size - 3)
+
+    writer = StreamArchiveWriter(path)
+    writer.add('c', 'third')
+    writer.close()
+
+    reader = StreamArchiveReader(path)
+    assert reader.names() == ['a', 'c']
+    assert reader.readText('a') == 'first'
+    assert reader.readText('c') == 'third'
@@ -0,0 +1,26 @@
+import itertools
+
+from tptp.core import SZSStatus
+from tptp.core.szs import CORRECT, NO_SUCCESS, UNSOUND
+
+
+def _isDescendantOf(a, b):
+    # the ontology walked recursively, a is b or a descendant of b
+    return a == b or any(_isDescendantOf(a, c) for c in b._children)
+
+
+def test_closure():
+    for a, b in itertools.product(SZSStatus._statuses, repeat=2):
+        assert a._isDescendantOf(b) == _isDescendantOf(a, b)
+        assert a.isAncestor(b) == _isDescendantOf(b, a)
+        assert a.matches(b) == a._computeMatch(b)
+    assert SZSStatus.THM in SZSStatus.SUC.descendants()
+    assert SZSStatus.NOS in SZSStatus.TMO.ancestors()
+    assert SZSStatus.byCode(SZSStatus.CSA.code) == SZSStatus.CSA
+
+
+def test_matchesAll():
+    assert SZSStatus.matchesAll(
+        [SZSStatus.THM, SZSStatus.CSA.code, SZSStatus.TMO],
+        [SZSStatus.THM, SZSStatus.THM, SZSStatus.THM.code],
+    ) == [CORRECT, UNSOUND, NO_SUCCESS]
@@ -0,0 +1,19 @@
+from tptp.utils.tempFile import ScratchArea
+
+
+def test_scratch_area_shares_and_removes_files(tmp_path):
+    area = ScratchArea(directory=tmp_path, maxSize=10)
+    first = area.acquire('cnf(a).')
+    assert area.acquire('cnf(a).') == first
+    assert first.read_text() == 'cnf(a).' and area.size == 7
+    # beyond the maximum size files go to the temporary directory
+    overflown = area.acquire('cnf(b, axiom).')
+    assert overflown.parent != first.parent and area.size == 7
+
+    area.release(first)
+    assert first.exists()
+    area.release(first)
+    assert not first.exists() and area.size == 0
+
+    area.cleanup()
+    assert not overflown.exists() and len(area) == 0
@@ -0,0 +1,17 @@
+from pathlib import Path
+
+from tptp.core import SZSStatus, TPTPProblem
+
+SYN001 = Path(__file__).absolute().parents[2] / 'contrib' / 'problems' / 'SYN001+1.p'
+
+
+def test_header_of_problem():
+    problem = TPTPProblem.readFromFile(SYN001)
+    assert problem.szsStatus == SZSStatus.THM
+    assert problem._problem is None
+    assert (problem.domain, problem.description, problem.spc) == ('Syntactic', 'Pelletier 2', 'FOF_THM_PRP')
+    assert problem.ratings == [(0.0, '2.1.0')]
+    assert problem.syntax['Number of atoms'] == 2
+    assert problem.header.syntaxDetails['Number of connectives']['<=>'] == '1'
+    assert len(problem.header.refs) == 3
+    assert 'fof(' in problem.problem()
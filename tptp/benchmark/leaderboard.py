@@ -0,0 +1,131 @@
+from typing import Dict, Iterable, List
+
+from ..reasoning import Solver, SolverResult
+
+
+class SolverStanding:
+    """
+    Accumulated results of a single solver.
+    """
+    def __init__(self, solver:Solver):
+        self._solver = solver
+        self._attempted = 0
+        self._solved = 0
+        self._unsound = 0
+        self._unique = 0
+        self._correctTime = 0.0
+
+    def __repr__(self):
+        return '{solver}: {solved}/{attempted} solved in {time}s, {unique} unique, {unsound} unsound'.format(
+            solver=self._solver,
+            solved=self._solved,
+            attempted=self._attempted,
+            time=round(self._correctTime, 4),
+            unique=self._unique,
+            unsound=self._unsound,
+        )
+
+    @property
+    def solver(self) -> Solver:
+        return self._solver
+
+    @property
+    def attempted(self) -> int:
+        """
+        Number of results of the solver.
+        """
+        return self._attempted
+
+    @property
+    def solved(self) -> int:
+        """
+        Number of correct results of the solver.
+        """
+        return self._solved
+
+    @property
+    def unsound(self) -> int:
+        """
+        Number of unsound results of the solver.
+        """
+        return self._unsound
+
+    @property
+    def isUnsound(self) -> bool:
+        return self._unsound > 0
+
+    @property
+    def unique(self) -> int:
+        """
+        Number of problems solved correctly by this solver only.
+        """
+        return self._unique
+
+    @property
+    def correctTime(self) -> float:
+        """
+        Wall clock time of all correct results.
+        """
+        return self._correctTime
+
+
+class Leaderboard:
+    """
+    Aggregates solver results incrementally, adding a result takes constant time.
+    """
+    def __init__(self, solvers:Iterable[Solver]=()):
+        self._standings = {}
+        # solvers which solved a problem correctly, by problem
+        self._solvedBy = {}
+        for s in solvers:
+            self._standing(s)
+
+    @staticmethod
+    def fromResults(results:Iterable[SolverResult]):
+        leaderboard = Leaderboard()
+        for r in results:
+            leaderboard.add(r)
+        return leaderboard
+
+    def _standing(self, solver:Solver) -> SolverStanding:
+        standing = self._standings.get(solver, None)
+        if not standing:
+            standing = SolverStanding(solver)
+            self._standings[solver] = standing
+        return standing
+
+    def add(self, result:SolverResult):
+        solver = result.call.solver
+        standing = self._standing(solver)
+        standing._attempted += 1
+
+        match = result.matches()
+        if match.isUnsound():
+            standing._unsound += 1
+        if not match.isCorrect():
+            return
+
+        standing._solved += 1
+        if result.wc:
+            standing._correctTime += float(result.wc)
+
+        solvedBy = self._solvedBy.setdefault(result.call.problem, set())
+        if solver in solvedBy:
+            return
+        if len(solvedBy) == 0:
+            standing._unique += 1
+        elif len(solvedBy) == 1:
+            self._standings[next(iter(solvedBy))]._unique -= 1
+        solvedBy.add(solver)
+
+    def standing(self, solver:Solver) -> SolverStanding:
+        return self._standings[solver]
+
+    def standings(self) -> Dict[Solver, SolverStanding]:
+        return self._standings
+
+    def solvers(self) -> List[Solver]:
+        """
+        All solvers with at least one result.
+        """
+        return [s for s, standing in self._standings.items() if standing.attempted > 0]
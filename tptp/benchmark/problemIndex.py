@@ -0,0 +1,232 @@
+import hashlib
+import io
+import json
+import os
+import sqlite3
+from concurrent import futures
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+from ..core import SZSStatus, TPTPHeader, TPTPProblem, UnknownSZSStatusError
+
+
+BASE_PATH = Path(
+    os.environ.get('XDG_CACHE_HOME') or
+    os.path.join(os.environ['HOME'], '.cache')
+)
+DEFAULT_INDEX_PATH = BASE_PATH / 'tptp_python_lib' / 'index.sqlite'
+# rows written per transaction while updating
+BATCH_SIZE = 500
+
+def _scanProblem(path:str) -> Dict:
+    """
+    The row of a problem file, run by the workers of ProblemIndex.update().
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    stat = os.stat(path)
+    header = TPTPHeader.parse(io.TextIOWrapper(io.BytesIO(data), encoding='utf8', errors='replace'))
+    status = header.field('Status')
+    spc = header.spc
+    if status:
+        # long names, s.t. statuses given by their short names are found as well
+        status = status.split()[0]
+        try:
+            status = str(SZSStatus.get(status))
+        except UnknownSZSStatusError:
+            pass
+    return {
+        'path': path,
+        'name': os.path.basename(path),
+        'mtime': stat.st_mtime_ns,
+        'size': len(data),
+        # the digest of the file, digestProblem() of the result cache adds the ones of included files
+        'digest': hashlib.sha256(data).hexdigest(),
+        'domain': header.domain,
+        'status': status,
+        'rating': header.rating,
+        'ratings': json.dumps(header.ratings),
+        'spc': spc,
+        'form': spc.split('_')[0] if spc else None,
+        'syntax': json.dumps(header.syntax),
+    }
+
+class ProblemIndex:
+    """
+    A persistent index of the header metadata of the problems of local TPTP libraries, stored in a SQLite database.
+
+    update(root) scans a library in parallel and only reads the files which have been added or whose mtime or size has
+    changed since the last update, query() selects problems by their metadata without touching the files, e.g.
+
+        index.query(status=SZSStatus.THM, form='TF0', minRating=0.3, maxRating=0.8)
+    """
+    COLUMNS = ['path', 'root', 'name', 'mtime', 'size', 'digest', 'domain', 'status', 'rating', 'ratings', 'spc', 'form', 'syntax']
+
+    def __init__(self, path:Path=DEFAULT_INDEX_PATH):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute('''CREATE TABLE IF NOT EXISTS problems (
+                path TEXT PRIMARY KEY,
+                root TEXT NOT NULL,
+                name TEXT NOT NULL,
+                mtime INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                domain TEXT,
+                status TEXT,
+                rating REAL,
+                ratings TEXT,
+                spc TEXT,
+                form TEXT,
+                syntax TEXT
+            )''')
+            db.execute('CREATE INDEX IF NOT EXISTS problemsRoot ON problems (root)')
+            db.execute('CREATE INDEX IF NOT EXISTS problemsStatus ON problems (status, form, rating)')
+            db.execute('CREATE INDEX IF NOT EXISTS problemsName ON problems (name)')
+
+    def __repr__(self):
+        return 'ProblemIndex({})'.format(self._path)
+
+    def __len__(self):
+        with self._connect() as db:
+            return db.execute('SELECT COUNT(*) FROM problems').fetchone()[0]
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(str(self._path))
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def update(self, root:Path, *, workers:int=None) -> Tuple[int, int, int]:
+        """
+        Brings the index of a library up to date: new and changed problem files (*.p) are scanned, problems which do
+        not exist any more are removed.
+        :param workers: processes scanning files, None for one per cpu, 1 to scan in this process
+        :return: the number of scanned, unchanged and removed problems
+        """
+        root = str(Path(root).absolute())
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                if name.endswith('.p'):
+                    path = os.path.join(directory, name)
+                    stat = os.stat(path)
+                    files[path] = (stat.st_mtime_ns, stat.st_size)
+        with self._connect() as db:
+            known = {r[0]: (r[1], r[2]) for r in db.execute('SELECT path, mtime, size FROM problems WHERE root = ?', (root,))}
+        changed = sorted(p for p, s in files.items() if known.get(p) != s)
+        removed = [p for p in known if p not in files]
+
+        if workers == 1 or len(changed) < 2:
+            self._store(root, map(_scanProblem, changed))
+        else:
+            with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                self._store(root, executor.map(_scanProblem, changed, chunksize=64))
+        with self._connect() as db:
+            db.executemany('DELETE FROM problems WHERE path = ?', [(p,) for p in removed])
+        return len(changed), len(files) - len(changed), len(removed)
+
+    def _store(self, root:str, rows:Iterable[Dict]):
+        insert = 'INSERT OR REPLACE INTO problems ({}) VALUES ({})'.format(
+            ', '.join(ProblemIndex.COLUMNS),
+            ', '.join('?' * len(ProblemIndex.COLUMNS)),
+        )
+        batch = []
+        for row in rows:
+            row['root'] = root
+            batch.append(tuple(row[c] for c in ProblemIndex.COLUMNS))
+            if len(batch) >= BATCH_SIZE:
+                with self._connect() as db:
+                    db.executemany(insert, batch)
+                batch = []
+        if batch:
+            with self._connect() as db:
+                db.executemany(insert, batch)
+
+    def query(self, *,
+        status: Union[SZSStatus, str, List]=None,
+        form: Union[str, List[str]]=None,
+        spc: str=None,
+        domain: str=None,
+        minRating: float=None,
+        maxRating: float=None,
+        maxSize: int=None,
+        root: Path=None,
+        limit: int=None,
+    ) -> List[TPTPProblem]:
+        """
+        The problems matching all given criteria, ordered by name. The problems are not read, their headers are read
+        when their metadata is accessed. Problems without a known SZS status are left out, they cannot be scored.
+        :param status: a status or several, which match their descendants in the SZS ontology as well
+        :param form: the form of the specialist problem class, e.g. TF0, FOF or CNF, or several
+        :param spc: a prefix of the specialist problem class, e.g. TF0_THM_EQU
+        :param domain: the domain, e.g. Syntactic
+        :param minRating: the lowest current rating, inclusive
+        :param maxRating: the highest current rating, inclusive
+        :param maxSize: the largest size of a problem file in bytes
+        :param root: only problems of this library
+        """
+        # unknown statuses are stored as they are, see _scanProblem()
+        known = sorted(str(s) for s in SZSStatus._statuses)
+        conditions = ['status IN ({})'.format(', '.join('?' * len(known)))]
+        parameters = list(known)
+        if status is not None:
+            statuses = set()
+            for s in (status if isinstance(status, (list, tuple, set, frozenset)) else [status]):
+                s = SZSStatus.get(s) if isinstance(s, str) else s
+                statuses |= s.descendants()
+            conditions.append('status IN ({})'.format(', '.join('?' * len(statuses))))
+            parameters += sorted(str(s) for s in statuses)
+        if form is not None:
+            forms = [form] if isinstance(form, str) else list(form)
+            conditions.append('form IN ({})'.format(', '.join('?' * len(forms))))
+            parameters += forms
+        if spc is not None:
+            conditions.append("spc LIKE ? ESCAPE '\\'")
+            # _ is a wildcard of LIKE
+            parameters.append(spc.replace('_', '\\_') + '%')
+        if domain is not None:
+            conditions.append('domain = ?')
+            parameters.append(domain)
+        if minRating is not None:
+            conditions.append('rating >= ?')
+            parameters.append(minRating)
+        if maxRating is not None:
+            conditions.append('rating <= ?')
+            parameters.append(maxRating)
+        if maxSize is not None:
+            conditions.append('size <= ?')
+            parameters.append(maxSize)
+        if root is not None:
+            conditions.append('root = ?')
+            parameters.append(str(Path(root).absolute()))
+        sql = 'SELECT path, name, status FROM problems WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY name, path'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            parameters.append(limit)
+        with self._connect() as db:
+            rows = db.execute(sql, parameters).fetchall()
+        return [TPTPProblem(name, Path(path), None, SZSStatus.get(s)) for path, name, s in rows]
+
+    def metadata(self, path:Path) -> Dict:
+        """
+        The indexed metadata of a problem file, None if it is not indexed.
+        """
+        with self._connect() as db:
+            row = db.execute('SELECT {} FROM problems WHERE path = ?'.format(', '.join(ProblemIndex.COLUMNS)), (str(Path(path).absolute()),)).fetchone()
+        if row is None:
+            return None
+        metadata = dict(zip(ProblemIndex.COLUMNS, row))
+        metadata['ratings'] = [tuple(r) for r in json.loads(metadata['ratings'])] if metadata['ratings'] else []
+        metadata['syntax'] = json.loads(metadata['syntax']) if metadata['syntax'] else {}
+        return metadata
@@ -1,17 +1,35 @@
+import collections
 import glob
+import itertools
+import os
 import sys
+import time
 from importlib.machinery import SourceFileLoader
 
-from typing import List, Callable, Iterable
+from typing import Dict, List, Callable, Iterable
 from pathlib import Path
 
 from ..frontend.plots.competitionBarCharts import SolvedPerSolverChart
+from ..benchmark.leaderboard import Leaderboard
+from ..benchmark.problemIndex import ProblemIndex, DEFAULT_INDEX_PATH
 from ..core import SZSStatus
 from .competition import Competition
-from ..reasoning import Solver, SolverResult, loadSolvers
+from .journal import CompetitionJournal, JournalEntry
+from .circuitBreaker import CircuitBreaker, SkippedSolverCall, SkippedSolverResult
+from .schedulingPolicy import Job, SchedulingPolicy, ConfigurationOrder, RuntimeHistory, predictMakespan
+from .forecast import Forecast, Forecaster, formatDuration
+from ..reasoning import Solver, SolverResult, ReasoningExecuter, loadSolvers
+from ..reasoning.resultCache import SolverResultCache
+from ..utils.concurrent.batchedWriter import BatchedWriter
+from ..utils.streamArchive import StreamArchiveWriter
+from ..utils.concurrent.coreAllocator import CoreAllocator
+from ..utils.concurrent.processSupervisor import ProcessSupervisor
 from ..core import TPTPProblem, ProblemWithStatus
 
 class CASC(Competition):
+    # columns of results.csv per solver, following the status of all solvers
+    RESOURCE_COLUMNS = ['wc', 'cpu', 'cpu user', 'cpu sys', 'max rss kib', 'voluntary ctx switches', 'involuntary ctx switches', 'exceeded limit', 'answer wc']
+
     def __init__(self, name: str, *, 
         solvers: List[Solver], 
         problems: List[TPTPProblem], 
@@ -21,15 +39,62 @@ class CASC(Competition):
         silent:bool= False,
         colored: bool= False,
         outputDir: Path=None,
+        parallelism: int=1,
+        journal: Path=None,
+        resume: bool=False,
+        cache: SolverResultCache=None,
+        fsyncInterval: float=5.0,
+        outputArchive: bool=False,
+        circuitBreakers: Dict[Solver, CircuitBreaker]=None,
+        schedulingPolicy: SchedulingPolicy=None,
+        history: RuntimeHistory=None,
+        etaInterval: float=60.0,
+        memoryLimit: int=None,
+        coreAllocator: CoreAllocator=None,
+        earlyTermination: str=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+        supervisor: ProcessSupervisor=None,
     ):
         super().__init__(name, solvers, problems, wcLimit, cpuLimit)
         self._results = []
+        self._leaderboard = Leaderboard(solvers)
         self._running = False
         self._resultCallbacks = []
         self._verbose = verbose
         self._silent = silent
         self._colored = colored
         self._outputDir = outputDir
+        self._parallelism = parallelism
+        self._journal = CompetitionJournal(journal) if journal else None
+        self._resume = resume
+        self._cache = cache
+        self._fsyncInterval = fsyncInterval
+        self._writer = None
+        self._outputArchive = outputArchive
+        self._archive = None
+        self._circuitBreakers = circuitBreakers if circuitBreakers else {}
+        self._schedulingPolicy = schedulingPolicy if schedulingPolicy else ConfigurationOrder()
+        self._history = history if history else RuntimeHistory()
+        self._etaInterval = etaInterval
+        # MiB per call, a solver may have a lower limit of its own
+        self._memoryLimit = memoryLimit
+        # pins every call to cpus of its own
+        self._coreAllocator = coreAllocator
+        # terminates solvers as soon as they have given their answer, see SZSAnswerWatcher
+        self._earlyTermination = earlyTermination
+        # bytes of stdout and stderr kept in memory per call
+        self._captureLimit = captureLimit
+        self._spillOutput = spillOutput
+        # watches local solver calls on a single event loop instead of one thread per call
+        self._supervisor = supervisor
+        self._openCalls = collections.deque()
+        self._executer = None
+
+        if self._resume and not self._journal:
+            raise ValueError('Resuming a competition requires a journal.')
+        if self._parallelism < 1:
+            raise ValueError('The parallelism must be at least 1, not {}.'.format(self._parallelism))
 
         if self._colored:
             from ..utils import color
@@ -41,6 +106,10 @@ class CASC(Competition):
         sb.append("competition name: " + self._name)
         sb.append("competition WC limit: " + str(self._wcLimit))
         sb.append("competition CPU limit: " + str(self._cpuLimit))
+        sb.append("competition cores: " + (str(self._coreAllocator) if self._coreAllocator else "not pinned"))
+        sb.append("competition memory limit: " + (str(self._memoryLimit) + " MiB" if self._memoryLimit else "none"))
+        sb.append("competition parallelism: " + str(self._parallelism))
+        sb.append("competition schedule: " + str(self._schedulingPolicy.name))
         sb.append("competition reasoners:")
         sb.extend(sorted(list(map(lambda s: '    ' + s.name(), self._solvers))))
         sb.append("competition problems:")
@@ -48,7 +117,10 @@ class CASC(Competition):
         return '\n'.join(sb)
 
     def addResult(self, result:SolverResult):
+        if self._journal:
+            self._writer.call(self._journal.appendEntry, JournalEntry.fromResult(result))
         self._results.append(result)
+        self._leaderboard.add(result)
         for c in self._resultCallbacks:
             c(self._results)
 
@@ -78,6 +150,9 @@ class CASC(Competition):
             state=match,
             t=int(result.wc),
         )
+        exceededLimit = getattr(result, 'exceededLimit', None)
+        if exceededLimit:
+            output += ' exceeding the {} limit'.format(exceededLimit)
         if self._colored:
             print('{color}{output}{reset}'.format(
                 output=output,
@@ -88,14 +163,13 @@ class CASC(Competition):
             print(output)
 
         if self._outputDir:
-            with open(self._outputDir / (solver.name + ".output"), "a") as f:
-                print(output, file=f)
-            with open(self._outputDir / (solver.name + "-" + problem.name + ".stdout"), "w") as f:
-                print(result.stdout, file=f)
-            with open(self._outputDir / (solver.name + "-" + problem.name + ".stderr"), "w") as f:
-                print(result.stderr, file=f)
-                if result.exception:
-                    print(result.exception, file=f)
+            self._writer.append(self._outputDir / (solver.name + ".output"), output + '\n')
+            self._writeOutput(result, 'stdout', solver.name + "-" + problem.name + ".stdout", '\n')
+            self._writeOutput(result, 'stderr', solver.name + "-" + problem.name + ".stderr", '\n' + (str(result.exception) + '\n' if result.exception else ''))
+            # the result is kept until the end of the competition, its spill files are not
+            self._writer.call(CASC._releaseSpills, result)
+        else:
+            CASC._releaseSpills(result)
 
         # further output for error informations
         if result.exception:
@@ -117,40 +191,341 @@ class CASC(Competition):
         wcLimit = self.wcLimit()
         self.addResultCallback(self.resultString)
 
+        # result per solver of all problems which have not yet been solved by every solver
+        self._openProblems = {}
+
+        restored = self._restore()
+        if self._resume:
+            print('% Resuming with {} results restored from {}'.format(len(restored), self._journal.path))
+        # problems whose results have all been restored, their rows may not have been written before the crash
+        restoredProblems = []
+        for r in restored:
+            self._results.append(r)
+            self._leaderboard.add(r)
+            rs = self._collectStatus(r)
+            if rs:
+                restoredProblems.append((r.call.problem, rs))
+            self._recordCircuitBreaker(r)
+
+        # all result output is written in the background, s.t. it never delays the start of the next call
+        self._writer = BatchedWriter(fsyncInterval=self._fsyncInterval)
+        if self._outputDir and self._outputArchive:
+            # stdout and stderr of all calls go to a single archive instead of two files per call
+            self._archive = StreamArchiveWriter(self._outputDir / 'streams.tpa')
+
         if self._outputDir:
-            with open(self._outputDir / ("results.csv"), "a") as f:
-                print('problem, exspected, ' + ', '.join(map(lambda s: str(s), self._solvers)), file=f)
-
-        for p in self._problems:
-            rs = []
-            for s in self._solvers:
-                call = s.call(p, timeout=wcLimit)
-                print('% SZS status Started for {}'.format(call))
-
-                result = call.run()
-                rs.append(result.szsStatus)
-                self.addResult(result)
-
-            if self._outputDir:
-                with open(self._outputDir / ("results.csv"), "a") as f:
-                    print(p.name + ', ' + str(p.szsStatus) + ', ' + ', '.join(map(lambda s: str(s), rs)), file=f)
+            written = self._writtenRows() if self._resume else None
+            if written is None:
+                self._writer.append(self._outputDir / "results.csv", 'problem, exspected, ' + ', '.join(map(lambda s: str(s), self._solvers)) + ''.join(map(
+                    lambda s: ''.join(map(lambda c: ', {} {}'.format(s, c), CASC.RESOURCE_COLUMNS)), self._solvers
+                )) + '\n')
+                written = set()
+            for problem, rs in restoredProblems:
+                if problem.name not in written:
+                    self._writeRow(problem, rs)
+
+        self._checkMemory()
+        jobs = self._plan(restored)
+        predictedMakespan = predictMakespan(map(self._estimate, jobs), self._parallelism)
+        knownRuntimes = len(self._history)
+        # calls are created lazily, s.t. at most parallelism calls (and their encoded problems) exist at a time
+        self._openCalls = collections.deque(jobs)
+
+        started = time.time()
+        self._executer = ReasoningExecuter(
+            threads=self._parallelism,
+            tickInterval=self._etaInterval,
+            supervisor=self._supervisor,
+        )
+        self._executer.addStartCallback(self._onCallStarted)
+        self._executer.addResultCallback(self._onCallFinished)
+        self._executer.addTickCallback(self._printForecast)
+        try:
+            for i in range(self._parallelism):
+                self._submitNextCall()
+            self._executer.wait()
+        finally:
+            self._writer.close()
+            if self._archive:
+                self._archive.close()
+            if self._journal:
+                self._journal.close()
+
+        achievedMakespan = round(time.time() - started, 1)
+        if knownRuntimes > 0:
+            print('% Makespan {achieved}s, predicted {predicted}s by the {policy} schedule with {known} known runtimes'.format(
+                achieved=achievedMakespan,
+                predicted=round(predictedMakespan, 1),
+                policy=self._schedulingPolicy.name,
+                known=knownRuntimes,
+            ))
+        else:
+            print('% Makespan {}s'.format(achievedMakespan))
+        if self._cache:
+            print('% Result cache: {}'.format(self._cache))
         self._running = False
-        
+
+    def _checkMemory(self):
+        """
+        Warns if the parallel calls may use more memory than the host has.
+        """
+        limits = [getattr(s, 'memoryLimit', None) or self._memoryLimit for s in self._solvers]
+        try:
+            available = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // (1024 * 1024)
+        except (ValueError, OSError):
+            return
+        if None in limits:
+            if self._parallelism > 1:
+                print('% Warning: not every solver has a memory limit, {} parallel calls may exhaust the {} MiB of this host'.format(self._parallelism, available))
+        elif max(limits) * self._parallelism > available:
+            print('% Warning: {} parallel calls with up to {} MiB each exceed the {} MiB of this host'.format(self._parallelism, max(limits), available))
+
+    def _restore(self) -> List[SolverResult]:
+        """
+        The results recorded in the journal if the competition is resumed.
+        """
+        if not self._resume:
+            return []
+        return self._journal.restore(self._solvers, self._problems, self.wcLimit())
+
+    def _plan(self, restored:List[SolverResult]) -> List[Job]:
+        """
+        All calls which have not been restored, in the order of the scheduling policy.
+        """
+        wcLimit = self.wcLimit()
+        # the journal of a previous run is history, too
+        if self._journal:
+            self._history.addEntries(self._journal.entries())
+        restoredKeys = set(map(lambda r: CompetitionJournal.keyOf(r.call.solver, r.call.problem, wcLimit), restored))
+        return self._schedulingPolicy.order([(p, s) for p in self._problems for s in self._solvers
+            if not CompetitionJournal.keyOf(s, p, wcLimit) in restoredKeys
+        ], self._estimate)
+
+    def _estimate(self, job:Job) -> float:
+        return self._history.estimate(job[1], job[0], self.wcLimit())
+
+    def forecaster(self) -> Forecaster:
+        return Forecaster(self._history, timeout=self.wcLimit(), parallelism=self._parallelism)
+
+    def forecast(self) -> Forecast:
+        """
+        Remaining runtime of the competition, considering the queued and the running calls.
+        """
+        return self.forecaster().forecast(self._openCalls, self._executer.active() if self._executer else [])
+
+    def _printForecast(self):
+        print('% {}'.format(self.forecast()))
+        sys.stdout.flush()
+
+    def dryRun(self):
+        """
+        Prints the calls which would be run and their estimated cost without running anything.
+        """
+        restored = self._restore()
+        jobs = self._plan(restored)
+        forecast = self.forecaster().forecast(jobs)
+        print('% {calls} calls ({restored} restored) of {solvers} solvers on {problems} problems with {known} known runtimes'.format(
+            calls=len(jobs),
+            restored=len(restored),
+            solvers=self.numSolvers(),
+            problems=self.numProblems(),
+            known=len(self._history),
+        ))
+        print('% Estimated makespan {eta} (90%: {lower} to {upper}, at most {worstCase}) with {parallelism} parallel calls'.format(
+            eta=formatDuration(forecast.eta),
+            lower=formatDuration(forecast.lower),
+            upper=formatDuration(forecast.upper),
+            worstCase=formatDuration(forecast.worstCase),
+            parallelism=self._parallelism,
+        ))
+        print('% Estimated cost {wc} wall clock time, {cpu} cpu time'.format(
+            wc=formatDuration(forecast.wc),
+            cpu=formatDuration(forecast.cpu),
+        ))
+
+    def _submitNextCall(self):
+        """
+        Submits the next open call to the executer if there is one.
+        Calls of quarantined solvers are skipped and result in NotTried.
+        """
+        while self._openCalls:
+            p, s = self._openCalls.popleft()
+            breaker = self._circuitBreakers.get(s, None)
+            if breaker and breaker.tripped:
+                self._onResult(SkippedSolverResult(SkippedSolverCall(p, solver=s, timeout=self.wcLimit())))
+                continue
+            self._executer.submit(s.call(p,
+                timeout=self.wcLimit(),
+                cache=self._cache,
+                memoryLimit=self._memoryLimit,
+                cpuLimit=self.cpuLimit(),
+                coreAllocator=self._coreAllocator,
+                earlyTermination=self._earlyTermination,
+                captureLimit=self._captureLimit,
+                spillOutput=self._spillOutput,
+            ))
+            return
+
+    def _onCallStarted(self, call):
+        print('% SZS status Started for {}'.format(call))
+
+    def _onCallFinished(self, result:SolverResult):
+        # a tripped breaker already prevents the next call
+        self._recordCircuitBreaker(result)
+        self._submitNextCall()
+        self._onResult(result)
+
+    def _recordCircuitBreaker(self, result:SolverResult):
+        solver = result.call.solver
+        breaker = self._circuitBreakers.get(solver, None)
+        if breaker and breaker.record(result):
+            print('% Quarantined {solver} after {reason}, its remaining calls are not tried'.format(
+                solver=solver,
+                reason=breaker.reason,
+            ))
+
+    def _onResult(self, result:SolverResult):
+        self.addResult(result)
+        # the calls finished so far improve the forecast of the remaining ones
+        if result.wc is not None and result.szsStatus != SZSStatus.NotTried:
+            self._history.add(result.call.solver.name, result.call.problem.name, result.wc, result.cpu)
+
+        # write the row of a problem as soon as all solvers have finished on it
+        rs = self._collectStatus(result)
+        if rs and self._outputDir:
+            self._writeRow(result.call.problem, rs)
+
+    def _writeRow(self, problem:TPTPProblem, rs:Dict[Solver, SolverResult]):
+        self._writer.append(self._outputDir / "results.csv", problem.name + ', ' + str(problem.szsStatus) + ', ' + ', '.join(map(lambda s: str(rs[s].szsStatus), self._solvers)) + ''.join(map(
+            lambda s: ''.join(map(lambda v: ', ' + ('' if v is None else str(v)), CASC._resourceValues(rs[s]))), self._solvers
+        )) + '\n')
+
+    def _writtenRows(self):
+        """
+        The problems of the rows of an existing results.csv, None if there is none.
+        A row torn by a crash is cut off, it is written again.
+        """
+        path = self._outputDir / "results.csv"
+        if not path.exists():
+            return None
+        with path.open('r+b') as f:
+            content = f.read()
+            end = content.rfind(b'\n') + 1
+            if end < len(content):
+                f.truncate(end)
+        lines = content[:end].decode('utf8', errors='replace').splitlines()
+        if not lines:
+            return None
+        return set(l.split(', ', 1)[0] for l in lines[1:])
+
+    def _writeOutput(self, result:SolverResult, stream:str, name:str, end:str):
+        """
+        Writes the whole stdout or stderr of a call, including the output spilled beyond the capture limit, which is
+        copied chunk by chunk on the writer thread.
+        """
+        capture = getattr(result, stream + 'Capture', None)
+        if capture is None or not capture.spillPath:
+            content = str(getattr(result, stream)) + end
+            if self._archive:
+                self._writer.call(self._archive.add, name, content)
+            else:
+                self._writer.write(self._outputDir / name, content)
+        elif self._archive:
+            # entries of the archive are compressed as a whole
+            self._writer.call(CASC._archiveCapture, self._archive, name, capture, end)
+        else:
+            self._writer.writeChunks(self._outputDir / name, itertools.chain(capture.chunks(), [end.encode('utf8')]))
+
+    @staticmethod
+    def _archiveCapture(archive:StreamArchiveWriter, name:str, capture, end:str):
+        archive.add(name, capture.readAll() + end.encode('utf8'))
+
+    @staticmethod
+    def _releaseSpills(result:SolverResult):
+        for stream in ['stdout', 'stderr']:
+            capture = getattr(result, stream + 'Capture', None)
+            if capture is not None:
+                capture.releaseSpill()
+
+    @staticmethod
+    def _resourceValues(result:SolverResult) -> List:
+        """
+        Values of the RESOURCE_COLUMNS of a result, None if not known.
+        """
+        seconds = lambda t: None if t is None else round(float(t), 3)
+        return [
+            seconds(result.wc),
+            seconds(result.cpu),
+            seconds(getattr(result, 'cpuUser', None)),
+            seconds(getattr(result, 'cpuSystem', None)),
+            getattr(result, 'maxRss', None),
+            getattr(result, 'voluntaryContextSwitches', None),
+            getattr(result, 'involuntaryContextSwitches', None),
+            getattr(result, 'exceededLimit', None),
+            seconds(getattr(result, 'answerWc', None)),
+        ]
+
+    def _collectStatus(self, result:SolverResult):
+        """
+        Remembers the result.
+        :return: the result of each solver if all solvers have finished on the problem of the result, None otherwise
+        """
+        problem = result.call.problem
+        rs = self._openProblems.setdefault(problem, {})
+        rs[result.call.solver] = result
+        if len(rs) < len(self._solvers):
+            return None
+        del self._openProblems[problem]
+        return rs
+
     def results(self) -> List[SolverResult]:
         return self._results
 
+    def leaderboard(self) -> Leaderboard:
+        """
+        Per solver aggregation of all results so far, updated with every result.
+        """
+        return self._leaderboard
+
     @staticmethod
     def configure(configurationModulePath:Path, *,
         verbose=False,
         silent=False,
         colored=False,
         outputDir: Path=None,
+        parallelism: int=1,
+        journal: Path=None,
+        resume: bool=False,
+        cache: SolverResultCache=None,
+        fsyncInterval: float=5.0,
+        outputArchive: bool=False,
+        schedulingPolicy: SchedulingPolicy=None,
+        history: RuntimeHistory=None,
+        etaInterval: float=60.0,
+        memoryLimit: int=None,
+        coreAllocator: CoreAllocator=None,
+        earlyTermination: str=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+        supervisor: ProcessSupervisor=None,
     ):
         configuration = SourceFileLoader('configuration', str(configurationModulePath)).load_module()
         solvers = loadSolvers(configuration.SOLVERS)
+        # a solver definition may override the breaker of the competition
+        defaultBreaker = getattr(configuration, 'CIRCUIT_BREAKER', None)
+        circuitBreakers = {}
+        for solver, definition in zip(solvers, configuration.SOLVERS):
+            breaker = definition.get('circuit-breaker', defaultBreaker)
+            if breaker:
+                circuitBreakers[solver] = CircuitBreaker.fromDict(breaker)
         #problemPaths = [f for f in glob.glob(str(configuration.PROBLEM_PATH) + "/**/*.p", recursive=True)]
         #problems = list(map(lambda p: TPTPProblem.readFromFile(Path(p)),problemPaths))
-        problems = list(map(lambda p: ProblemWithStatus(Path(p[0]).name, Path(p[0]).absolute(), None, SZSStatus.get(p[1])), configuration.PROBLEMS))
+        if hasattr(configuration, 'PROBLEM_QUERY'):
+            # problems selected from an index of a TPTP library, see tptp index
+            index = ProblemIndex(Path(getattr(configuration, 'PROBLEM_INDEX', DEFAULT_INDEX_PATH)))
+            problems = index.query(**configuration.PROBLEM_QUERY)
+        else:
+            problems = list(map(lambda p: ProblemWithStatus(Path(p[0]).name, Path(p[0]).absolute(), None, SZSStatus.get(p[1])), configuration.PROBLEMS))
         return CASC(configuration.COMPETITION_NAME, 
             solvers=solvers, 
             problems=problems, 
@@ -160,5 +535,21 @@ class CASC(Competition):
             silent=silent,
             colored=colored,
             outputDir=outputDir,
+            parallelism=parallelism,
+            journal=journal,
+            resume=resume,
+            cache=cache,
+            fsyncInterval=fsyncInterval,
+            outputArchive=outputArchive,
+            circuitBreakers=circuitBreakers,
+            schedulingPolicy=schedulingPolicy,
+            history=history,
+            etaInterval=etaInterval,
+            memoryLimit=memoryLimit if memoryLimit else getattr(configuration, 'MEMORY_LIMIT', None),
+            coreAllocator=coreAllocator,
+            earlyTermination=earlyTermination,
+            captureLimit=captureLimit,
+            spillOutput=spillOutput,
+            supervisor=supervisor,
         )
 
@@ -0,0 +1,108 @@
+from typing import Dict
+
+from ..core import SZSStatus
+from ..reasoning import SolverResult
+from .notExecuted import NotExecutedSolverCall, NotExecutedSolverResult
+
+
+class CircuitBreaker:
+    """
+    Quarantines a solver as soon as its results indicate that it is broken or misconfigured.
+
+    The breaker trips if any of the configured conditions holds:
+    * consecutiveErrors: this many results in a row are an Error (e.g. a missing binary)
+    * consecutiveTimeouts: this many results in a row are a Timeout
+    * unsound: this many results are unsound
+    * errorRate: more than this ratio of results are an Error, checked after minCalls results
+    A condition which is None is not checked.
+    """
+    def __init__(self, *,
+        consecutiveErrors: int=None,
+        consecutiveTimeouts: int=None,
+        unsound: int=None,
+        errorRate: float=None,
+        minCalls: int=10,
+    ):
+        self._consecutiveErrorsLimit = consecutiveErrors
+        self._consecutiveTimeoutsLimit = consecutiveTimeouts
+        self._unsoundLimit = unsound
+        self._errorRateLimit = errorRate
+        self._minCalls = minCalls
+
+        self._calls = 0
+        self._errors = 0
+        self._unsound = 0
+        self._consecutiveErrors = 0
+        self._consecutiveTimeouts = 0
+        self._reason = None
+
+    @staticmethod
+    def fromDict(d:Dict):
+        """
+        Creates a breaker from its definition in a competition configuration, e.g.
+        {'consecutive-errors': 5, 'consecutive-timeouts': 20, 'unsound': 1, 'error-rate': 0.5, 'min-calls': 10}
+        """
+        return CircuitBreaker(
+            consecutiveErrors=d.get('consecutive-errors', None),
+            consecutiveTimeouts=d.get('consecutive-timeouts', None),
+            unsound=d.get('unsound', None),
+            errorRate=d.get('error-rate', None),
+            minCalls=d.get('min-calls', 10),
+        )
+
+    @property
+    def tripped(self) -> bool:
+        return self._reason is not None
+
+    @property
+    def reason(self) -> str:
+        """
+        Why the breaker tripped, None if it has not.
+        """
+        return self._reason
+
+    def record(self, result:SolverResult) -> bool:
+        """
+        Accounts a result of the solver.
+        :return: whether the breaker tripped with this result
+        """
+        if self.tripped:
+            return False
+
+        szs = result.szsStatus
+        self._calls += 1
+        if szs._isDescendantOf(SZSStatus.Error):
+            self._errors += 1
+            self._consecutiveErrors += 1
+        else:
+            self._consecutiveErrors = 0
+        if szs == SZSStatus.Timeout:
+            self._consecutiveTimeouts += 1
+        else:
+            self._consecutiveTimeouts = 0
+        if result.matches().isUnsound():
+            self._unsound += 1
+
+        if self._consecutiveErrorsLimit is not None and self._consecutiveErrors >= self._consecutiveErrorsLimit:
+            self._reason = '{} consecutive errors'.format(self._consecutiveErrors)
+        elif self._consecutiveTimeoutsLimit is not None and self._consecutiveTimeouts >= self._consecutiveTimeoutsLimit:
+            self._reason = '{} consecutive timeouts'.format(self._consecutiveTimeouts)
+        elif self._unsoundLimit is not None and self._unsound >= self._unsoundLimit:
+            self._reason = '{} unsound results'.format(self._unsound)
+        elif self._errorRateLimit is not None and self._calls >= self._minCalls and self._errors > self._errorRateLimit * self._calls:
+            self._reason = '{} errors in {} calls'.format(self._errors, self._calls)
+        return self.tripped
+
+
+class SkippedSolverCall(NotExecutedSolverCall):
+    """
+    A solver call which is never executed, since its solver has been quarantined.
+    """
+
+
+class SkippedSolverResult(NotExecutedSolverResult):
+    """
+    The NotTried result of a skipped solver call.
+    """
+    def __init__(self, call:SkippedSolverCall):
+        super().__init__(call, SZSStatus.NotTried, 0.0, 0.0)
@@ -82,10 +82,19 @@ class Competition:
         return deepcopy(self._solvers)
 
     def problems(self) -> List[Problem]:
-        return deepcopy((self._problems))
+        """
+        The problems are shared, not copied: they are immutable and a copy would hold its own content.
+        """
+        return list(self._problems)
+
+    def numSolvers(self) -> int:
+        return len(self._solvers)
+
+    def numProblems(self) -> int:
+        return len(self._problems)
 
     def wcLimit(self) -> int:
         return self._wcLimit
 
     def cpuLimit(self) -> int:
-        return self.cpuLimit()
+        return self._cpuLimit
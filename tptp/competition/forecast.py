@@ -0,0 +1,197 @@
+import heapq
+import math
+from typing import Iterable, Tuple
+
+from ..reasoning import Solver, SolverCall
+from ..core import Problem
+from .schedulingPolicy import Job, RuntimeHistory
+
+# quantile of the standard normal distribution for a two sided 90% interval
+Z_90 = 1.645
+
+def formatDuration(seconds:float) -> str:
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return '{}s'.format(seconds)
+    if seconds < 3600:
+        return '{}m{:02d}s'.format(seconds // 60, seconds % 60)
+    return '{}h{:02d}m'.format(seconds // 3600, seconds % 3600 // 60)
+
+
+class Forecast:
+    """
+    Expected remaining wall clock time of a competition with a 90% confidence interval,
+    and the total wall clock and cpu time of the remaining calls.
+    """
+    def __init__(self, *,
+        eta: float,
+        lower: float,
+        upper: float,
+        worstCase: float,
+        wc: float,
+        cpu: float,
+        queued: int,
+        running: int,
+    ):
+        self._eta = eta
+        self._lower = lower
+        self._upper = upper
+        self._worstCase = worstCase
+        self._wc = wc
+        self._cpu = cpu
+        self._queued = queued
+        self._running = running
+
+    def __str__(self):
+        return 'ETA {eta} ({lower} to {upper}, at most {worstCase}) for {running} running and {queued} queued calls'.format(
+            eta=formatDuration(self._eta),
+            lower=formatDuration(self._lower),
+            upper=formatDuration(self._upper),
+            worstCase=formatDuration(self._worstCase),
+            running=self._running,
+            queued=self._queued,
+        )
+
+    @property
+    def eta(self) -> float:
+        """
+        Expected remaining time until all calls are finished.
+        """
+        return self._eta
+
+    @property
+    def lower(self) -> float:
+        return self._lower
+
+    @property
+    def upper(self) -> float:
+        return self._upper
+
+    @property
+    def worstCase(self) -> float:
+        """
+        Remaining time if every call reaches its timeout.
+        """
+        return self._worstCase
+
+    @property
+    def wc(self) -> float:
+        """
+        Expected wall clock time of all remaining calls, summed up.
+        """
+        return self._wc
+
+    @property
+    def cpu(self) -> float:
+        """
+        Expected cpu time of all remaining calls, summed up.
+        """
+        return self._cpu
+
+    @property
+    def queued(self) -> int:
+        return self._queued
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+
+class Forecaster:
+    """
+    Forecasts the remaining runtime of a competition from the solve times of previous runs.
+
+    The remaining time of a call is drawn from the recorded times of its solver which exceed the time the call
+    already runs, capped by the timeout. Without any record of the solver the time is assumed to be uniformly
+    distributed up to the timeout. The calls are list scheduled on the parallel slots by their expected times,
+    the confidence interval approximates the sum of all calls by a normal distribution.
+    """
+    def __init__(self, history:RuntimeHistory, *,
+        timeout: float,
+        parallelism: int=1,
+    ):
+        self._history = history
+        self._timeout = timeout
+        self._parallelism = max(1, parallelism)
+
+    def callEstimate(self, solver:Solver, problem:Problem, *,
+        timeout: float=None,
+        running: float=0.0,
+    ) -> Tuple[float, float]:
+        """
+        Mean and variance of the remaining wall clock time of a call, which is running for the given time.
+        """
+        timeout = self._timeout if timeout is None else timeout
+        wc = self._history.wc(solver.name, problem.name)
+        if wc is not None and min(wc, timeout) > running:
+            return min(wc, timeout) - running, 0.0
+        return self._solverEstimate(solver.name, timeout, running)
+
+    def _solverEstimate(self, solverName:str, timeout:float, running:float) -> Tuple[float, float]:
+        """
+        Mean and variance of the remaining wall clock time of a call of the solver on a problem without a record.
+        """
+        left = max(0.0, timeout - running)
+        samples = [min(s, timeout) - running for s in self._history.samples(solverName) if min(s, timeout) > running]
+        if not samples:
+            return left / 2, left * left / 12
+        mean = sum(samples) / len(samples)
+        variance = sum((s - mean) ** 2 for s in samples) / len(samples)
+        return mean, variance
+
+    def forecast(self, queued:Iterable[Job], running:Iterable[SolverCall]=()) -> Forecast:
+        slots = []
+        worstSlots = []
+        totalWc = 0.0
+        totalCpu = 0.0
+        variance = 0.0
+        numRunning = 0
+        for call in running:
+            mean, var = self.callEstimate(call.solver, call.problem,
+                timeout=call.estimatedTimeout(),
+                running=call.timeRunning(),
+            )
+            slots.append(mean)
+            worstSlots.append(max(0.0, call.estimatedTimeout() - call.timeRunning()))
+            totalWc += mean
+            totalCpu += mean * self._history.cpuRatio(call.solver.name)
+            variance += var
+            numRunning += 1
+        # free slots
+        slots.extend([0.0] * max(0, self._parallelism - len(slots)))
+        worstSlots.extend([0.0] * max(0, self._parallelism - len(worstSlots)))
+        heapq.heapify(slots)
+        heapq.heapify(worstSlots)
+
+        # queued calls without a record share the estimate of their solver, computed once per forecast
+        solverEstimates = {}
+        numQueued = 0
+        for problem, solver in queued:
+            wc = self._history.wc(solver.name, problem.name)
+            if wc is not None and min(wc, self._timeout) > 0:
+                mean, var = min(wc, self._timeout), 0.0
+            else:
+                if solver.name not in solverEstimates:
+                    solverEstimates[solver.name] = self._solverEstimate(solver.name, self._timeout, 0.0)
+                mean, var = solverEstimates[solver.name]
+            heapq.heappush(slots, heapq.heappop(slots) + mean)
+            heapq.heappush(worstSlots, heapq.heappop(worstSlots) + self._timeout)
+            totalWc += mean
+            totalCpu += mean * self._history.cpuRatio(solver.name)
+            variance += var
+            numQueued += 1
+
+        eta = max(slots)
+        worstCase = max(worstSlots)
+        # the deviation of the total work, spread over all slots
+        deviation = Z_90 * math.sqrt(variance) / min(self._parallelism, max(1, numRunning + numQueued))
+        return Forecast(
+            eta=eta,
+            lower=max(0.0, eta - deviation),
+            upper=min(worstCase, eta + deviation),
+            worstCase=worstCase,
+            wc=totalWc,
+            cpu=totalCpu,
+            queued=numQueued,
+            running=numRunning,
+        )
@@ -0,0 +1,307 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from ..core import Problem, SZSStatus
+from ..reasoning import Solver, SolverResult
+from .notExecuted import NotExecutedSolverCall, NotExecutedSolverResult
+
+
+class JournalEntry:
+    """
+    A single finished solver call as recorded in a competition journal.
+    """
+    def __init__(self, *,
+        solverName: str,
+        solverVersion: str,
+        problemName: str,
+        problemSource: str,
+        timeout: float,
+        szs: SZSStatus,
+        wc: float,
+        cpu: float,
+        returnCode: int,
+        finished: float,
+        exceededLimit: str=None,
+        cores: List[int]=None,
+        answerWc: float=None,
+    ):
+        self._solverName = solverName
+        self._solverVersion = solverVersion
+        self._problemName = problemName
+        self._problemSource = problemSource
+        self._timeout = timeout
+        self._szs = szs
+        self._wc = wc
+        self._cpu = cpu
+        self._returnCode = returnCode
+        self._finished = finished
+        self._exceededLimit = exceededLimit
+        self._cores = cores
+        self._answerWc = answerWc
+
+    @property
+    def solverName(self) -> str:
+        return self._solverName
+
+    @property
+    def solverVersion(self) -> str:
+        return self._solverVersion
+
+    @property
+    def problemName(self) -> str:
+        return self._problemName
+
+    @property
+    def problemSource(self) -> str:
+        return self._problemSource
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def szsStatus(self) -> SZSStatus:
+        return self._szs
+
+    @property
+    def wc(self) -> float:
+        return self._wc
+
+    @property
+    def cpu(self) -> float:
+        return self._cpu
+
+    @property
+    def returnCode(self) -> int:
+        return self._returnCode
+
+    @property
+    def exceededLimit(self) -> str:
+        """
+        The limit which caused a timeout, 'wc' or 'cpu', None if no limit has been exceeded.
+        """
+        return self._exceededLimit
+
+    @property
+    def answerWc(self) -> float:
+        """
+        Wall clock time until the answer if the call has been terminated early, None otherwise.
+        """
+        return self._answerWc
+
+    @property
+    def cores(self) -> List[int]:
+        """
+        The cpus the call has been pinned to, None if it has not been pinned.
+        """
+        return self._cores
+
+    @property
+    def finished(self) -> float:
+        """
+        Unix time the call has been journaled.
+        """
+        return self._finished
+
+    @property
+    def key(self) -> Tuple:
+        return CompetitionJournal.key(
+            solverName=self._solverName,
+            solverVersion=self._solverVersion,
+            problemSource=self._problemSource,
+            timeout=self._timeout,
+        )
+
+    def toDict(self) -> Dict:
+        return {
+            'solver': self._solverName,
+            'version': self._solverVersion,
+            'problem': self._problemName,
+            'source': self._problemSource,
+            'timeout': self._timeout,
+            'szs': str(self._szs),
+            'wc': self._wc,
+            'cpu': self._cpu,
+            'returnCode': self._returnCode,
+            'finished': self._finished,
+            'limit': self._exceededLimit,
+            'cores': self._cores,
+            'answerWc': self._answerWc,
+        }
+
+    @staticmethod
+    def fromDict(d:Dict):
+        return JournalEntry(
+            solverName=d['solver'],
+            solverVersion=d['version'],
+            problemName=d['problem'],
+            problemSource=d['source'],
+            timeout=d['timeout'],
+            szs=SZSStatus.get(d['szs']),
+            wc=d['wc'],
+            cpu=d['cpu'],
+            returnCode=d['returnCode'],
+            finished=d['finished'],
+            exceededLimit=d.get('limit', None),
+            cores=d.get('cores', None),
+            answerWc=d.get('answerWc', None),
+        )
+
+    @staticmethod
+    def fromResult(result:SolverResult):
+        call = result.call
+        return JournalEntry(
+            solverName=call.solver.name,
+            solverVersion=call.solver.version,
+            problemName=call.problem.name,
+            problemSource=str(call.problem.source),
+            timeout=call.estimatedTimeout(),
+            szs=result.szsStatus,
+            wc=None if result.wc is None else float(result.wc),
+            cpu=None if result.cpu is None else float(result.cpu),
+            returnCode=getattr(result, 'returnCode', None),
+            finished=time.time(),
+            exceededLimit=getattr(result, 'exceededLimit', None),
+            cores=sorted(result.cores) if getattr(result, 'cores', None) else None,
+            answerWc=getattr(result, 'answerWc', None),
+        )
+
+
+class JournaledSolverCall(NotExecutedSolverCall):
+    """
+    Stands in for a solver call whose result has been restored from a journal.
+    The call is never executed again.
+    """
+    def isStarted(self) -> bool:
+        return True
+
+
+class JournaledSolverResult(NotExecutedSolverResult):
+    """
+    A result restored from a journal. The output of the solver is not journaled.
+    """
+    def __init__(self, call:JournaledSolverCall, entry:JournalEntry):
+        super().__init__(call, entry.szsStatus, entry.cpu, entry.wc, returnCode=entry.returnCode)
+        self._exceededLimit = entry.exceededLimit
+
+    @property
+    def exceededLimit(self):
+        return self._exceededLimit
+
+
+class CompetitionJournal:
+    """
+    Append-only journal of finished solver calls, one JSON object per line.
+
+    Every entry is flushed and fsynced before append returns, hence after a crash at most the last line
+    is incomplete. Such a torn line is ignored on reading and cut off before the next append.
+    """
+    def __init__(self, path:Path):
+        self._path = Path(path)
+        self._file = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def key(*,
+        solverName: str,
+        solverVersion: str,
+        problemSource: str,
+        timeout: float,
+    ) -> Tuple:
+        """
+        Identifies a (solver, problem, limit) triple.
+        """
+        return (solverName, solverVersion, str(problemSource), float(timeout))
+
+    @staticmethod
+    def keyOf(solver:Solver, problem:Problem, timeout:float) -> Tuple:
+        return CompetitionJournal.key(
+            solverName=solver.name,
+            solverVersion=solver.version,
+            problemSource=problem.source,
+            timeout=timeout,
+        )
+
+    def entries(self) -> List[JournalEntry]:
+        """
+        Reads all complete entries of the journal.
+        """
+        if not self._path.exists():
+            return []
+        entries = []
+        with self._path.open('rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break # torn write
+                try:
+                    entries.append(JournalEntry.fromDict(json.loads(line.decode('utf8'))))
+                except ValueError:
+                    break # torn write followed by a newline of a later append
+        return entries
+
+    def entryDict(self) -> Dict[Tuple, JournalEntry]:
+        """
+        All entries by their (solver, problem, limit) key. The latest entry wins.
+        """
+        return {e.key: e for e in self.entries()}
+
+    def open(self):
+        if self._file:
+            return
+        self._repair()
+        self._file = self._path.open('ab')
+
+    def _repair(self):
+        """
+        Cuts off a torn last line, s.t. the next entry starts on a line of its own.
+        """
+        if not self._path.exists():
+            return
+        valid = 0
+        with self._path.open('rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    json.loads(line.decode('utf8'))
+                except ValueError:
+                    break
+                valid += len(line)
+        if valid != self._path.stat().st_size:
+            with self._path.open('r+b') as f:
+                f.truncate(valid)
+
+    def append(self, result:SolverResult):
+        self.appendEntry(JournalEntry.fromResult(result))
+
+    def appendEntry(self, entry:JournalEntry):
+        self.open()
+        self._file.write(json.dumps(entry.toDict()).encode('utf8') + b'\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def restore(self, solvers:Iterable[Solver], problems:Iterable[Problem], timeout:float) -> List[JournaledSolverResult]:
+        """
+        Restores the results of all (solver, problem, timeout) triples found in the journal.
+        Calls which have not been tried, e.g. since their solver was quarantined, are not restored.
+        """
+        entries = self.entryDict()
+        results = []
+        for p in problems:
+            for s in solvers:
+                entry = entries.get(CompetitionJournal.keyOf(s, p, timeout), None)
+                if entry and entry.szsStatus != SZSStatus.NotTried:
+                    call = JournaledSolverCall(p, solver=s, timeout=timeout, wc=entry.wc)
+                    results.append(JournaledSolverResult(call, entry))
+        return results
@@ -0,0 +1,72 @@
+from ..core import Problem, SZSStatus
+from ..reasoning import Solver, SolverCall, SolverResult
+
+
+class NotExecutedSolverCall(SolverCall):
+    """
+    Stands in for a solver call which is not executed by the competition, its result is known without running it.
+    """
+    def __init__(self, problem:Problem, *,
+        solver: Solver,
+        timeout: float,
+        wc: float=None,
+    ):
+        """
+        :param wc: the wall clock time the call has taken when it was executed, None if it never was
+        """
+        self._problem = problem
+        self._solver = solver
+        self._timeout = timeout
+        self._wc = wc
+
+    def isStarted(self) -> bool:
+        return False
+
+    def isRunning(self) -> bool:
+        return False
+
+    def isDone(self) -> bool:
+        return True
+
+    def timeScheduled(self) -> float:
+        return 0
+
+    def timeRunning(self) -> float:
+        return self._wc if self._wc else 0
+
+    def timeout(self) -> float:
+        return self._timeout
+
+    def estimatedTimeout(self) -> float:
+        return self._timeout
+
+
+class NotExecutedSolverResult(SolverResult):
+    """
+    The result of a solver call which has not been executed, hence there is no output.
+    """
+    def __init__(self, call:NotExecutedSolverCall, szs:SZSStatus, cpu:float, wc:float, *,
+        returnCode: int=None,
+    ):
+        super().__init__(call, szs, cpu, wc)
+        self._returnCode = returnCode
+
+    @property
+    def stdout(self):
+        return ''
+
+    @property
+    def stderr(self):
+        return ''
+
+    @property
+    def output(self):
+        return self.stdout
+
+    @property
+    def returnCode(self):
+        return self._returnCode
+
+    @property
+    def exception(self):
+        return None
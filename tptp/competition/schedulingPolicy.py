@@ -0,0 +1,159 @@
+import heapq
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from ..core import Problem, SZSStatus
+from ..reasoning import Solver
+from .journal import JournalEntry
+
+# a (problem, solver) pair of a competition
+Job = Tuple[Problem, Solver]
+
+
+class RuntimeHistory:
+    """
+    Wall clock and cpu times of solver calls of previous runs, e.g. read from competition journals.
+    """
+    def __init__(self):
+        # (wc, cpu) by (solver name, problem name), the latest entry wins
+        self._times = {}
+        # wc of all calls and mean ratio of cpu to wc by solver name, rebuilt on demand
+        self._samples = None
+        self._cpuRatios = None
+
+    def __len__(self):
+        return len(self._times)
+
+    def add(self, solverName:str, problemName:str, wc:float, cpu:float=None):
+        self._times[(solverName, problemName)] = (wc, cpu)
+        self._samples = None
+        self._cpuRatios = None
+
+    def addEntries(self, entries:Iterable[JournalEntry]):
+        for e in entries:
+            if e.wc is not None and e.szsStatus != SZSStatus.NotTried:
+                self.add(e.solverName, e.problemName, e.wc, e.cpu)
+
+    def wc(self, solverName:str, problemName:str) -> float:
+        """
+        The recorded wall clock time of the call, None if it is unknown.
+        """
+        times = self._times.get((solverName, problemName), None)
+        return times[0] if times else None
+
+    def _summarize(self):
+        """
+        Groups the recorded times by solver, once after entries have been added.
+        """
+        self._samples = {}
+        ratios = {}
+        for (s, p), (wc, cpu) in self._times.items():
+            self._samples.setdefault(s, []).append(wc)
+            if cpu is not None and wc:
+                ratios.setdefault(s, []).append(cpu / wc)
+        self._cpuRatios = {s: sum(r) / len(r) for s, r in ratios.items()}
+
+    def samples(self, solverName:str) -> List[float]:
+        """
+        Wall clock times of all recorded calls of the solver.
+        """
+        if self._samples is None:
+            self._summarize()
+        return self._samples.get(solverName, [])
+
+    def cpuRatio(self, solverName:str) -> float:
+        """
+        Mean ratio of cpu to wall clock time of the solver, 1 (a single thread) if it is unknown.
+        """
+        if self._cpuRatios is None:
+            self._summarize()
+        return self._cpuRatios.get(solverName, 1.0)
+
+    def estimate(self, solver:Solver, problem:Problem, timeout:float) -> float:
+        """
+        Expected wall clock time of a call, at most the timeout.
+        Falls back to the mean time of the solver and to the timeout if nothing is known about the solver.
+        """
+        wc = self.wc(solver.name, problem.name)
+        if wc is None:
+            samples = self.samples(solver.name)
+            wc = sum(samples) / len(samples) if samples else timeout
+        return min(wc, timeout)
+
+
+class SchedulingPolicy:
+    """
+    Orders the jobs of a competition before they are submitted.
+    The order of jobs with the same estimate is kept.
+    """
+    name = None
+
+    def order(self, jobs:List[Job], estimate:Callable[[Job], float]) -> List[Job]:
+        raise NotImplementedError()
+
+
+class ConfigurationOrder(SchedulingPolicy):
+    """
+    Every problem with all solvers, in the order of the configuration.
+    """
+    name = 'config'
+
+    def order(self, jobs:List[Job], estimate:Callable[[Job], float]) -> List[Job]:
+        return list(jobs)
+
+
+class LongestFirst(SchedulingPolicy):
+    """
+    Longest processing time first, avoids long calls piling up at the end and hence minimizes the makespan.
+    """
+    name = 'lpt'
+
+    def order(self, jobs:List[Job], estimate:Callable[[Job], float]) -> List[Job]:
+        return sorted(jobs, key=estimate, reverse=True)
+
+
+class ShortestFirst(SchedulingPolicy):
+    """
+    Shortest job first, yields as many results as early as possible.
+    """
+    name = 'sjf'
+
+    def order(self, jobs:List[Job], estimate:Callable[[Job], float]) -> List[Job]:
+        return sorted(jobs, key=estimate)
+
+
+class RoundRobin(SchedulingPolicy):
+    """
+    Takes one job of each solver in turn, the jobs of a solver shortest first.
+    Every solver makes progress at the same pace.
+    """
+    name = 'round-robin'
+
+    def order(self, jobs:List[Job], estimate:Callable[[Job], float]) -> List[Job]:
+        bySolver = {}
+        for job in jobs:
+            bySolver.setdefault(job[1], []).append(job)
+        queues = [sorted(q, key=estimate, reverse=True) for q in bySolver.values()]
+        ordered = []
+        while queues:
+            for q in queues:
+                ordered.append(q.pop())
+            queues = [q for q in queues if q]
+        return ordered
+
+
+SCHEDULING_POLICIES = {p.name: p for p in [
+    ConfigurationOrder,
+    LongestFirst,
+    ShortestFirst,
+    RoundRobin,
+]} # type: Dict[str, type]
+
+
+def predictMakespan(durations:Iterable[float], workers:int) -> float:
+    """
+    Makespan of executing the jobs in the given order, each one on the next free of the workers.
+    """
+    free = [0.0] * max(1, workers)
+    for d in durations:
+        heapq.heapreplace(free, free[0] + d)
+    return max(free)
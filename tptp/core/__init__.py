@@ -1,3 +1,4 @@
 from .problem import Problem, ProblemWithStatus, TPTPProblem
+from .tptpHeader import TPTPHeader
 from .tptpInputLanguages import TPTPDialect
 from .szs import SZSStatus, UnknownSZSStatusError
@@ -1,6 +1,8 @@
-import re
 from pathlib import Path
+from typing import Dict, List, Tuple
 from .szs import SZSStatus
+from .problemContent import ProblemContentCache
+from .tptpHeader import TPTPHeader
 
 class InvalidSourceError(Exception):
     pass
@@ -15,14 +17,29 @@ class Problem:
         return self._name
 
     def problem(self):
+        """
+        The content, read from the source file unless it has been given. The text of files is not kept by the problem
+        but by the ProblemContentCache of the process, which bounds the memory of all problems.
+        """
         if not self._problem:
             try:
-                path = Path(self._source)
-                self._problem = path.read_text()
+                return ProblemContentCache.shared().text(Path(self._source))
             except Exception as e:
                 raise InvalidSourceError(e)
         return self._problem
 
+    def problemBytes(self):
+        """
+        The content encoded in utf8, the source file is memory mapped instead of read unless the content has been
+        given. The result supports the buffer protocol, like bytes.
+        """
+        if not self._problem:
+            try:
+                return ProblemContentCache.mapped(Path(self._source))
+            except Exception as e:
+                raise InvalidSourceError(e)
+        return self._problem.encode('utf8')
+
     @property
     def name(self):
         return self._name
@@ -61,58 +78,78 @@ class ProblemWithStatus(Problem):
         return self._szs
 
 class TPTPProblem(ProblemWithStatus):
-    def __init__(self, name:str, source, problem:str, szs:SZSStatus):
-        super().__init__(name, source, problem, szs)
-
-    # A TPTP header
     """
-    %--------------------------------------------------------------------------
-    % File     : PLA003-1 : TPTP v7.0.0. Released v1.0.0.
-    % Domain   : Planning
-    % Problem  : Monkey and Bananas Problem
-    % Version  : Especial.
-    % English  :
-    
-    % Refs     :
-    % Source   : [SPRFN]
-    % Names    :
-    
-    % Status   : Unsatisfiable
-    % Rating   : 0.00 v5.3.0, 0.05 v5.2.0, 0.00 v2.2.1, 0.11 v2.1.0, 0.00 v2.0.0
-    % Syntax   : Number of clauses     :   11 (   0 non-Horn;   2 unit;   8 RR)
-    %            Number of atoms       :   20 (   0 equality)
-    %            Maximal clause size   :    2 (   2 average)
-    %            Number of predicates  :    1 (   0 propositional; 3-3 arity)
-    %            Number of functors    :   11 (   8 constant; 0-3 arity)
-    %            Number of variables   :   31 (   7 singleton)
-    %            Maximal term depth    :    2 (   2 average)
-    % SPC      : CNF_UNS_RFO_NEQ_HRN
-    
-    % Comments : Formulated as a state space.
-    %--------------------------------------------------------------------------
+    A problem of the TPTP library, its metadata is taken from its header (see TPTPHeader), which is parsed when it is
+    accessed first. Without an explicit status the status of the header is expected.
     """
-    #TODO everything else here
-    _regexFile = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexDomain = re.compile('% Domain(\s*):(\s*)(.*)') # ok
-    @staticmethod
-    def _parseDomain(content) -> str:
-        return TPTPProblem._regexDomain.search(content).group(3).strip()
-    _regexProblem = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexVersion = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexEnglish = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexRefs = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexSource = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexNames = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexStatus = re.compile('% Status(\s*):(\s*)(.*)')
-    @staticmethod
-    def _parseStatus(content) -> SZSStatus:
-        return SZSStatus.get(TPTPProblem._regexStatus.search(content).group(3).strip())
-    _regexRating = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexSPC = re.compile('% Domain(\s*):(\s*)(.*)')
-    _regexComments = re.compile('% Domain(\s*):(\s*)(.*)')
+    def __init__(self, name:str, source, problem:str, szs:SZSStatus=None, *,
+        header: TPTPHeader=None,
+    ):
+        super().__init__(name, source, problem, szs)
+        self._header = header
+
+    @property
+    def header(self) -> TPTPHeader:
+        """
+        The header, read from the problem if it has been loaded, otherwise from the start of its source file.
+        """
+        if self._header is None:
+            if self._problem:
+                self._header = TPTPHeader.parseText(self._problem)
+            else:
+                try:
+                    self._header = TPTPHeader.read(Path(self._source))
+                except OSError as e:
+                    raise InvalidSourceError(e)
+        return self._header
+
+    @property
+    def szsStatus(self):
+        if self._szs is None:
+            self._szs = self.header.status
+        return self._szs
+
+    def szs(self):
+        """
+        @depricated use szsStatus
+        """
+        return self.szsStatus
+
+    @property
+    def domain(self) -> str:
+        return self.header.domain
+
+    @property
+    def description(self) -> str:
+        """
+        The Problem field of the header.
+        """
+        return self.header.problem
+
+    @property
+    def version(self) -> str:
+        return self.header.version
+
+    @property
+    def rating(self) -> float:
+        return self.header.rating
+
+    @property
+    def ratings(self) -> List[Tuple[float, str]]:
+        return self.header.ratings
+
+    @property
+    def spc(self) -> str:
+        return self.header.spc
+
+    @property
+    def syntax(self) -> Dict[str, int]:
+        return self.header.syntax
 
     @classmethod
     def readFromFile(cls,path:Path):
-        content = path.read_text()
-        szs = cls._parseStatus(content)
-        return cls(path.name, path.absolute(), content, szs)
\ No newline at end of file
+        """
+        Reads the header only, the formulas are read when the problem is accessed.
+        """
+        header = TPTPHeader.read(path)
+        return cls(path.name, path.absolute(), None, header.status, header=header)
@@ -0,0 +1,112 @@
+import collections
+import mmap
+import os
+import threading
+from pathlib import Path
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024 # 256 MiB
+
+
+class ProblemContentCache:
+    """
+    The content of problem files, shared by all problems of the process.
+
+    Files are memory mapped, s.t. their bytes are paged in by the kernel on demand and not copied (mapped()). Decoded
+    text (text()) is kept in a least recently used cache of at most maxSize bytes of files, a file is read again when
+    it has been evicted or its mtime or size has changed.
+    """
+    _shared = None
+    _sharedLock = threading.Lock()
+
+    def __init__(self, *,
+        maxSize: int=DEFAULT_MAX_SIZE,
+    ):
+        """
+        :param maxSize: bytes of the files whose text is kept at most, 0 to keep none
+        """
+        self._maxSize = maxSize
+        self._size = 0
+        # (path, mtime, size) -> text, least recently used first
+        self._texts = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shared():
+        """
+        The cache of this process.
+        """
+        with ProblemContentCache._sharedLock:
+            if ProblemContentCache._shared is None:
+                ProblemContentCache._shared = ProblemContentCache()
+            return ProblemContentCache._shared
+
+    @staticmethod
+    def configure(*,
+        maxSize: int=DEFAULT_MAX_SIZE,
+    ):
+        """
+        Replaces the cache of this process.
+        """
+        with ProblemContentCache._sharedLock:
+            ProblemContentCache._shared = ProblemContentCache(maxSize=maxSize)
+            return ProblemContentCache._shared
+
+    def __len__(self):
+        return len(self._texts)
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes of the files whose text is cached.
+        """
+        return self._size
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @staticmethod
+    def mapped(path:Path):
+        """
+        The bytes of a file, memory mapped read-only. An empty file results in empty bytes, which cannot be mapped.
+        """
+        with open(str(path), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def text(self, path:Path) -> str:
+        """
+        The decoded content of a file.
+        """
+        stat = os.stat(str(path))
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            text = self._texts.get(key)
+            if text is not None:
+                self._texts.move_to_end(key)
+                self._hits += 1
+                return text
+            self._misses += 1
+        data = ProblemContentCache.mapped(path)
+        try:
+            text = str(data, 'utf8')
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        if stat.st_size > self._maxSize:
+            return text
+        with self._lock:
+            if key not in self._texts:
+                self._texts[key] = text
+                self._size += stat.st_size
+            while self._size > self._maxSize:
+                (_, _, size), _ = self._texts.popitem(last=False)
+                self._size -= size
+        return text
@@ -84,11 +84,22 @@ class SZSStatusMatch():
         SZSStatusMatch._nextIdentifier += 1
         return SZSStatusMatch._nextIdentifier - 1
 
+    _byCode = []
+
     def __init__(self, name, correct, sound):
         self._identifier = SZSStatusMatch._generateIdentifier()
         self._name = name
         self._correct = correct
         self._sound = sound
+        SZSStatusMatch._byCode.append(self)
+
+    @property
+    def code(self) -> int:
+        return self._identifier
+
+    @staticmethod
+    def byCode(code:int):
+        return SZSStatusMatch._byCode[code]
 
     def __eq__(self, other):
         if not isinstance(other, SZSStatusMatch):
@@ -123,6 +134,10 @@ class SZSStatus():
     _longNames = {}
     _children = []
     _parents = []
+    # all statuses by their identifier, set by _closeOntology()
+    _statuses = []
+    # flat len(_statuses)**2 table of the codes of SZSStatusMatch, see matches()
+    _matchTable = None
 
     @staticmethod
     def _generateIdentifier():
@@ -152,24 +167,104 @@ class SZSStatus():
     def __str__(self):
         return self._longName
 
-    def _isAncestor(self, other):
-        if self == other:
-            return True
-        for c in other._children:
-            if self._isAncestor(c):
-                return True
-        return False
+    @property
+    def code(self) -> int:
+        """
+        A small integer identifying the status, see byCode() and matchCodes().
+        """
+        return self._identifier
+
+    @staticmethod
+    def byCode(code:int):
+        return SZSStatus._statuses[code]
+
+    def _isDescendantOf(self, other):
+        """
+        Whether self is other or a descendant of other.
+        """
+        return (other._descendantBits >> self._identifier) & 1 == 1
+
+    def isAncestor(self, other) -> bool:
+        """
+        Whether self is other or an ancestor of other.
+        """
+        return (self._descendantBits >> other._identifier) & 1 == 1
+
+    def descendants(self) -> frozenset:
+        """
+        All descendants of self in the ontology, including self.
+        """
+        return SZSStatus._fromBits(self._descendantBits)
+
+    def ancestors(self) -> frozenset:
+        """
+        All ancestors of self in the ontology, including self.
+        """
+        return SZSStatus._fromBits(self._ancestorBits)
+
+    @staticmethod
+    def _fromBits(bits:int) -> frozenset:
+        return frozenset(s for s in SZSStatus._statuses if (bits >> s._identifier) & 1)
 
     def matches(self, other):
+        return SZSStatusMatch.byCode(SZSStatus._matchTable[self._identifier * len(SZSStatus._statuses) + other._identifier])
+
+    def _computeMatch(self, other):
         if self == self.SUC and not (other == self.SUC):
             return UNSOUND
-        if self._isAncestor(self.NOS):
+        if self._isDescendantOf(self.NOS):
             return NO_SUCCESS
-        if self._isAncestor(other):
+        if self._isDescendantOf(other):
             return CORRECT
-        if other._isAncestor(self):
+        if other._isDescendantOf(self):
             return CORRECT
         return UNSOUND
+
+    @staticmethod
+    def matchesAll(statuses, expected) -> list:
+        """
+        matches() of every pair of a status and its expected status.
+        :param statuses: SZSStatus or codes
+        :param expected: SZSStatus or codes, as many as statuses
+        :return: a SZSStatusMatch per pair
+        """
+        codes = SZSStatus.matchCodes(
+            [s._identifier if isinstance(s, SZSStatus) else s for s in statuses],
+            [s._identifier if isinstance(s, SZSStatus) else s for s in expected],
+        )
+        return [SZSStatusMatch.byCode(c) for c in codes]
+
+    @staticmethod
+    def matchCodes(codes, expectedCodes):
+        """
+        The SZSStatusMatch codes of every pair of a status code and its expected status code, for bulk evaluation.
+        numpy arrays are looked up at once and result in a numpy array, other sequences result in a list.
+        """
+        n = len(SZSStatus._statuses)
+        if type(codes).__module__ == 'numpy' or type(expectedCodes).__module__ == 'numpy':
+            import numpy
+            table = numpy.frombuffer(SZSStatus._matchTable, dtype=numpy.uint8).reshape(n, n)
+            return table[numpy.asarray(codes), numpy.asarray(expectedCodes)]
+        table = SZSStatus._matchTable
+        return [table[a * n + b] for a, b in zip(codes, expectedCodes)]
+
+    @staticmethod
+    def _closeOntology():
+        """
+        Precomputes the ancestor relation as bitsets over the identifiers and the results of matches() as table.
+        Called once, after all statuses have been created.
+        """
+        statuses = sorted(SZSStatus._shortNames.values(), key=lambda s: s._identifier)
+        SZSStatus._statuses = statuses
+        # children are created before their parents, hence in the order of the identifiers they are complete
+        for s in statuses:
+            bits = 1 << s._identifier
+            for c in s._children:
+                bits |= c._descendantBits
+            s._descendantBits = bits
+        for s in statuses:
+            s._ancestorBits = sum(1 << a._identifier for a in statuses if (a._descendantBits >> s._identifier) & 1)
+        SZSStatus._matchTable = bytes(a._computeMatch(b).code for a in statuses for b in statuses)
     
     @staticmethod
     def get(status:str):
@@ -270,3 +365,5 @@ SZSStatus.UNK = SZSStatus.Unknown       = SZSStatus("UNK", "Unknown", [SZSStatus
 SZSStatus.ASS = SZSStatus.Assumed       = SZSStatus("ASS", "Assumed",)
 # layer 0
 SZSStatus.NOS = SZSStatus.NoSuccess     = SZSStatus("NOS", "NoSuccess", [SZSStatus.OPN, SZSStatus.UNK, SZSStatus.ASS])
+
+SZSStatus._closeOntology()
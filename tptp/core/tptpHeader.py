@@ -0,0 +1,219 @@
+import io
+import re
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from .szs import SZSStatus
+
+
+class TPTPHeader:
+    """
+    The header of a TPTP problem, i.e. the leading block of % comments:
+
+    %--------------------------------------------------------------------------
+    % File     : PLA003-1 : TPTP v7.0.0. Released v1.0.0.
+    % Domain   : Planning
+    % Problem  : Monkey and Bananas Problem
+    % Version  : Especial.
+    % English  :
+
+    % Refs     :
+    % Source   : [SPRFN]
+    % Names    :
+
+    % Status   : Unsatisfiable
+    % Rating   : 0.00 v5.3.0, 0.05 v5.2.0, 0.00 v2.2.1, 0.11 v2.1.0, 0.00 v2.0.0
+    % Syntax   : Number of clauses     :   11 (   0 non-Horn;   2 unit;   8 RR)
+    %            Number of atoms       :   20 (   0 equality)
+    %            Maximal clause size   :    2 (   2 average)
+    %            Number of predicates  :    1 (   0 propositional; 3-3 arity)
+    %            Number of functors    :   11 (   8 constant; 0-3 arity)
+    %            Number of variables   :   31 (   7 singleton)
+    %            Maximal term depth    :    2 (   2 average)
+    % SPC      : CNF_UNS_RFO_NEQ_HRN
+
+    % Comments : Formulated as a state space.
+    %--------------------------------------------------------------------------
+
+    The block is split into its fields in a single pass, reading stops at the first line which is not a comment, s.t.
+    the formulas of a problem are never read. The fields are converted to typed values when they are accessed.
+    """
+    # '% Key : value', the key starts right after '% '
+    _FIELD = re.compile(r'%\s?([A-Za-z][A-Za-z ]*?)\s*:\s?(.*)')
+    # '%        : value' or '%        value', continuing the previous field
+    _CONTINUATION = re.compile(r'%\s+(?::\s?)?(.*)')
+    _RATING = re.compile(r'(\d+(?:\.\d+)?)\s+v(\d+(?:\.\d+)*)')
+    _STATISTIC = re.compile(r'([A-Za-z][A-Za-z ]*?)\s*:\s*(\d+)\s*(.*)')
+    _DETAILS = re.compile(r'\(([^)]*)\)')
+
+    def __init__(self, fields:Dict[str, List[str]]):
+        """
+        :param fields: the lines of every field by its key, see parse()
+        """
+        self._fields = fields
+
+    @staticmethod
+    def read(path:Path):
+        """
+        Reads the header of a problem file, without reading the rest of the file.
+        """
+        with Path(path).open(encoding='utf8', errors='replace') as f:
+            return TPTPHeader.parse(f)
+
+    @staticmethod
+    def parseText(text:str):
+        return TPTPHeader.parse(io.StringIO(text))
+
+    @staticmethod
+    def parse(lines):
+        """
+        :param lines: an iterable of the lines of a problem, consumed up to the end of the header
+        """
+        fields = {}
+        current = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                current = None
+                continue
+            if not line.startswith('%'):
+                break
+            if line.startswith('%--'):
+                current = None
+                continue
+            m = TPTPHeader._FIELD.match(line)
+            # indented lines continue a field, even if they contain a colon, e.g. the syntax statistics
+            if m and not line.startswith('%  '):
+                current = fields.setdefault(m.group(1), [])
+                current.append(m.group(2).strip())
+                continue
+            if current is not None:
+                m = TPTPHeader._CONTINUATION.match(line)
+                current.append(m.group(1).strip() if m else line[1:].strip())
+        return TPTPHeader(fields)
+
+    @property
+    def fields(self) -> Dict[str, str]:
+        """
+        All fields by their key, lines of a field spanning several lines are joined by newlines.
+        """
+        return {k: self.field(k) for k in self._fields}
+
+    def field(self, key:str) -> str:
+        """
+        The value of a field, None if the header has no such field.
+        """
+        lines = self._fields.get(key)
+        if lines is None:
+            return None
+        return '\n'.join(lines).strip()
+
+    @property
+    def file(self) -> str:
+        """
+        The name of the problem from the File field, e.g. PLA003-1.
+        """
+        value = self.field('File')
+        return value.split(':')[0].strip() if value else None
+
+    @property
+    def domain(self) -> str:
+        return self.field('Domain')
+
+    @property
+    def problem(self) -> str:
+        return self.field('Problem')
+
+    @property
+    def version(self) -> str:
+        return self.field('Version')
+
+    @property
+    def english(self) -> str:
+        return self.field('English')
+
+    @property
+    def refs(self) -> List[str]:
+        value = self.field('Refs')
+        return value.split('\n') if value else []
+
+    @property
+    def source(self) -> str:
+        return self.field('Source')
+
+    @property
+    def names(self) -> str:
+        return self.field('Names')
+
+    @property
+    def status(self) -> SZSStatus:
+        """
+        :raise UnknownSZSStatusError: if the status is not part of the SZS ontology
+        """
+        value = self.field('Status')
+        if not value:
+            return None
+        return SZSStatus.get(value.split()[0])
+
+    @property
+    def ratings(self) -> List[Tuple[float, str]]:
+        """
+        The rating by every TPTP version which changed it, latest first, e.g. [(0.0, '5.3.0'), (0.05, '5.2.0')].
+        """
+        value = self.field('Rating')
+        if not value:
+            return []
+        return [(float(r), v) for r, v in TPTPHeader._RATING.findall(value)]
+
+    @property
+    def rating(self) -> float:
+        """
+        The current rating, None if the problem has not been rated.
+        """
+        ratings = self.ratings
+        return ratings[0][0] if ratings else None
+
+    @property
+    def spc(self) -> str:
+        """
+        The specialist problem class, e.g. CNF_UNS_RFO_NEQ_HRN.
+        """
+        return self.field('SPC')
+
+    @property
+    def syntax(self) -> Dict[str, int]:
+        """
+        The syntax statistics by their name, e.g. {'Number of clauses': 11, 'Number of atoms': 20}.
+        """
+        return {name: value for name, (value, details) in self._syntax().items()}
+
+    @property
+    def syntaxDetails(self) -> Dict[str, Dict[str, str]]:
+        """
+        The parenthesized details of the syntax statistics by their name, e.g.
+        {'Number of atoms': {'equality': '0'}, 'Number of functors': {'constant': '8', 'arity': '0-3'}}.
+        """
+        return {name: details for name, (value, details) in self._syntax().items()}
+
+    def _syntax(self) -> Dict[str, Tuple[int, Dict[str, str]]]:
+        statistics = {}
+        details = None
+        for line in self._fields.get('Syntax', []):
+            m = TPTPHeader._STATISTIC.match(line)
+            if m:
+                details = {}
+                statistics[m.group(1)] = (int(m.group(2)), details)
+                line = m.group(3)
+            if details is None:
+                continue
+            # details may continue on the next lines
+            for group in TPTPHeader._DETAILS.findall(line):
+                for item in group.split(';'):
+                    parts = item.split(None, 1)
+                    if len(parts) == 2:
+                        details[parts[1].strip()] = parts[0]
+        return statistics
+
+    @property
+    def comments(self) -> str:
+        return self.field('Comments')
@@ -1,11 +1,13 @@
-import os
-import tempfile
-
 from ..core import Problem
+from ..utils.tempFile import TempFileManager
 
 
 def modifyProblemSourceTemporary(problem:Problem):
-    f = tempfile.NamedTemporaryFile(mode='w', delete=False)
-    f.write(problem.problem())
-    problem._source = os.path.abspath(f.name)
-    f.close()
+    """
+    Points the source of the problem to a file of the scratch area holding its content.
+    The file is shared by all problems with the same content, release it by releaseProblemSourceTemporary(problem).
+    """
+    problem._source = TempFileManager.scratchArea().acquire(problem.problem(), suffix='.p')
+
+def releaseProblemSourceTemporary(problem:Problem):
+    TempFileManager.scratchArea().release(problem.source)
@@ -6,6 +6,8 @@ from .toolEncoder import CliToolEncoder
 from .toolSystemOnTPTP import CliToolSystemOnTPTP
 from .toolLocalSolver import CliToolLocalSolver
 from .toolCompetition import CliToolCompetition
+from .toolArchive import CliToolArchive
+from .toolIndex import CliToolIndex
 from .toolBase import CliToolBase
 
 
@@ -29,7 +31,7 @@ def parse_args(tools:List[CliToolBase]):
 
 
 def main():
-    activatedTools = [CliToolSystemOnTPTP, CliToolCompetition, CliToolLocalSolver, CliToolEncoder]
+    activatedTools = [CliToolSystemOnTPTP, CliToolCompetition, CliToolLocalSolver, CliToolEncoder, CliToolArchive, CliToolIndex]
     args, actionList = parse_args(activatedTools)
     actionList[args.tool](args)
 
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+
+from ...utils.streamArchive import StreamArchiveReader
+from .toolBase import CliToolBase
+
+class CliToolArchive(CliToolBase):
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    @classmethod
+    def getInstance(cls):
+        return cls('archive')
+
+    def run(self, args):
+        reader = StreamArchiveReader(Path(args.archive))
+        if args.task == 'list':
+            for name in reader.names():
+                print(name)
+        elif args.task == 'extract':
+            if not args.entry in reader:
+                print('No entry ' + args.entry + ' in ' + args.archive + '.', file=sys.stderr)
+                sys.exit(1)
+            content = reader.read(args.entry)
+            if args.output_file:
+                Path(args.output_file).write_bytes(content)
+            else:
+                sys.stdout.buffer.write(content)
+
+    def parseArgs(self, toolParser):
+        toolSubParsers = toolParser.add_subparsers()
+        listParser = toolSubParsers.add_parser('list')
+        listParser.set_defaults(task='list')
+        listParser.add_argument('archive', help='archive file, e.g. streams.tpa in the output directory of a competition')
+
+        extractParser = toolSubParsers.add_parser('extract')
+        extractParser.set_defaults(task='extract')
+        extractParser.add_argument('archive', help='archive file, e.g. streams.tpa in the output directory of a competition')
+        extractParser.add_argument('entry', help='name of the entry, e.g. leo3-SYN001+1.p.stdout')
+        extractParser.add_argument('--output-file', help='file the entry is written to (default is stdout)', required=False)
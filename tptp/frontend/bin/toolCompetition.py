@@ -6,6 +6,14 @@ from typing import Iterable, List
 from ...reasoning import SolverResult
 from .toolBase import CliToolBase
 from ...competition import casc
+from ...competition.journal import CompetitionJournal
+from ...competition.schedulingPolicy import SCHEDULING_POLICIES, RuntimeHistory
+from ...reasoning.resultCache import SolverResultCache, DEFAULT_CACHE_DIR_PATH
+from ...utils.concurrent.coreAllocator import CoreAllocator
+from ...utils.concurrent.processSupervisor import ProcessSupervisor
+from ...utils.tempFile import TempFileManager, ScratchArea
+from ...core.problemContent import ProblemContentCache
+from ...reasoning.localSolver import SZSAnswerWatcher
 
 
 class CliToolCompetition(CliToolBase):
@@ -23,19 +31,14 @@ class CliToolCompetition(CliToolBase):
         return cls('competition')
 
     def drawCallback(self, results:List[SolverResult]):
-        if len(results) % len(self.competitionInstance.solvers()) == 0:
-            self.draw(results)
-
-    def draw(self, results:List[SolverResult]):
-        unsoundSolverSet = set(map(lambda r: r.call.solver, filter(lambda r: not r.matches().isSound(), results)))
-        unsoundSolvers = {k:v for k in unsoundSolverSet for v in [' - unsound']*len(unsoundSolverSet)}
-        timeDict = {k:v for k in self.competitionInstance.solvers() for v in [0.0]*len(self.competitionInstance.solvers())}
-        for r in results:
-            if r.matches().isCorrect():
-                timeDict[r.call.solver] += r.wc
-        textDict = {k:str(round(v,4)) + unsoundSolvers.get(k,'') for (k,v) in timeDict.items()}
-        chart = self.competitionInstance.getDefaultSolvedFigure()(self.competitionInstance.name(), results=results)
-        fig = chart.figure(solvedAxisWidth=len(self.competitionInstance.problems()), text=textDict, solverAxisTitle='number of correct solutions')
+        if len(results) % self.competitionInstance.numSolvers() == 0:
+            self.draw()
+
+    def draw(self):
+        leaderboard = self.competitionInstance.leaderboard()
+        textDict = {s:str(round(standing.correctTime,4)) + (' - unsound' if standing.isUnsound else '') for (s,standing) in leaderboard.standings().items()}
+        chart = self.competitionInstance.getDefaultSolvedFigure()(self.competitionInstance.name(), leaderboard=leaderboard)
+        fig = chart.figure(solvedAxisWidth=self.competitionInstance.numProblems(), text=textDict, solverAxisTitle='number of correct solutions')
         fig.show()
 
     def run(self, args):
@@ -46,21 +49,78 @@ class CliToolCompetition(CliToolBase):
             sys.exit(1)
         
         competitionClass = CliToolCompetition.AVAILABLE_COMPETITIONS.get(configuration.COMPETITION_TYPE)
+        if args.jobs < 1:
+            print("--jobs must be at least 1, not {}.".format(args.jobs))
+            sys.exit(1)
+        journal = None
+        if args.journal:
+            journal = Path(args.journal)
+        elif args.output:
+            journal = Path(args.output) / 'journal.jsonl'
+        if args.resume and not journal:
+            print("Resuming a competition requires --journal or --output.")
+            sys.exit(1)
+
+        history = RuntimeHistory()
+        for h in args.history:
+            history.addEntries(CompetitionJournal(Path(h)).entries())
+
+        coreAllocator = None
+        if args.pin_cores:
+            try:
+                coreAllocator = CoreAllocator(args.jobs, coresPerSlot=args.cores_per_call, avoidSmt=args.avoid_smt)
+            except ValueError as e:
+                print(e)
+                sys.exit(1)
+
+        # encoded problems are written to the scratch area
+        TempFileManager.configureScratchArea(
+            directory=Path(args.scratch_dir) if args.scratch_dir else None,
+            maxSize=args.scratch_size * 1024 * 1024 if args.scratch_size > 0 else None,
+        )
+        ProblemContentCache.configure(maxSize=args.problem_cache_size * 1024 * 1024)
+
+        supervisor = ProcessSupervisor() if args.event_loop else None
         competitionInstance = competitionClass.configure(configurationModulePath, 
             verbose=args.verbose,
             silent=args.silent,
             colored=args.colored,
-            outputDir=Path(args.output) if args.output else None
+            outputDir=Path(args.output) if args.output else None,
+            parallelism=args.jobs,
+            journal=journal,
+            resume=args.resume,
+            cache=SolverResultCache(Path(args.cache), maxSize=args.cache_size * 1024 * 1024) if args.cache else None,
+            fsyncInterval=args.fsync_interval if args.fsync_interval > 0 else None,
+            outputArchive=args.output_archive,
+            schedulingPolicy=SCHEDULING_POLICIES[args.schedule](),
+            history=history,
+            etaInterval=args.eta_interval if args.eta_interval > 0 else None,
+            memoryLimit=args.memory_limit,
+            coreAllocator=coreAllocator,
+            earlyTermination=args.early_termination,
+            captureLimit=args.capture_limit * 1024 * 1024 if args.capture_limit else None,
+            spillOutput=args.spill_output,
+            supervisor=supervisor,
         )
         self.competitionInstance = competitionInstance
 
+        if args.dry_run:
+            competitionInstance.dryRun()
+            if supervisor:
+                supervisor.close()
+            return
+
         if args.liveplot:
             competitionInstance.addResultCallback(self.drawCallback)
         
-        competitionInstance.run()
+        try:
+            competitionInstance.run()
+        finally:
+            if supervisor:
+                supervisor.close()
 
         if args.finalplot:
-            self.draw(competitionInstance.results())
+            self.draw()
 
     def parseArgs(self, toolSubParser):
         toolSubParser.add_argument('configuration', 
@@ -82,6 +142,96 @@ class CliToolCompetition(CliToolBase):
             help='dictionary where the output of the competition and all solvers should be stored',
             required=False,
         )
+        toolSubParser.add_argument('--jobs',
+            help='number of solver calls executed in parallel (default is 1)',
+            type=int, default=1,
+        )
+        toolSubParser.add_argument('--schedule',
+            help='order of the solver calls (default is config): config keeps the order of the configuration, '
+                'lpt runs the longest calls first (shortest makespan), sjf the shortest calls first (fast feedback), '
+                'round-robin alternates between the solvers; runtimes are estimated from the journal and --history',
+            choices=sorted(SCHEDULING_POLICIES.keys()), default='config',
+        )
+        toolSubParser.add_argument('--history',
+            help='journal of a previous run whose runtimes are used to schedule the solver calls, may be given multiple times',
+            action='append', default=[],
+        )
+        toolSubParser.add_argument('--pin-cores',
+            help='pins every parallel solver call to cpus of its own',
+            action='store_const', default=False, const=True,
+        )
+        toolSubParser.add_argument('--cores-per-call',
+            help='number of cpus of a pinned solver call (default is all cpus divided by --jobs)',
+            type=int, default=None,
+        )
+        toolSubParser.add_argument('--avoid-smt',
+            help='pins solver calls to one cpu per physical core only, s.t. no call shares a core with its SMT sibling',
+            action='store_const', default=False, const=True,
+        )
+        toolSubParser.add_argument('--early-termination',
+            help='terminates a solver as soon as it has printed its SZS status (status) or its status and its SZS output block (output)',
+            choices=SZSAnswerWatcher.MODES, default=None,
+        )
+        toolSubParser.add_argument('--event-loop',
+            help='watches all running solvers on a single event loop instead of one thread per solver',
+            action='store_true',
+        )
+        toolSubParser.add_argument('--capture-limit',
+            help='MiB of stdout and of stderr of a solver call kept in memory, the start and the end of longer output are kept',
+            type=int, default=None,
+        )
+        toolSubParser.add_argument('--spill-output',
+            help='keeps the output beyond --capture-limit in temporary files instead of dropping it',
+            action='store_true',
+        )
+        toolSubParser.add_argument('--memory-limit',
+            help='maximum memory of a solver call in MiB, overrides MEMORY_LIMIT of the configuration; calls exceeding it result in MemoryOut',
+            type=int, default=None,
+        )
+        toolSubParser.add_argument('--eta-interval',
+            help='seconds between two forecasts of the remaining runtime, 0 disables them (default is 60)',
+            type=float, default=60.0,
+        )
+        toolSubParser.add_argument('--dry-run',
+            help='estimates the runtime and cost of the competition without running any solver',
+            action='store_const', default=False, const=True,
+        )
+        toolSubParser.add_argument('--output-archive',
+            help='stores stdout and stderr of all solver calls in the single archive streams.tpa in the output directory (see the archive tool)',
+            action='store_const', default=False, const=True,
+        )
+        toolSubParser.add_argument('--fsync-interval',
+            help='seconds between two fsyncs of the output files, 0 disables fsync (default is 5)',
+            type=float, default=5.0,
+        )
+        toolSubParser.add_argument('--journal',
+            help='file where every finished solver call is journaled (default is journal.jsonl in the output directory)',
+            required=False,
+        )
+        toolSubParser.add_argument('--resume',
+            help='skips all solver calls already recorded in the journal',
+            action='store_const', default=False, const=True,
+        )
+        toolSubParser.add_argument('--cache',
+            help='reuses results of identical solver calls stored in this directory (default is {})'.format(DEFAULT_CACHE_DIR_PATH),
+            nargs='?', const=str(DEFAULT_CACHE_DIR_PATH), default=None,
+        )
+        toolSubParser.add_argument('--cache-size',
+            help='maximum size of the result cache in MiB (default is 1024)',
+            type=int, default=1024,
+        )
+        toolSubParser.add_argument('--scratch-dir',
+            help='directory for encoded problems, preferably a tmpfs (default is {})'.format(ScratchArea.defaultDirectory()),
+            default=None,
+        )
+        toolSubParser.add_argument('--scratch-size',
+            help='maximum size of the encoded problems in the scratch directory in MiB, further ones are written to the temporary directory (default is 512, 0 for no limit)',
+            type=int, default=512,
+        )
+        toolSubParser.add_argument('--problem-cache-size',
+            help='maximum size of the problems whose text is kept in memory in MiB, problem files are memory mapped otherwise (default is 256)',
+            type=int, default=256,
+        )
         toolSubParser.add_argument('--liveplot', 
             help='uses plotly to print the competition state on a regular interval',
             action='store_const', default=False, const=True,
@@ -0,0 +1,52 @@
+from pathlib import Path
+
+from ...benchmark.problemIndex import ProblemIndex, DEFAULT_INDEX_PATH
+from .toolBase import CliToolBase
+
+class CliToolIndex(CliToolBase):
+    def __init__(self, name: str):
+        super().__init__(name)
+
+    @classmethod
+    def getInstance(cls):
+        return cls('index')
+
+    def run(self, args):
+        index = ProblemIndex(Path(args.index))
+        if args.task == 'update':
+            for root in args.root:
+                scanned, unchanged, removed = index.update(Path(root), workers=args.workers)
+                print('{}: {} scanned, {} unchanged, {} removed'.format(root, scanned, unchanged, removed))
+        elif args.task == 'query':
+            problems = index.query(
+                status=args.status,
+                form=args.form,
+                spc=args.spc,
+                domain=args.domain,
+                minRating=args.min_rating,
+                maxRating=args.max_rating,
+                maxSize=args.max_size,
+                limit=args.limit,
+            )
+            for p in problems:
+                print('{} {}'.format(p.source, p.szsStatus))
+
+    def parseArgs(self, toolParser):
+        toolParser.add_argument('--index', help='the index database (default {})'.format(DEFAULT_INDEX_PATH), default=str(DEFAULT_INDEX_PATH))
+        toolSubParsers = toolParser.add_subparsers(dest='task')
+        toolSubParsers.required = True
+        updateParser = toolSubParsers.add_parser('update')
+        updateParser.set_defaults(task='update')
+        updateParser.add_argument('root', nargs='+', help='root directory of a TPTP library, only new and changed problems are scanned')
+        updateParser.add_argument('--workers', type=int, help='processes scanning problems (default one per cpu)', default=None)
+
+        queryParser = toolSubParsers.add_parser('query')
+        queryParser.set_defaults(task='query')
+        queryParser.add_argument('--status', nargs='+', help='SZS statuses, e.g. THM, including their descendants', default=None)
+        queryParser.add_argument('--form', nargs='+', help='forms of the specialist problem class, e.g. TF0 FOF', default=None)
+        queryParser.add_argument('--spc', help='prefix of the specialist problem class, e.g. TF0_THM_EQU', default=None)
+        queryParser.add_argument('--domain', help='domain, e.g. Syntactic', default=None)
+        queryParser.add_argument('--min-rating', type=float, help='lowest rating, inclusive', default=None)
+        queryParser.add_argument('--max-rating', type=float, help='highest rating, inclusive', default=None)
+        queryParser.add_argument('--max-size', type=int, help='largest problem file in bytes', default=None)
+        queryParser.add_argument('--limit', type=int, help='number of problems at most', default=None)
@@ -4,6 +4,7 @@ from ...core.problem import Problem
 from ...reasoning.localSolver import LocalSolver, LocalSolverCall
 from .toolBase import CliToolBase
 from ...reasoning import getLocalSolvers, getLocalSolver
+from ...reasoning.resultCache import SolverResultCache, DEFAULT_CACHE_DIR_PATH
 
 class CliToolLocalSolver(CliToolBase):
     def __init__(self, name: str):
@@ -23,13 +24,16 @@ class CliToolLocalSolver(CliToolBase):
             solver = getLocalSolver(
                 name=args.solver_name,
             )
-            call = solver.call(problem, timeout=args.timeout)
+            cache = SolverResultCache(Path(args.cache)) if args.cache else None
+            call = solver.call(problem, timeout=args.timeout, cache=cache)
             
             print('% SZS status Started for {}'.format(call))
             result = call.run()
             print('% SZS status {result}'.format(
                 result=result,
             ))
+            if cache:
+                print('% Result cache: {}'.format(cache))
             if result.exception:
                 print(result.exception)
             if args.verbose:
@@ -43,13 +47,16 @@ class CliToolLocalSolver(CliToolBase):
                 name=args.solver_name, 
                 command=args.solver_command,
             )
-            call = solver.call(problem, timeout=args.timeout)
+            cache = SolverResultCache(Path(args.cache)) if args.cache else None
+            call = solver.call(problem, timeout=args.timeout, cache=cache)
 
             print('% SZS status Started for {}'.format(call))
             result = call.run()
             print('% SZS status {result}'.format(
                 result=result,
             ))
+            if cache:
+                print('% Result cache: {}'.format(cache))
             if result.exception:
                 print(result.exception)
             if args.verbose:
@@ -68,6 +75,10 @@ class CliToolLocalSolver(CliToolBase):
             help='generates a more verbose output',
             action='store_const', default=False, const=True,
         )
+        requestparser.add_argument('--cache',
+            help='reuses results of identical solver calls stored in this directory (default is {})'.format(DEFAULT_CACHE_DIR_PATH),
+            nargs='?', const=str(DEFAULT_CACHE_DIR_PATH), default=None,
+        )
         requestparser.set_defaults(timeout=60)
 
 
@@ -80,6 +91,10 @@ class CliToolLocalSolver(CliToolBase):
             help='generates a more verbose output',
             action='store_const', default=False, const=True,
         )
+        requestparser.add_argument('--cache',
+            help='reuses results of identical solver calls stored in this directory (default is {})'.format(DEFAULT_CACHE_DIR_PATH),
+            nargs='?', const=str(DEFAULT_CACHE_DIR_PATH), default=None,
+        )
         requestparser.set_defaults(timeout=60)
 
         listParser = toolSubParsers.add_parser('list-solvers')
@@ -1,16 +1,24 @@
 from typing import Iterable, Dict, Sequence
 import plotly.graph_objects as go
 
-from .common import createDict, sortSolvers
+from .common import sortSolvers
 from ...utils.color import DECENT_COLORS, NAMED_CSS_COLORS
 from ...reasoning import SolverResult, Solver
+from ...benchmark.leaderboard import Leaderboard
 from .dummyResults import dummyResults
 
 
 class SolvedChart:
-    def __init__(self, name:str, results:Iterable[SolverResult]):
+    def __init__(self, name:str, results:Iterable[SolverResult]=None, *,
+        leaderboard:Leaderboard=None,
+    ):
+        """
+        :param results: results to be aggregated, ignored if a leaderboard is given
+        :param leaderboard: aggregated results, e.g. the leaderboard of a running competition
+        """
         self.name = name
         self.results = results
+        self.leaderboard = leaderboard if leaderboard else Leaderboard.fromResults(results if results else [])
 
     def __repr__(self):
         return self.__class__.__name__ + self.name
@@ -35,8 +43,10 @@ class SolvedPerSolverChart(SolvedChart):
     """
     Every solver possesses one bar that accounts for successfully solved problems.
     """
-    def __init__(self, name: str, results: Iterable[SolverResult]):
-        super().__init__(name, results=results)
+    def __init__(self, name: str, results: Iterable[SolverResult]=None, *,
+        leaderboard:Leaderboard=None,
+    ):
+        super().__init__(name, results=results, leaderboard=leaderboard)
 
     def _trace(self,
             computation:str,
@@ -53,13 +63,11 @@ class SolvedPerSolverChart(SolvedChart):
         if not orientation in LEGAL_ORIENTATIONS:
             raise Exception('Illegal orientation parameter. Choices are:', str(LEGAL_ORIENTATIONS))
 
-        dictResults = createDict(self.results) # TODO wrap this in a benchmark wrapper
-
         # establish the order in which solvers are displayed
         if solverOrder:
             solvers = solverOrder
         else:
-            solvers = sortSolvers(dictResults.keys())
+            solvers = sortSolvers(self.leaderboard.solvers())
 
         # establish names for the solvers
         if solverNames:
@@ -69,9 +77,9 @@ class SolvedPerSolverChart(SolvedChart):
 
         # calculate result values
         if computation == 'solved':
-            values = list(map(lambda s: len(list(filter(lambda r: r.matches().isCorrect(), dictResults[s]))), solvers))
+            values = list(map(lambda s: self.leaderboard.standing(s).solved, solvers))
         else: # computation == 'all'
-            values = list(map(lambda s: len(dictResults[s]), solvers))
+            values = list(map(lambda s: self.leaderboard.standing(s).attempted, solvers))
 
         # establish text displayed on solver bars
         if text:
@@ -0,0 +1,379 @@
+import hashlib
+import mmap
+import os
+import re
+import threading
+from pathlib import Path
+from typing import FrozenSet, Iterator, List, Tuple
+
+from ..core import Problem, ProblemWithStatus
+from ..core.problemContent import ProblemContentCache
+
+
+class IncludeError(Exception):
+    pass
+
+
+# comments, quoted atoms and strings, parentheses, dots and runs of anything else
+_TOKENS = re.compile(r"%[^\n]*|/\*.*?\*/|'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|[().]|[^%/'\"().]+|/", re.S)
+_HEAD = re.compile(r"([a-z_]+)\s*\(\s*('(?:[^'\\]|\\.)*'|[A-Za-z0-9_$]+)")
+_INCLUDE = re.compile(r"include\s*\(\s*'((?:[^'\\]|\\.)*)'\s*(?:,\s*\[(.*)\])?\s*\)\s*\.$", re.S)
+_NAME = re.compile(r"'(?:[^'\\]|\\.)*'|[^,\s]+")
+
+def _statements(text:str) -> Iterator[Tuple[int, int]]:
+    """
+    The spans of the top level statements of a TPTP text, i.e. annotated formulas and includes, without comments.
+    """
+    depth = 0
+    start = None
+    for m in _TOKENS.finditer(text):
+        t = m.group(0)
+        if t[0] == '%' or t.startswith('/*'):
+            continue
+        if start is None:
+            stripped = t.lstrip()
+            if not stripped:
+                continue
+            start = m.start() + len(t) - len(stripped)
+        if t == '(':
+            depth += 1
+        elif t == ')':
+            depth -= 1
+        elif t == '.' and depth == 0:
+            yield start, m.end()
+            start = None
+
+def _include(statement:str):
+    """
+    The path and the selected names (None for all) of an include statement, None for any other statement.
+    """
+    if not statement.startswith('include'):
+        return None
+    m = _INCLUDE.match(statement)
+    if not m:
+        raise IncludeError('Malformed include: {}'.format(statement))
+    names = _NAME.findall(m.group(2)) if m.group(2) is not None else None
+    return m.group(1), names
+
+
+class IncludedFile:
+    """
+    The annotated formulas of a file, its own includes expanded.
+    """
+    def __init__(self, path:Path, formulas:List[Tuple[str, str]], *,
+        dependencies: FrozenSet[Tuple[str, int, int]]=frozenset(),
+        unresolved: List[str]=(),
+    ):
+        """
+        :param formulas: the name and the text of every formula, an include which has not been found is kept as a
+            statement without a name
+        :param dependencies: the (path, mtime, size) of the file and of all files it includes, directly or not
+        :param unresolved: the includes which have not been found
+        """
+        self._path = path
+        self._formulas = formulas
+        self._dependencies = dependencies
+        self._unresolved = list(unresolved)
+        self._byName = None
+        self._text = None
+        self._digest = None
+
+    def __len__(self):
+        return len(self._formulas)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def formulas(self) -> List[Tuple[str, str]]:
+        return self._formulas
+
+    @property
+    def dependencies(self) -> FrozenSet[Tuple[str, int, int]]:
+        return self._dependencies
+
+    @property
+    def unresolved(self) -> List[str]:
+        return self._unresolved
+
+    @property
+    def text(self) -> str:
+        """
+        All formulas, one per line. Built once, expanding a complete include is free afterwards.
+        """
+        if self._text is None:
+            self._text = ''.join(f + '\n' for _, f in self._formulas)
+        return self._text
+
+    @property
+    def digest(self) -> str:
+        """
+        SHA-256 of the text, i.e. of the formulas of the file and of the files it includes.
+        """
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.text.encode('utf8')).hexdigest()
+        return self._digest
+
+    def selectFormulas(self, names:List[str]) -> List[Tuple[str, str]]:
+        """
+        The formulas with the given names, in the order of the names.
+        :raise IncludeError: if a name is not a formula of the file
+        """
+        if self._byName is None:
+            self._byName = {}
+            for name, formula in self._formulas:
+                self._byName.setdefault(name, []).append((name, formula))
+        missing = [n for n in names if n not in self._byName]
+        if missing:
+            raise IncludeError('{} has no formulas named {}.'.format(self._path, ', '.join(missing)))
+        return [f for n in names for f in self._byName[n]]
+
+    def select(self, names:List[str]) -> str:
+        """
+        The formulas with the given names, one per line.
+        :raise IncludeError: if a name is not a formula of the file
+        """
+        return ''.join(f + '\n' for _, f in self.selectFormulas(names))
+
+
+class AxiomCache:
+    """
+    Included files, parsed once per process and shared by all problems including them. A file is parsed again when
+    its mtime or size or the ones of a file it includes have changed, replacing its previous version.
+    """
+    _shared = None
+    _sharedLock = threading.Lock()
+
+    def __init__(self):
+        # (path, mtime, size) -> IncludedFile
+        self._files = {}
+        # path -> the key of its current version
+        self._keys = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shared():
+        with AxiomCache._sharedLock:
+            if AxiomCache._shared is None:
+                AxiomCache._shared = AxiomCache()
+            return AxiomCache._shared
+
+    def __len__(self):
+        return len(self._files)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def clear(self):
+        with self._lock:
+            self._files = {}
+            self._keys = {}
+
+    @staticmethod
+    def _key(path:Path) -> Tuple[str, int, int]:
+        stat = os.stat(str(path))
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    @staticmethod
+    def _isCurrent(included:IncludedFile) -> bool:
+        """
+        Whether none of the files of a parsed file has changed since.
+        """
+        try:
+            return all(AxiomCache._key(d[0]) == d for d in included.dependencies)
+        except OSError:
+            return False
+
+    def get(self, path:Path, resolver, *,
+        loading: FrozenSet[str]=frozenset(),
+    ) -> IncludedFile:
+        """
+        :param resolver: the IncludeResolver finding the files included by path
+        :param loading: the files including path, to detect cyclic includes
+        :raise IncludeError: if an include has not been found and the resolver does not keep unresolved includes
+        """
+        key = AxiomCache._key(path)
+        with self._lock:
+            included = self._files.get(key)
+        if included is not None and AxiomCache._isCurrent(included):
+            with self._lock:
+                self._hits += 1
+        else:
+            included = self._load(path, key, resolver, loading)
+        # parsed by a resolver which keeps unresolved includes
+        if included.unresolved and not resolver.keepUnresolved:
+            raise IncludeError('{} included by {} has not been found.'.format(included.unresolved[0], path))
+        return included
+
+    def _load(self, path:Path, key:Tuple[str, int, int], resolver, loading:FrozenSet[str]) -> IncludedFile:
+        """
+        Parses a file without holding the lock, threads loading the same version concurrently keep the first one
+        published.
+        """
+        if key[0] in loading:
+            raise IncludeError('{} includes itself.'.format(path))
+        with self._lock:
+            self._misses += 1
+        included = self._parse(path, key, resolver, loading | {key[0]})
+        with self._lock:
+            published = self._files.get(key)
+            if published is not None and published.dependencies == included.dependencies:
+                return published
+            self._files[key] = included
+            # one version per path is kept
+            superseded = self._keys.get(key[0])
+            if superseded is not None and superseded != key:
+                self._files.pop(superseded, None)
+            self._keys[key[0]] = key
+            return included
+
+    def _parse(self, path:Path, key:Tuple[str, int, int], resolver, loading:FrozenSet[str]) -> IncludedFile:
+        data = ProblemContentCache.mapped(path)
+        try:
+            text = str(data, 'utf8')
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+        formulas = []
+        dependencies = {key}
+        unresolved = []
+        for start, end in _statements(text):
+            statement = text[start:end]
+            include = _include(statement)
+            if include is None:
+                m = _HEAD.match(statement)
+                formulas.append((m.group(2) if m else None, statement))
+                continue
+            includedPath = resolver.find(include[0], directory=path.parent)
+            if includedPath is None:
+                if not resolver.keepUnresolved:
+                    raise IncludeError('{} included by {} has not been found.'.format(include[0], path))
+                formulas.append((None, statement))
+                unresolved.append(include[0])
+                continue
+            included = self.get(includedPath, resolver, loading=loading)
+            formulas += included.formulas if include[1] is None else included.selectFormulas(include[1])
+            dependencies |= included.dependencies
+            unresolved += included.unresolved
+        return IncludedFile(path, formulas, dependencies=frozenset(dependencies), unresolved=unresolved)
+
+
+class IncludeResolver:
+    """
+    Expands the includes of TPTP problems, resulting in self-contained problems, e.g. for a remote solver.
+
+    An include is searched relative to the directory of the including file first, then relative to the root of the
+    TPTP library the file is part of (the directory containing its Problems or Axioms directory) and finally relative
+    to the given root or $TPTP. Included
+    files are parsed once per process by the AxiomCache, s.t. problems including the same axioms are expanded at the
+    cost of joining strings.
+    """
+    def __init__(self, *,
+        root: Path=None,
+        cache: AxiomCache=None,
+        keepUnresolved: bool=False,
+    ):
+        """
+        :param root: root of the TPTP library, by default $TPTP
+        :param keepUnresolved: whether includes which are not found are kept instead of raising an IncludeError
+        """
+        root = root if root is not None else os.environ.get('TPTP')
+        self._root = Path(root) if root else None
+        self._cache = cache if cache is not None else AxiomCache.shared()
+        self._keepUnresolved = keepUnresolved
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def keepUnresolved(self) -> bool:
+        return self._keepUnresolved
+
+    @property
+    def cache(self) -> AxiomCache:
+        return self._cache
+
+    def find(self, include:str, *, directory:Path=None) -> Path:
+        """
+        The file of an include, None if it has not been found.
+        """
+        candidates = []
+        if directory is not None:
+            candidates.append(Path(directory) / include)
+            # the root of a TPTP library the problem is part of
+            parts = Path(directory).absolute().parts
+            for name in ['Problems', 'Axioms']:
+                if name in parts:
+                    candidates.append(Path(*parts[:len(parts) - 1 - parts[::-1].index(name)]) / include)
+        if self._root is not None:
+            candidates.append(self._root / include)
+        for c in candidates:
+            if c.is_file():
+                return c.absolute()
+        return None
+
+    def expandText(self, text:str, *, directory:Path=None) -> str:
+        """
+        The text with every include replaced by the formulas it includes, everything else is left as it is.
+        :param directory: the directory of the file of text
+        """
+        parts = []
+        end = 0
+        for start, statementEnd in _statements(text):
+            include = _include(text[start:statementEnd])
+            if include is None:
+                continue
+            path = self.find(include[0], directory=directory)
+            if path is None:
+                if self._keepUnresolved:
+                    continue
+                raise IncludeError('{} has not been found.'.format(include[0]))
+            included = self._cache.get(path, self)
+            parts.append(text[end:start])
+            parts.append(included.text if include[1] is None else included.select(include[1]))
+            end = statementEnd
+        if end == 0:
+            return text
+        parts.append(text[end:])
+        return ''.join(parts)
+
+    def digestIncludes(self, text:str, *, directory:Path=None) -> List[str]:
+        """
+        The digest of every file included by the text, in order, None for includes which have not been found.
+        :param directory: the directory of the file of text
+        """
+        digests = []
+        for start, end in _statements(text):
+            include = _include(text[start:end])
+            if include is None:
+                continue
+            path = self.find(include[0], directory=directory)
+            if path is None:
+                if not self._keepUnresolved:
+                    raise IncludeError('{} has not been found.'.format(include[0]))
+                digests.append(None)
+                continue
+            digests.append(self._cache.get(path, self).digest)
+        return digests
+
+    def expand(self, problem:Problem) -> Problem:
+        """
+        A self-contained copy of the problem, without a source file. Problems without includes are returned as they are.
+        """
+        directory = Path(str(problem.source)).parent if problem.source is not None else None
+        text = problem.problem()
+        expanded = self.expandText(text, directory=directory)
+        if expanded is text:
+            return problem
+        if isinstance(problem, ProblemWithStatus):
+            return ProblemWithStatus(problem.name, None, expanded, problem.szsStatus)
+        return Problem(problem.name, None, expanded)
@@ -0,0 +1,132 @@
+import re
+import shlex
+from typing import List, Union
+
+
+class CommandTemplate:
+    """
+    The command of a local solver, parsed once into an argv template whose placeholders are filled in for every call:
+    * %s the path of the problem
+    * %stdin the problem is written to stdin of the solver, the placeholder itself is dropped
+    * %fd the path of an in-memory file holding the problem (/proc/self/fd/N), the path of the problem where
+      in-memory files are not available
+    * %d the timeout in seconds
+    * %md the timeout in milliseconds
+
+    Solvers that seek in their input need %s or %fd, stdin is a pipe.
+
+    A command is run without a shell, unless shell is True or, with shell None, it uses shell syntax (e.g. pipes,
+    redirections, variables or several commands), which cannot be expressed by an argv.
+    """
+    PLACEHOLDER = re.compile(r'%stdin|%md|%fd|%s|%d')
+
+    # how the problem is passed to the solver
+    FILE = 'file'
+    STDIN = 'stdin'
+    FD = 'fd'
+    # characters that have a meaning to the shell besides quoting and separating words
+    SHELL_SYNTAX = re.compile(r'[;&|<>$`(){}\[\]*?~#!\n]')
+
+    def __init__(self, command:str, *,
+        shell: bool=None,
+    ):
+        """
+        :param shell: True to run the command by /bin/sh, False to run it directly, None to decide by its syntax
+        :raise ValueError: if the command cannot be run without a shell but shell is False
+        """
+        self._command = command
+        needsShell = bool(CommandTemplate.SHELL_SYNTAX.search(command))
+        if shell is False and needsShell:
+            raise ValueError('The command "{}" uses shell syntax, it can only be run with shell enabled.'.format(command))
+        self._shell = needsShell if shell is None else shell
+        self._argv = None
+        if not self._shell:
+            # an argument which is just %stdin is no argument at all
+            self._argv = [CommandTemplate._compile(arg) for arg in shlex.split(command) if arg != '%stdin']
+            if not self._argv:
+                raise ValueError('The command is empty.')
+        self._parts = CommandTemplate._compile(command)
+        placeholders = set(self._parts[1::2])
+        if '%stdin' in placeholders:
+            self._input = CommandTemplate.STDIN
+        elif '%fd' in placeholders:
+            self._input = CommandTemplate.FD
+        else:
+            self._input = CommandTemplate.FILE
+
+    @staticmethod
+    def _compile(text:str) -> List[str]:
+        """
+        Splits text into literal parts and placeholders, placeholders are at the odd indices.
+        """
+        parts = []
+        end = 0
+        for m in CommandTemplate.PLACEHOLDER.finditer(text):
+            parts.append(text[end:m.start()])
+            parts.append(m.group(0))
+            end = m.end()
+        parts.append(text[end:])
+        return parts
+
+    @staticmethod
+    def _fill(parts:List[str], values) -> str:
+        return ''.join(values[p] if i % 2 else p for i, p in enumerate(parts))
+
+    @property
+    def command(self) -> str:
+        return self._command
+
+    @property
+    def shell(self) -> bool:
+        return self._shell
+
+    @property
+    def usesPath(self) -> bool:
+        """
+        Whether the path of the problem is part of the command, i.e. %s.
+        """
+        return '%s' in self._parts[1::2]
+
+    @property
+    def input(self) -> str:
+        """
+        How the problem is passed to the solver, FILE, STDIN or FD.
+        """
+        return self._input
+
+    def _values(self, source:str, timeout:float, fd:str):
+        return {
+            '%s': source,
+            '%stdin': '',
+            '%fd': fd if fd is not None else source,
+            '%d': str(int(timeout)),
+            '%md': str(int(timeout * 1000)),
+        }
+
+    def format(self, *, source:str, timeout:float, fd:str=None) -> str:
+        """
+        The command as a string, e.g. for displaying it or running it by a shell.
+        :param fd: the path of the in-memory file, None to use source instead
+        """
+        return CommandTemplate._fill(self._parts, self._values(source, timeout, fd))
+
+    def argv(self, *, source:str, timeout:float, fd:str=None) -> List[str]:
+        """
+        The arguments to run the command without a shell.
+        :raise ValueError: if the command is run by a shell
+        """
+        if self._shell:
+            raise ValueError('The command "{}" is run by a shell.'.format(self._command))
+        values = self._values(source, timeout, fd)
+        return [CommandTemplate._fill(parts, values) for parts in self._argv]
+
+    def call(self, *, source:str, timeout:float, fd:str=None) -> Union[str, List[str]]:
+        """
+        What LocalProcess runs: a string for the shell or an argv.
+        """
+        if self._shell:
+            return self.format(source=source, timeout=timeout, fd=fd)
+        return self.argv(source=source, timeout=timeout, fd=fd)
+
+    def __repr__(self):
+        return 'CommandTemplate({!r}, shell={})'.format(self._command, self._shell)
@@ -2,3 +2,4 @@ from .solverResult import SolverResult
 from .solverCall import SolverCall
 from .solverType import SolverType
 from .solver import Solver
+from .reasoningExecuter import ReasoningExecuter
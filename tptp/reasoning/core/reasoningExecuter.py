@@ -1,13 +1,64 @@
-from concurrent import futures 
-
-class ReasoningExecuter:
-    def __init__(self):
-        self._executer = futures.ThreadPoolExecutor(max_workers=threads)
-
-    def schedule(call:SolverCall):
-        '''
-        Submit a new task, for execution. 
-        '''
-        logger.debug('schedule {}'.format(task))
-        self._scheduledTasks.append(task)
-        self._refillActiveTasks()
+import logging
+from typing import Callable
+
+from ...utils.concurrent.threadedTaskExecuter import ThreadedTaskExecuter
+from ...utils.concurrent.processSupervisor import ProcessSupervisor
+from .solverCall import SolverCall
+from .solverResult import SolverResult
+
+logger = logging.getLogger(__name__)
+
+class ReasoningExecuter(ThreadedTaskExecuter):
+    '''
+    Executes solver calls in parallel on a fixed number of threads.
+    With a supervisor, local solver calls are watched on its event loop instead and need no thread.
+
+    Usage:
+    * addStartCallback(self, callback) to get notified when a call is handed to a thread
+    * addResultCallback(self, callback) to get notified about the result of a finished call
+      - a callback may submit further calls using self.submit(call)
+    * addTickCallback(self, callback) to get called every tickInterval seconds while waiting
+    * submit(self, call) to queue a solver call for execution
+    * wait(self) to wait for the termination of all submitted calls
+
+    Behaviour:
+    * all callbacks will be called in the same thread as 'wait(self)' is called
+    * results are reported in the order the calls finish, not in the order they were submitted
+    '''
+
+    def __init__(self, *,
+        threads: int=1,
+        tickInterval: float=None,
+        supervisor: ProcessSupervisor=None,
+    ):
+        super().__init__(threads=threads, tickInterval=tickInterval, supervisor=supervisor)
+        self._startCallbacks = []
+        self._resultCallbacks = []
+        self._tickCallbacks = []
+
+    def addStartCallback(self, callback:Callable[[SolverCall], object]):
+        self._startCallbacks.append(callback)
+
+    def addResultCallback(self, callback:Callable[[SolverResult], object]):
+        self._resultCallbacks.append(callback)
+
+    def addTickCallback(self, callback:Callable[[], object]):
+        self._tickCallbacks.append(callback)
+
+    def onTick(self):
+        for c in self._tickCallbacks:
+            c()
+
+    def onStart(self, task:SolverCall):
+        for c in self._startCallbacks:
+            c(task)
+
+    def onFinish(self, task:SolverCall, result:SolverResult):
+        for c in self._resultCallbacks:
+            c(result)
+
+    def onCanceled(self, task:SolverCall):
+        logger.debug('canceled {}'.format(task))
+
+    def onError(self, task:SolverCall, error):
+        raise error
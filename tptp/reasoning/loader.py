@@ -78,6 +78,9 @@ def loadSolvers(solverDefinitions, split=False):
                 version = s.get('version', None),
                 command = s['command'],
                 encoding = s.get('encoding', None),
+                memoryLimit = s.get('memory-limit', None),
+                shell = s.get('shell', None),
+                statusPolicy = s.get('szs-status', 'first'),
             ))
         else:
             name = s['name']
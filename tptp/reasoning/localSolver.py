@@ -1,11 +1,20 @@
+from concurrent import futures
 from typing import List
+from pathlib import Path
 import re
 
 from ..encoding.encodingChooser import getEncoder
+from ..encoding.encodingUtils import releaseProblemSourceTemporary
 from ..core import Problem, TPTPDialect, SZSStatus, UnknownSZSStatusError
 from .core import Solver, SolverCall, SolverType, SolverResult
 
-from ..utils.concurrent.localProcess import LocalProcess
+from ..utils.concurrent.localProcess import LocalProcess, ResourceUsage
+from ..utils.concurrent.coreAllocator import CoreAllocator
+from ..utils.concurrent.outputCapture import OutputCapture
+from ..utils.concurrent.processSupervisor import ProcessSupervisor
+from .resultCache import SolverResultCache, digestProblem
+from .commandTemplate import CommandTemplate
+from .szsOutputScanner import SZSOutputScanner, SZSOutputBlock
 
 class LocalSolver(Solver):
     def __init__(self, name: str, *,
@@ -15,7 +24,15 @@ class LocalSolver(Solver):
                  encoding: str=None,
                  inputLanguages: List[TPTPDialect]= [],
                  applications: List[SolverType]= [],
+                 memoryLimit: int=None,
+                 shell: bool=None,
+                 statusPolicy: str=SZSOutputScanner.FIRST,
                  ):
+        """
+        :param memoryLimit: maximum memory of a call in MiB, None for no limit
+        :param shell: whether the command is run by /bin/sh, by default only if it uses shell syntax, see CommandTemplate
+        :param statusPolicy: whether the FIRST or the LAST SZS status printed is the status, see SZSOutputScanner
+        """
         super().__init__(
             name=name, 
             prettyName=prettyName,
@@ -23,6 +40,10 @@ class LocalSolver(Solver):
             version=version,
         )
         self._encoding = encoding
+        self._memoryLimit = memoryLimit
+        self._statusPolicy = statusPolicy
+        # parsed once, not for every call
+        self._template = CommandTemplate(command, shell=shell) if command is not None else None
         self._inputLanguages = inputLanguages
         self._applications = applications
 
@@ -44,6 +65,10 @@ class LocalSolver(Solver):
     def command(self) -> str:
         return self._command
 
+    @property
+    def template(self) -> CommandTemplate:
+        return self._template
+
     @property
     def inputLanguages(self):
         return self._inputLanguages
@@ -52,44 +77,216 @@ class LocalSolver(Solver):
     def applications(self):
         return self._applications
 
-    def call(self, problem:Problem, *, timeout):
+    @property
+    def memoryLimit(self) -> int:
+        return self._memoryLimit
+
+    @property
+    def statusPolicy(self) -> str:
+        return self._statusPolicy
+
+    def call(self, problem:Problem, *,
+        timeout,
+        cache: SolverResultCache=None,
+        memoryLimit: int=None,
+        cpuLimit: float=None,
+        coreAllocator: CoreAllocator=None,
+        earlyTermination: str=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+        supervisor: ProcessSupervisor=None,
+    ):
+        """
+        :param timeout: maximum wall clock time of the call in seconds
+        :param memoryLimit: maximum memory of the call in MiB, the lower of this and the limit of the solver applies
+        :param cpuLimit: maximum cpu time of the call in seconds, None for no limit
+        :param coreAllocator: pins the call to cpus of its own, None for no pinning
+        :param earlyTermination: a mode of SZSAnswerWatcher, terminates the solver as soon as it has given its answer
+        :param captureLimit: bytes of stdout and of stderr kept in memory, None for no limit
+        :param spillOutput: whether output beyond the captureLimit is kept in a temporary file
+        :param supervisor: watches the solver on its event loop when the call is run, None to watch it in the thread
+            running the call
+        """
+        limits = [l for l in [self._memoryLimit, memoryLimit] if l]
         return LocalSolverCall(
             problem=problem,
             solver=self,
             timeout=timeout,
+            cache=cache,
+            memoryLimit=min(limits) if limits else None,
+            cpuLimit=cpuLimit,
+            coreAllocator=coreAllocator,
+            earlyTermination=earlyTermination,
+            captureLimit=captureLimit,
+            spillOutput=spillOutput,
+            supervisor=supervisor,
         )
 
+class SZSAnswerWatcher:
+    """
+    Watches the stdout of a solver as it arrives and recognizes when the solver has given its answer:
+    * STATUS: as soon as the SZS status line has been printed
+    * OUTPUT: as soon as the SZS status line and, for a successful status, the end of an SZS output block have been
+      printed (in any order)
+    The output is scanned by an SZSOutputScanner, which keeps the status and the output blocks.
+    """
+    STATUS = 'status'
+    OUTPUT = 'output'
+    MODES = [STATUS, OUTPUT]
+
+    def __init__(self, mode:str=STATUS, *,
+        scanner: SZSOutputScanner=None,
+    ):
+        if mode not in SZSAnswerWatcher.MODES:
+            raise ValueError('Unknown mode {}, choose from {}.'.format(mode, SZSAnswerWatcher.MODES))
+        self._mode = mode
+        self._scanner = scanner if scanner else SZSOutputScanner()
+
+    @property
+    def status(self) -> SZSStatus:
+        """
+        The SZS status printed so far by the policy of the scanner, None if there is none.
+        """
+        return self._scanner.status
+
+    @property
+    def scanner(self) -> SZSOutputScanner:
+        return self._scanner
+
+    def __call__(self, chunk:bytes) -> bool:
+        """
+        Feeds the next chunk of stdout.
+        :return: whether the answer is complete
+        """
+        self._scanner(chunk)
+        return self._isAnswered()
+
+    def finish(self) -> bool:
+        """
+        Scans the last line, called when the output has ended without a final newline.
+        :return: whether the answer is complete
+        """
+        self._scanner.finish()
+        return self._isAnswered()
+
+    def _isAnswered(self) -> bool:
+        # the first status answers, even if a later one would win
+        status = self._scanner.firstStatus
+        if status is None:
+            return False
+        if self._mode == SZSAnswerWatcher.STATUS:
+            return True
+        return self._scanner.hasCompleteBlock() or not status._isDescendantOf(SZSStatus.Success)
+
 class LocalSolverResult(SolverResult):
     def __init__(self, *, 
         call, 
         szs: SZSStatus, 
         cpu: float, 
         wc: float, 
-        stdout:str, 
-        stderr:str, 
+        stdout, 
+        stderr, 
         returnCode:int,
         exception:Exception,
         command:str,
+        resourceUsage:ResourceUsage=None,
+        exceededLimit:str=None,
+        cores:frozenset=None,
+        answerWc:float=None,
+        szsOutputs:List[SZSOutputBlock]=None,
     ):
+        """
+        :param stdout: str or an OutputCapture which is decoded when stdout is accessed first
+        :param stderr: str or an OutputCapture which is decoded when stderr is accessed first
+        :param szsOutputs: the SZS output blocks of stdout, None to scan stdout for them when they are accessed
+        """
         super().__init__(call, szs, cpu, wc)
-        self._stdout = stdout
-        self._stderr = stderr
+        self._stdoutCapture = stdout if isinstance(stdout, OutputCapture) else None
+        self._stderrCapture = stderr if isinstance(stderr, OutputCapture) else None
+        self._stdout = None if self._stdoutCapture else stdout
+        self._stderr = None if self._stderrCapture else stderr
         self._returnCode = returnCode
         self._exception = exception
         self._command = command
+        self._resourceUsage = resourceUsage
+        self._exceededLimit = exceededLimit
+        self._cores = cores
+        self._answerWc = answerWc
+        self._szsOutputs = szsOutputs
+        # what the SZS output blocks are read from if stdout has not been captured by this call
+        self._szsCapture = None
 
     @property
     def stdout(self):
+        if self._stdout is None and self._stdoutCapture:
+            self._stdout = self._stdoutCapture.bytes().decode('utf8', errors='replace')
         return self._stdout
 
     @property
     def stderr(self):
+        if self._stderr is None and self._stderrCapture:
+            self._stderr = self._stderrCapture.bytes().decode('utf8', errors='replace')
         return self._stderr
 
+    @property
+    def stdoutCapture(self) -> OutputCapture:
+        """
+        The capture of stdout, None if stdout has not been captured by this call (e.g. taken from a cache).
+        """
+        return self._stdoutCapture
+
+    @property
+    def stderrCapture(self) -> OutputCapture:
+        return self._stderrCapture
+
+    @property
+    def stdoutOmitted(self) -> int:
+        """
+        Bytes of stdout beyond the capture limit, which are not part of stdout.
+        """
+        return self._stdoutCapture.omitted if self._stdoutCapture else 0
+
+    @property
+    def stderrOmitted(self) -> int:
+        return self._stderrCapture.omitted if self._stderrCapture else 0
+
     @property
     def output(self):
         return self.stdout
 
+    @property
+    def szsOutputs(self) -> List[SZSOutputBlock]:
+        """
+        The SZS output blocks of stdout, their content is read from the capture of stdout on demand.
+        """
+        capture = self._stdoutCapture or self._szsCapture
+        if capture is None:
+            # e.g. taken from a cache
+            capture = OutputCapture()
+            capture.write((self.stdout or '').encode('utf8'))
+            self._szsCapture = capture
+        if self._szsOutputs is None:
+            scanner = SZSOutputScanner()
+            for chunk in capture.chunks():
+                scanner(chunk)
+            scanner.finish()
+            self._szsOutputs = scanner.blocks
+        return [b.withCapture(capture) for b in self._szsOutputs]
+
+    @property
+    def proof(self) -> SZSOutputBlock:
+        """
+        The first SZS output block declared as a proof or refutation, None if there is none.
+        """
+        return next((b for b in self.szsOutputs if b.isProof), None)
+
+    @property
+    def model(self) -> SZSOutputBlock:
+        """
+        The first SZS output block declared as a model or saturation, None if there is none.
+        """
+        return next((b for b in self.szsOutputs if b.isModel), None)
+
     @property
     def returnCode(self):
         return self._returnCode
@@ -102,28 +299,134 @@ class LocalSolverResult(SolverResult):
     def command(self):
         return self._command
 
+    @property
+    def resourceUsage(self) -> ResourceUsage:
+        """
+        Resources used by the solver, None if they are not known.
+        """
+        return self._resourceUsage
+
+    @property
+    def exceededLimit(self) -> str:
+        """
+        The limit which caused a timeout, 'wc' or 'cpu', None if no limit has been exceeded.
+        """
+        return self._exceededLimit
+
+    @property
+    def answerWc(self) -> float:
+        """
+        Wall clock time until the solver has given its answer if it has been terminated early, None otherwise.
+        """
+        return self._answerWc
+
+    @property
+    def cores(self) -> frozenset:
+        """
+        The cpus the solver has been pinned to, None if it has not been pinned.
+        """
+        return self._cores
+
+    @property
+    def cpuUser(self) -> float:
+        return self._resourceUsage.cpuUser if self._resourceUsage else None
+
+    @property
+    def cpuSystem(self) -> float:
+        return self._resourceUsage.cpuSystem if self._resourceUsage else None
+
+    @property
+    def maxRss(self) -> int:
+        """
+        Peak resident set size in KiB.
+        """
+        return self._resourceUsage.maxRss if self._resourceUsage else None
+
+    @property
+    def voluntaryContextSwitches(self) -> int:
+        return self._resourceUsage.voluntaryContextSwitches if self._resourceUsage else None
+
+    @property
+    def involuntaryContextSwitches(self) -> int:
+        return self._resourceUsage.involuntaryContextSwitches if self._resourceUsage else None
+
 class LocalSolverCall(SolverCall):
-    def __init__(self, problem:Problem, *, solver:LocalSolver, timeout):
+    # return codes of the shell if the solver command could not be found (127) or executed (126)
+    SHELL_NOT_EXECUTABLE_RETURN_CODES = (126, 127)
+    # errors if the solver command could not be found or executed without a shell
+    NOT_EXECUTABLE_ERRORS = (FileNotFoundError, PermissionError)
+    # messages of common runtimes that failed to allocate memory
+    OUT_OF_MEMORY_PATTERN = re.compile(rb'out of memory|std::bad_alloc|MemoryError|OutOfMemoryError|Cannot allocate memory|heap exhausted', re.I)
+
+    def __init__(self, problem:Problem, *,
+        solver: LocalSolver,
+        timeout,
+        cache: SolverResultCache=None,
+        memoryLimit: int=None,
+        cpuLimit: float=None,
+        coreAllocator: CoreAllocator=None,
+        earlyTermination: str=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+        supervisor: ProcessSupervisor=None,
+    ):
+        """
+        :param timeout: maximum wall clock time of the solver in seconds
+        :param memoryLimit: maximum memory of the solver in MiB, None for no limit
+        :param cpuLimit: maximum cpu time of the solver in seconds, None for no limit
+        :param coreAllocator: pins the solver to cpus of its own, None for no pinning
+        :param earlyTermination: a mode of SZSAnswerWatcher, terminates the solver as soon as it has given its answer
+        :param captureLimit: bytes of stdout and of stderr kept in memory, None for no limit
+        :param spillOutput: whether output beyond the captureLimit is kept in a temporary file
+        :param supervisor: watches the solver on its event loop when run() is called, see also runSupervised()
+        """
         self._problem = problem
         self._solver = solver
         self._timeout = timeout
+        self._cache = cache
+        self._memoryLimit = memoryLimit
+        self._cpuLimit = cpuLimit
+        self._earlyTermination = earlyTermination
+        self._captureLimit = captureLimit
+        template = solver.template
+        inputMode = template.input if template else CommandTemplate.FILE
+        # the problem is passed by stdin or an in-memory file, a file is only needed for %s or as fallback of %fd
+        inputFile = inputMode == CommandTemplate.FD and LocalProcess.isInputFileAvailable()
+        inMemory = inputMode == CommandTemplate.STDIN or inputFile
+        self._fd = LocalProcess.INPUT_FD_PATH if inputFile else None
+        needsPath = not inMemory or template.usesPath
+        # an encoded problem has no path unless it is written to the scratch area
+        self._hasPath = needsPath or not solver._encoding
         if solver._encoding:
-            problem = getEncoder(problem, solver._encoding).encode(problem, tempSource=True).newProblem
+            problem = getEncoder(problem, solver._encoding).encode(problem, tempSource=needsPath).newProblem
+        self._solverProblem = problem
+        # the encoded problem lives in the scratch area until the call has finished
+        self._hasTempSource = bool(solver._encoding) and needsPath
+        # mapped instead of read, a problem passed by its path is never read
+        content = problem.problemBytes() if inMemory else None
+        # the status is scanned while the output arrives, s.t. it is found even if it is not captured
+        self._watcher = SZSAnswerWatcher(
+            earlyTermination if earlyTermination else SZSAnswerWatcher.STATUS,
+            scanner=SZSOutputScanner(solver.statusPolicy),
+        )
         self._process = LocalProcess(
             timeout=timeout, 
-            call=lambda t: self._generateCall(problem, timeout=t)
+            call=lambda t: template.call(source=str(problem.source) if needsPath else '', timeout=t, fd=self._fd),
+            memoryLimit=memoryLimit * 1024 * 1024 if memoryLimit else None,
+            cpuLimit=cpuLimit,
+            coreAllocator=coreAllocator,
+            outputWatcher=self._watcher if earlyTermination else lambda chunk: self._watcher(chunk) and False,
+            captureLimit=captureLimit,
+            spillOutput=spillOutput,
+            supervisor=supervisor,
+            stdin=content if inputMode == CommandTemplate.STDIN else None,
+            inputFile=content if inputFile else None,
         )
 
-    def _generateCall(self, problem, *, timeout) -> str:
-        c0 = self._solver.command
-        # filename
-        c1 = c0.replace('%s', str(problem.source))
-        # timeout in s
-        c2 = c1.replace('%d', str(int(timeout)))
-        # timeout in ms
-        c3 = c2.replace('%md', str(int(timeout*1000)))
-
-        return c3
+    def _generateCall(self, problem, *, timeout, source=None) -> str:
+        if source is None:
+            source = str(problem.source) if self._hasPath else ''
+        return self._solver.template.format(source=source, timeout=timeout, fd=self._fd)
 
     def isStarted(self) -> bool:
         return self._process.isStarted()
@@ -140,48 +443,175 @@ class LocalSolverCall(SolverCall):
     def timeRunning(self) -> float:
         return self._process.timeRunning()
 
+    def _cacheKey(self) -> str:
+        timeout = self.estimatedTimeout()
+        return SolverResultCache.key(
+            # an encoded problem may live in the scratch area, its includes are the ones of the problem
+            problemDigest=digestProblem(
+                self._solverProblem,
+                directory=Path(str(self._problem.source)).parent if self._problem.source is not None else None,
+            ),
+            # the problem is addressed by its content, not by its path
+            command=self._generateCall(self._solverProblem, timeout=timeout, source='%s'),
+            version=self._solver.version,
+            timeout=timeout,
+            memoryLimit=self._memoryLimit,
+            cpuLimit=self._cpuLimit,
+            earlyTermination=self._earlyTermination,
+            statusPolicy=self._solver.statusPolicy,
+            captureLimit=self._captureLimit,
+            encoding=self._solver._encoding,
+        )
+
     def run(self):
-        exception = None
-        stdout = None
-        stderr = None
+        try:
+            if self._cache:
+                cached = self._cached()
+                if cached:
+                    return cached
+            return self._store(self._run())
+        finally:
+            self._releaseSource()
+
+    def runSupervised(self, supervisor:ProcessSupervisor, *,
+        executor: futures.Executor=None,
+    ) -> futures.Future:
+        """
+        Starts the solver and hands it to a ProcessSupervisor instead of blocking the calling thread.
+        :param executor: completes the result (e.g. storing it in the cache), None to complete it in the thread of
+            the supervisor
+        :return: a future of the result
+        """
+        result = futures.Future()
+        result.set_running_or_notify_cancel()
+        cached = self._cached() if self._cache else None
+        if cached:
+            self._releaseSource()
+            result.set_result(cached)
+            return result
+
+        def finish(supervised):
+            try:
+                stdout, stderr, returncode = supervised.result()
+                r = self._result(stdout, stderr, returncode, None)
+            except Exception as e:
+                r = self._result(None, None, None, e)
+            try:
+                result.set_result(self._store(r))
+            except Exception as e:
+                result.set_exception(e)
+            finally:
+                self._releaseSource()
+
+        try:
+            self._process.runSupervised(supervisor, executor=executor).add_done_callback(finish)
+        except Exception as e:
+            self._releaseSource()
+            result.set_result(self._result(None, None, None, e))
+        return result
+
+    def _releaseSource(self):
+        # a memory mapped problem is closed, the result keeps the call and its process
+        self._process.releaseInput()
+        if self._hasTempSource:
+            self._hasTempSource = False
+            releaseProblemSourceTemporary(self._solverProblem)
+
+    def _cached(self) -> LocalSolverResult:
+        # the key is taken before the call is started, a callable timeout may differ afterwards
+        self._key = self._cacheKey()
+        cached = self._cache.get(self._key)
+        if not cached:
+            return None
+        return LocalSolverResult(
+            call=self,
+            szs=SZSStatus.get(cached['szs']),
+            cpu=cached['cpu'],
+            wc=cached['wc'],
+            stdout=cached['stdout'],
+            stderr=cached['stderr'],
+            returnCode=cached['returnCode'],
+            exception=None,
+            command=self._generateCall(self._solverProblem, timeout=self._process.estimatedTimeout()),
+            resourceUsage=ResourceUsage(**cached['resourceUsage']) if cached.get('resourceUsage') else None,
+            exceededLimit=cached.get('exceededLimit', None),
+            answerWc=cached.get('answerWc', None),
+        )
 
+    def _store(self, result:LocalSolverResult) -> LocalSolverResult:
+        # interrupted or failed calls do not tell anything about the solver
+        if self._cache and not self._process.isInterupted() and not result.exception:
+            self._cache.put(self._key, {
+                'szs': str(result.szsStatus),
+                'cpu': result.cpu,
+                'wc': result.wc,
+                'stdout': result.stdout,
+                'stderr': result.stderr,
+                'returnCode': result.returnCode,
+                'resourceUsage': {
+                    'cpuUser': result.cpuUser,
+                    'cpuSystem': result.cpuSystem,
+                    'maxRss': result.maxRss,
+                    'voluntaryContextSwitches': result.voluntaryContextSwitches,
+                    'involuntaryContextSwitches': result.involuntaryContextSwitches,
+                } if result.resourceUsage else None,
+                'exceededLimit': result.exceededLimit,
+                'answerWc': result.answerWc,
+            })
+        return result
+
+    def _run(self):
         try:
-            stdout, stderr, returncode = self._process.run()
+            stdout, stderr, returncode = self._process.runCaptured()
         except Exception as e:
-            exception = e
-            returncode = None
-
-        szs = SZSStatus.Unknown
-        if stdout:
-            g = re.search('% SZS status ([^\s]+)', stdout, re.I)
-            if g:
-                try:
-                    szs = SZSStatus.get(g.group(1))
-                except UnknownSZSStatusError:
-                    pass
-
-            #cpu = float(re.search('(?:.*CPU = )(.*)(?: WC.*)', stdout, re.I).group(1))
-            #wc = float(re.search('(?:.*WC = )(\S*)(?: .*)', stdout, re.I).group(1))
+            return self._result(None, None, None, e)
+        return self._result(stdout, stderr, returncode, None)
+
+    def _result(self, stdout:OutputCapture, stderr:OutputCapture, returncode:int, exception:Exception) -> LocalSolverResult:
+        self._watcher.finish()
+        szs = self._watcher.status if self._watcher.status else SZSStatus.Unknown
         if szs == SZSStatus.Unknown:
-            if self._process.isTimeout():
+            if self._isMemoryOut(stdout, stderr):
+                szs = SZSStatus.MemoryOut
+            elif self._process.isTimeout():
                 szs = SZSStatus.Timeout
             elif self._process.isInterupted():
                 szs = SZSStatus.User
+            elif isinstance(exception, LocalSolverCall.NOT_EXECUTABLE_ERRORS):
+                szs = SZSStatus.OSError
             elif exception:
                 szs = SZSStatus.Error
+            elif returncode in LocalSolverCall.SHELL_NOT_EXECUTABLE_RETURN_CODES:
+                szs = SZSStatus.OSError
 
+        resourceUsage = self._process.resourceUsage()
         return LocalSolverResult(
             call=self,
             szs=szs,
-            cpu=None, # TODO
+            cpu=resourceUsage.cpu if resourceUsage else None,
             wc=self._process.timeRunning(),
             stdout=stdout,
             stderr=stderr,
             returnCode=returncode,
             exception=exception,
-            command=self._process.estimatedCall(),
+            command=self._generateCall(self._solverProblem, timeout=self._process.estimatedTimeout()),
+            resourceUsage=resourceUsage,
+            exceededLimit=self._process.exceededLimit(),
+            cores=self._process.cores(),
+            answerWc=self._process.timeAnswered(),
+            szsOutputs=self._watcher.scanner.blocks if stdout is not None else None,
         )
 
+    def _isMemoryOut(self, stdout:OutputCapture, stderr:OutputCapture) -> bool:
+        """
+        Whether the solver has been stopped by its memory limit, either killed (cgroup) or failed to allocate (rlimit).
+        """
+        if not self._memoryLimit:
+            return False
+        if self._process.isMemoryOut():
+            return True
+        return any(o and LocalSolverCall.OUT_OF_MEMORY_PATTERN.search(o.bytes()) for o in [stderr, stdout])
+
     def cancel(self) -> None:
         self._process.cancel()
 
@@ -0,0 +1,178 @@
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+from ..core import Problem
+from ..parser.includeResolver import IncludeResolver
+
+
+BASE_PATH = Path(
+    os.environ.get('XDG_CACHE_HOME') or
+    os.path.join(os.environ['HOME'], '.cache')
+)
+DEFAULT_CACHE_DIR_PATH = BASE_PATH / 'tptp_python_lib' / 'results'
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024 # 1 GiB
+
+def digestProblem(problem:Problem, *, directory:Path=None) -> str:
+    """
+    SHA-256 of the content of a problem and of the files it includes, s.t. an updated axiom file changes the digest.
+    Problems which are not loaded are hashed from their memory mapped source.
+    :param directory: the directory includes are searched in first, by default the one of the source of the problem
+    """
+    data = problem.problemBytes()
+    try:
+        h = hashlib.sha256(data)
+        # problems without includes are never decoded
+        if data.find(b'include') >= 0:
+            if directory is None and problem.source is not None:
+                directory = Path(str(problem.source)).parent
+            digests = IncludeResolver(keepUnresolved=True).digestIncludes(str(data, 'utf8'), directory=directory)
+            if digests:
+                h.update(json.dumps(digests).encode('utf8'))
+        return h.hexdigest()
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+class SolverResultCache:
+    """
+    An opt-in cache of solver results shared across runs and processes.
+
+    Results are addressed by a hash of the problem content, the expanded solver command, the solver version, the
+    timeout and the limits and settings of the call, see key(). Entries are stored in a SQLite database inside the cache directory. Every access holds an exclusive
+    lock on a lock file next to it, hence several competitions on one host may share a cache. If the stored
+    results exceed maxSize bytes, the least recently used entries are evicted.
+    """
+    def __init__(self, directory:Path=DEFAULT_CACHE_DIR_PATH, *,
+        maxSize: int=DEFAULT_MAX_SIZE,
+    ):
+        self._directory = Path(directory)
+        self._maxSize = maxSize
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._dbPath = self._directory / 'cache.sqlite'
+        self._lockPath = self._directory / 'cache.lock'
+        with self._locked() as db:
+            db.execute('''CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                lastAccess REAL NOT NULL
+            )''')
+            db.execute('CREATE INDEX IF NOT EXISTS resultsLastAccess ON results (lastAccess)')
+
+    def __repr__(self):
+        return 'SolverResultCache({})'.format(self._directory)
+
+    def __str__(self):
+        return '{hits} hits, {misses} misses'.format(
+            hits=self._hits,
+            misses=self._misses,
+        )
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @staticmethod
+    def key(*,
+        problemDigest: str,
+        command: str,
+        version: str,
+        timeout: float,
+        memoryLimit: int=None,
+        cpuLimit: float=None,
+        earlyTermination: str=None,
+        statusPolicy: str=None,
+        captureLimit: int=None,
+        encoding: str=None,
+    ) -> str:
+        """
+        :param problemDigest: digestProblem() of the problem as it is passed to the solver, i.e. encoded
+        :param earlyTermination: the output of an early terminated call is incomplete
+        :param statusPolicy: which SZS status of the output is the status
+        :param captureLimit: the output of a call with a capture limit is truncated
+        """
+        h = hashlib.sha256()
+        h.update(json.dumps([
+            problemDigest,
+            command,
+            version,
+            float(timeout),
+            memoryLimit,
+            None if cpuLimit is None else float(cpuLimit),
+            earlyTermination,
+            statusPolicy,
+            captureLimit,
+            encoding,
+        ]).encode('utf8'))
+        return h.hexdigest()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Exclusive access to the database, across threads and processes.
+        """
+        with self._lock:
+            with self._lockPath.open('a') as lockFile:
+                fcntl.flock(lockFile.fileno(), fcntl.LOCK_EX)
+                try:
+                    db = sqlite3.connect(str(self._dbPath))
+                    try:
+                        with db:
+                            yield db
+                    finally:
+                        db.close()
+                finally:
+                    fcntl.flock(lockFile.fileno(), fcntl.LOCK_UN)
+
+    def get(self, key:str) -> Dict:
+        """
+        The cached value of the key or None. Counts as a hit or a miss.
+        """
+        with self._locked() as db:
+            row = db.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+            if row:
+                db.execute('UPDATE results SET lastAccess = ? WHERE key = ?', (time.time(), key))
+                self._hits += 1
+                return json.loads(row[0])
+            self._misses += 1
+            return None
+
+    def put(self, key:str, value:Dict):
+        """
+        Stores a json serializable value and evicts least recently used entries if the cache is full.
+        """
+        data = json.dumps(value)
+        size = len(data)
+        if size > self._maxSize:
+            return
+        with self._locked() as db:
+            db.execute('INSERT OR REPLACE INTO results (key, value, size, lastAccess) VALUES (?, ?, ?, ?)', (key, data, size, time.time()))
+            total = db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+            if total <= self._maxSize:
+                return
+            for evictKey, evictSize in db.execute('SELECT key, size FROM results ORDER BY lastAccess').fetchall():
+                db.execute('DELETE FROM results WHERE key = ?', (evictKey,))
+                total -= evictSize
+                if total <= self._maxSize:
+                    break
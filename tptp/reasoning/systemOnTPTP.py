@@ -5,10 +5,12 @@ import re
 
 from ..core import UnknownSZSStatusError
 from ..encoding.encodingChooser import getEncoder
+from ..parser.includeResolver import IncludeResolver
 from ..core import Problem, TPTPDialect, SZSStatus
 from .core import Solver, SolverCall, SolverType, SolverResult
 
 from ..utils.concurrent.httpRequest import AsyncPostRequest
+from .resultCache import SolverResultCache, digestProblem
 
 class SystemOnTPTPSolver(Solver):
     def __init__(self, name: str, *,
@@ -62,11 +64,29 @@ class SystemOnTPTPSolver(Solver):
     def applications(self):
         return self._applications
 
-    def call(self, problem:Problem, *, timeout):
+    def call(self, problem:Problem, *,
+        timeout,
+        cache: SolverResultCache=None,
+        memoryLimit: int=None,
+        cpuLimit: float=None,
+        coreAllocator=None,
+        earlyTermination: str=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+    ):
+        """
+        :param memoryLimit: ignored, the memory of System on TPTP is limited by the service
+        :param cpuLimit: ignored, System on TPTP limits the cpu time by the timeout
+        :param coreAllocator: ignored, System on TPTP runs remotely
+        :param earlyTermination: ignored, System on TPTP answers when the solver has finished
+        :param captureLimit: ignored, the output of System on TPTP is limited by the service
+        :param spillOutput: ignored
+        """
         return SystemOnTPTPSolverCall(
             problem=problem, 
             solver=self, 
-            timeout=timeout
+            timeout=timeout,
+            cache=cache,
         )
 
 class SystemOnTPTPMalfunctionError(Exception):
@@ -120,6 +140,9 @@ def getSolvers() -> List[SystemOnTPTPSolver]:
 
 class SystemOnTPTPSolverResult(SolverResult):
     def __init__(self, call, szs: SZSStatus, cpu: float, wc: float, response):
+        """
+        :param response: the response of System on TPTP, or its text if the result has been taken from a cache
+        """
         super().__init__(call, szs, cpu, wc)
 
         self._response = response
@@ -127,24 +150,42 @@ class SystemOnTPTPSolverResult(SolverResult):
     def output(self):
         return self._response
 
+    def text(self) -> str:
+        return self._response if isinstance(self._response, str) else self._response.text
+
 class SystemOnTPTPSolverCall(SolverCall):
-    def __init__(self, problem:Problem, *, solver:SystemOnTPTPSolver, timeout):
+    def __init__(self, problem:Problem, *,
+        solver: SystemOnTPTPSolver,
+        timeout,
+        cache: SolverResultCache=None,
+    ):
         self._solver = solver
         self._problem = problem
         self._timeout = timeout
+        self._cache = cache
         self._calculatedTimeout = None
         self._result = None
         self._started = False
+        self._sentProblem = None
 
     def __repr__(self):
         return str(self._solver) + str(self._calculatedTimeout)
 
+    def sentProblem(self) -> Problem:
+        """
+        The problem as it is sent to System on TPTP, i.e. encoded and its local includes expanded.
+        """
+        if self._sentProblem is None:
+            problem = self._problem
+            if self._solver._encoding:
+                problem = getEncoder(problem, self._solver._encoding).encode(problem).newProblem
+            # includes of local files are expanded, the ones not found locally may still be found by System on TPTP
+            self._sentProblem = IncludeResolver(keepUnresolved=True).expand(problem)
+        return self._sentProblem
+
     def start(self):
         self._started = True
-        if self._solver._encoding:
-            problem = getEncoder(self._problem, self._solver._encoding).encode(self._problem).newProblem
-        else:
-            problem = self._problem.problem()
+        problem = self.sentProblem().problem()
         URL_SYSTEM_ON_TPTP_FORM = 'http://www.tptp.org/cgi-bin/SystemOnTPTPFormReply'
         if hasattr(self._timeout, '__call__'):
             self._calculatedTimeout = self._timeout()
@@ -195,9 +236,37 @@ class SystemOnTPTPSolverCall(SolverCall):
         self._request.wait()
 
     def run(self) -> SystemOnTPTPSolverResult:
+        if not self._cache:
+            self.start()
+            self.wait()
+            return self.result()
+
+        key = SolverResultCache.key(
+            problemDigest=digestProblem(self.sentProblem()),
+            command=self._solver.systemOnTPTPName + ' ' + self._solver.command,
+            version=self._solver.version,
+            timeout=self.estimatedTimeout(),
+            encoding=self._solver._encoding,
+        )
+        cached = self._cache.get(key)
+        if cached:
+            return SystemOnTPTPSolverResult(self,
+                szs=SZSStatus.get(cached['szs']),
+                cpu=cached['cpu'],
+                wc=cached['wc'],
+                response=cached['response'],
+            )
+
         self.start()
         self.wait()
-        return self.result()
+        result = self.result()
+        self._cache.put(key, {
+            'szs': str(result.szsStatus),
+            'cpu': result.cpu,
+            'wc': result.wc,
+            'response': result.text(),
+        })
+        return result
 
     def estimatedTimeout(self):
         if self._calculatedTimeout:
@@ -0,0 +1,225 @@
+import re
+from pathlib import Path
+from typing import List
+
+from ..core import SZSStatus, UnknownSZSStatusError
+from ..utils.concurrent.outputCapture import OutputCapture
+
+
+class SZSOutputBlock:
+    """
+    The region of an SZS output block, i.e. the lines between '% SZS output start <form>' and '% SZS output end',
+    given by byte offsets into the output of the solver.
+
+    The content is read from the capture of the output on demand, nothing is copied while the output is scanned.
+    """
+    PROOF_FORMS = ['proof', 'derivation', 'refutation', 'cnfrefutation']
+    MODEL_FORMS = ['model', 'finitemodel', 'infinitemodel', 'saturation', 'interpretation']
+
+    def __init__(self, form:str, start:int, end:int=None, *,
+        capture: OutputCapture=None,
+    ):
+        """
+        :param form: the declared form, e.g. Proof or FiniteModel, None if none has been declared
+        :param start: offset of the first byte after the start line
+        :param end: offset of the end line, None while the block has not ended
+        """
+        self._form = form
+        self._start = start
+        self._end = end
+        self._capture = capture
+
+    def __repr__(self):
+        return 'SZSOutputBlock({}, {}, {})'.format(self._form, self._start, self._end)
+
+    @property
+    def form(self) -> str:
+        return self._form
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        """
+        Offset of the end of the block, the end of the output if the block has not been ended.
+        """
+        if self._end is None and self._capture is not None:
+            return self._capture.size
+        return self._end
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether the end of the block has been printed, a solver stopped while printing leaves an incomplete block.
+        """
+        return self._end is not None
+
+    @property
+    def isProof(self) -> bool:
+        return self._form is not None and self._form.lower() in SZSOutputBlock.PROOF_FORMS
+
+    @property
+    def isModel(self) -> bool:
+        return self._form is not None and self._form.lower() in SZSOutputBlock.MODEL_FORMS
+
+    def withCapture(self, capture:OutputCapture):
+        """
+        The same block reading its content from capture.
+        """
+        return SZSOutputBlock(self._form, self._start, self._end, capture=capture)
+
+    @property
+    def isAvailable(self) -> bool:
+        """
+        Whether the content has been captured completely, see OutputCapture for the limits of a capture.
+        """
+        return self._capture is not None and self._capture.isAvailable(self._start, self.end)
+
+    def chunks(self):
+        """
+        Yields the content in chunks.
+        :raise ValueError: if the content has not been captured completely
+        """
+        if self._capture is None:
+            raise ValueError('The block is not bound to a capture of the output.')
+        return self._capture.chunks(self._start, self.end)
+
+    def bytes(self) -> bytes:
+        return b''.join(self.chunks())
+
+    def text(self) -> str:
+        return self.bytes().decode('utf8', errors='replace')
+
+    def writeTo(self, path:Path):
+        """
+        Writes the content to a file chunk by chunk.
+        """
+        with Path(path).open('wb') as f:
+            for chunk in self.chunks():
+                f.write(chunk)
+
+
+class SZSOutputScanner:
+    """
+    Scans the output of a solver incrementally, chunk by chunk as it arrives, for
+    * SZS status lines: '% SZS status <status>', the FIRST or the LAST one is the status of the output
+    * SZS output blocks: '% SZS output start <form>' up to '% SZS output end', kept as SZSOutputBlocks
+
+    Only the incomplete last line is buffered, lines are found by a single search per chunk.
+    """
+    FIRST = 'first'
+    LAST = 'last'
+    POLICIES = [FIRST, LAST]
+    # the start of a line kept at most, SZS lines are short
+    MAX_LINE = 4096
+
+    _PATTERN = re.compile(rb'% SZS (status|output start|output end)(?:[ \t]+([^\s]+))?', re.I)
+
+    def __init__(self, policy:str=FIRST):
+        """
+        :param policy: FIRST or LAST, which status line wins if a solver prints several
+        """
+        if policy not in SZSOutputScanner.POLICIES:
+            raise ValueError('Unknown policy {}, choose from {}.'.format(policy, SZSOutputScanner.POLICIES))
+        self._policy = policy
+        # the start of the incomplete last line and its offset in the output
+        self._line = b''
+        self._lineStart = 0
+        self._size = 0
+        self._firstStatus = None
+        self._lastStatus = None
+        self._blocks = []
+        self._open = None
+
+    @property
+    def policy(self) -> str:
+        return self._policy
+
+    @property
+    def status(self) -> SZSStatus:
+        """
+        The status by the policy, None if no status has been printed so far.
+        """
+        return self._firstStatus if self._policy == SZSOutputScanner.FIRST else self._lastStatus
+
+    @property
+    def firstStatus(self) -> SZSStatus:
+        return self._firstStatus
+
+    @property
+    def lastStatus(self) -> SZSStatus:
+        return self._lastStatus
+
+    @property
+    def blocks(self) -> List[SZSOutputBlock]:
+        """
+        The output blocks started so far, the last one may be incomplete.
+        """
+        return list(self._blocks)
+
+    def hasCompleteBlock(self) -> bool:
+        return any(b.complete for b in self._blocks)
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes scanned so far.
+        """
+        return self._size
+
+    def __call__(self, chunk:bytes):
+        """
+        Scans the next chunk of the output.
+        """
+        end = chunk.rfind(b'\n') + 1
+        if end:
+            # the complete lines: the pending line and the chunk up to its last newline
+            data = self._line + chunk[:end] if self._line else chunk[:end]
+            # the end of a pending line longer than MAX_LINE has been cut off
+            self._scan(data, self._lineStart, cut=len(self._line), gap=self._size - self._lineStart - len(self._line))
+            self._line = b''
+            self._lineStart = self._size + end
+        if len(self._line) < SZSOutputScanner.MAX_LINE:
+            self._line += chunk[end:end + SZSOutputScanner.MAX_LINE - len(self._line)]
+        self._size += len(chunk)
+
+    def finish(self):
+        """
+        Scans the last line, called when the output has ended without a final newline.
+        """
+        line, self._line = self._line, b''
+        self._scan(line, self._lineStart)
+
+    def _scan(self, data:bytes, offset:int, *,
+        cut: int=0,
+        gap: int=0,
+    ):
+        """
+        :param data: complete lines, except at the end of the output
+        :param offset: offset of data in the output
+        :param cut: position in data at which gap bytes of the output have been cut out
+        """
+        position = lambda i: offset + i + (gap if i >= cut else 0)
+        for m in SZSOutputScanner._PATTERN.finditer(data):
+            kind = m.group(1).lower()
+            value = m.group(2).decode('utf8', errors='replace') if m.group(2) else None
+            if kind == b'status':
+                try:
+                    status = SZSStatus.get(value) if value else None
+                except UnknownSZSStatusError:
+                    status = None
+                if status is not None:
+                    if self._firstStatus is None:
+                        self._firstStatus = status
+                    self._lastStatus = status
+            elif kind == b'output start':
+                lineEnd = data.find(b'\n', m.end())
+                start = position(lineEnd + 1) if lineEnd >= 0 else self._size
+                self._open = SZSOutputBlock(value, start)
+                self._blocks.append(self._open)
+            elif self._open is not None:
+                lineStart = data.rfind(b'\n', 0, m.start()) + 1
+                self._open._end = position(lineStart) if lineStart > 0 else offset
+                self._open = None
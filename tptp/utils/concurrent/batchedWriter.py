@@ -0,0 +1,203 @@
+import collections
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+class BatchedWriter:
+    '''
+    Writes files on a background thread, s.t. the submitting thread never waits for the file system.
+
+    Usage:
+    * append(self, path, text) to append text to a file
+    * write(self, path, text) to replace the content of a file
+    * writeChunks(self, path, chunks) to replace the content of a file by an iterable of bytes, consumed on the writer
+      thread
+    * call(self, function, *args) to run any other output operation on the writer thread
+    * flush(self) to wait until everything submitted so far has been applied and flushed
+    * close(self) to flush and fsync everything submitted so far and to stop the writer thread
+
+    Behaviour:
+    * operations are applied in the order they are submitted
+    * submitting only blocks if more than queueSize operations are pending
+    * all operations pending at a time are applied as one batch, appended files are kept open between
+      batches and the ones appended to are flushed once per batch
+    * written files are fsynced every fsyncInterval seconds, never if fsyncInterval is None, and on close
+    * an operation which fails does not affect the other operations of its batch, the first exception raised on the
+      writer thread is raised again by the next submit, flush or close
+    '''
+
+    _CLOSE = object()
+
+    def __init__(self, *,
+        queueSize: int=1024,
+        fsyncInterval: float=5.0,
+        maxOpenFiles: int=64,
+    ):
+        self._queue = queue.Queue(maxsize=queueSize)
+        self._fsyncInterval = fsyncInterval
+        self._maxOpenFiles = maxOpenFiles
+        self._openFiles = collections.OrderedDict()
+        self._unsynced = set()
+        # appended files written to in the current batch
+        self._unflushed = set()
+        self._lastSync = time.time()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name='BatchedWriter', daemon=True)
+        self._thread.start()
+
+    def append(self, path:Path, text:str):
+        self._submit(('a', Path(path), text))
+
+    def write(self, path:Path, text:str):
+        self._submit(('w', Path(path), text))
+
+    def writeChunks(self, path:Path, chunks):
+        self._submit(('b', Path(path), chunks))
+
+    def call(self, function, *args):
+        self._submit(('c', function, args))
+
+    def flush(self):
+        '''
+        Waits until all operations submitted so far have been applied and the written files have been flushed.
+        '''
+        if self._closed:
+            self._raiseError()
+            return
+        done = threading.Event()
+        self._submit(('f', done))
+        done.wait()
+        self._raiseError()
+
+    def _submit(self, operation):
+        self._raiseError()
+        if self._closed:
+            raise ValueError('Writer is closed.')
+        self._queue.put(operation)
+
+    def _raiseError(self):
+        if self._error:
+            error, self._error = self._error, None
+            raise error
+
+    def close(self):
+        '''
+        Applies all pending operations, fsyncs all written files and stops the writer thread.
+        '''
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(BatchedWriter._CLOSE)
+        self._thread.join()
+        self._raiseError()
+
+    def _loop(self):
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self._timeUntilSync())]
+            except queue.Empty:
+                batch = []
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            flushed = []
+            for operation in batch:
+                if operation is BatchedWriter._CLOSE:
+                    running = False
+                elif operation[0] == 'f':
+                    flushed.append(operation[1])
+                else:
+                    self._guarded(self._apply, operation)
+            unflushed, self._unflushed = self._unflushed, set()
+            for path in unflushed:
+                f = self._openFiles.get(path, None)
+                if f:
+                    self._guarded(f.flush)
+            if not running or self._timeUntilSync() == 0:
+                self._sync()
+            for done in flushed:
+                done.set()
+        for f in self._openFiles.values():
+            self._guarded(f.close)
+        self._openFiles.clear()
+
+    def _guarded(self, function, *args):
+        '''
+        Runs a step of the writer thread, keeping the first exception to raise it on the submitting thread.
+        '''
+        try:
+            function(*args)
+        except Exception as e:
+            logger.exception('writer failed')
+            if not self._error:
+                self._error = e
+
+    def _apply(self, operation):
+        kind = operation[0]
+        if kind == 'a':
+            self._file(operation[1]).write(operation[2])
+            self._unflushed.add(operation[1])
+            self._unsynced.add(operation[1])
+        elif kind == 'w':
+            self._closeFile(operation[1])
+            with operation[1].open('w') as f:
+                f.write(operation[2])
+            self._unsynced.add(operation[1])
+        elif kind == 'b':
+            self._closeFile(operation[1])
+            with operation[1].open('wb') as f:
+                for chunk in operation[2]:
+                    f.write(chunk)
+            self._unsynced.add(operation[1])
+        else:
+            operation[1](*operation[2])
+
+    def _file(self, path:Path):
+        f = self._openFiles.get(path, None)
+        if f:
+            self._openFiles.move_to_end(path)
+            return f
+        if len(self._openFiles) >= self._maxOpenFiles:
+            self._closeFile(next(iter(self._openFiles)))
+        f = path.open('a')
+        self._openFiles[path] = f
+        return f
+
+    def _closeFile(self, path:Path):
+        f = self._openFiles.pop(path, None)
+        if f:
+            f.close()
+
+    def _sync(self):
+        unsynced, self._unsynced = self._unsynced, set()
+        self._lastSync = time.time()
+        for path in unsynced:
+            self._guarded(self._syncFile, path)
+
+    def _syncFile(self, path:Path):
+        f = self._openFiles.get(path, None)
+        if f:
+            os.fsync(f.fileno())
+        else:
+            fd = os.open(str(path), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def _timeUntilSync(self):
+        '''
+        Time the writer thread may wait for new operations, None for no limit.
+        '''
+        if self._fsyncInterval is None or not self._unsynced:
+            return None
+        return max(0, self._lastSync + self._fsyncInterval - time.time())
@@ -0,0 +1,74 @@
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+CPU_SYSFS_PATH = Path('/sys/devices/system/cpu')
+
+def physicalCores(cpus:Set[int]) -> Dict[Tuple[int, int], List[int]]:
+    """
+    The given logical cpus grouped by the physical core they belong to, i.e. SMT siblings share a group.
+    A cpu without topology information is a core of its own.
+    """
+    cores = {}
+    for cpu in sorted(cpus):
+        topology = CPU_SYSFS_PATH / 'cpu{}'.format(cpu) / 'topology'
+        try:
+            package = int((topology / 'physical_package_id').read_text())
+            core = int((topology / 'core_id').read_text())
+        except (OSError, ValueError):
+            package, core = -1, cpu
+        cores.setdefault((package, core), []).append(cpu)
+    return cores
+
+
+class CoreAllocator:
+    """
+    Hands out disjoint sets of cpus to parallel calls, s.t. a call does not share cores (and their caches) with
+    another call. Cpus are assigned in the order of their physical cores, hence SMT siblings only end up in the same set
+    if coresPerSlot is a multiple of the siblings per core. Otherwise a core is split between sets, which share its
+    caches; with avoidSmt only one cpu of every physical core is used, s.t. sets never share a core.
+
+    Usage:
+    * acquire(self) before a process is started, blocks until a set is free
+    * release(self, cpus) after the process has been reaped
+    """
+    def __init__(self, slots:int, *,
+        coresPerSlot: int=None,
+        avoidSmt: bool=False,
+        cpus: Set[int]=None,
+    ):
+        """
+        :param slots: number of sets, i.e. calls running at the same time
+        :param coresPerSlot: cpus of a set, by default the available cpus are divided evenly
+        :param cpus: the cpus to use, by default all cpus this process may run on
+        :raise ValueError: if there are not enough cpus
+        """
+        cpus = set(cpus) if cpus else set(os.sched_getaffinity(0))
+        cores = physicalCores(cpus)
+        if avoidSmt:
+            ordered = [siblings[0] for siblings in cores.values()]
+        else:
+            ordered = [cpu for siblings in cores.values() for cpu in siblings]
+        if coresPerSlot is None:
+            coresPerSlot = len(ordered) // slots
+        if coresPerSlot < 1 or slots * coresPerSlot > len(ordered):
+            raise ValueError('{} parallel calls with {} cpus each need more than the {} available {}.'.format(
+                slots, max(1, coresPerSlot), len(ordered), 'physical cores' if avoidSmt else 'cpus',
+            ))
+        self._free = [frozenset(ordered[i * coresPerSlot:(i + 1) * coresPerSlot]) for i in range(slots)]
+        self._condition = threading.Condition()
+
+    def __repr__(self):
+        return 'CoreAllocator({})'.format(', '.join(map(lambda s: str(sorted(s)), self._free)))
+
+    def acquire(self) -> frozenset:
+        with self._condition:
+            while not self._free:
+                self._condition.wait()
+            return self._free.pop(0)
+
+    def release(self, cpus:frozenset):
+        with self._condition:
+            self._free.append(cpus)
+            self._condition.notify()
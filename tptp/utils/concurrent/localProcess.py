@@ -1,12 +1,250 @@
+import fcntl
 import logging
+import mmap
+import selectors
 import subprocess
 import os
 import signal
+import sys
+import time
+from concurrent import futures
 
 logger = logging.getLogger(__name__)
 
 from .timer import Timer
 from .process import Process, NotYetStartedError
+from .resourceLimits import CpuLimit, MemoryLimit, canLimitOtherProcesses
+from .outputCapture import OutputCapture
+
+
+class ResourceUsage:
+    """
+    Resources used by a reaped process and all its descendants it has waited for.
+    """
+    def __init__(self, *,
+        cpuUser: float,
+        cpuSystem: float,
+        maxRss: int,
+        voluntaryContextSwitches: int,
+        involuntaryContextSwitches: int,
+    ):
+        self._cpuUser = cpuUser
+        self._cpuSystem = cpuSystem
+        self._maxRss = maxRss
+        self._voluntaryContextSwitches = voluntaryContextSwitches
+        self._involuntaryContextSwitches = involuntaryContextSwitches
+
+    @staticmethod
+    def fromRusage(rusage):
+        return ResourceUsage(
+            cpuUser=rusage.ru_utime,
+            cpuSystem=rusage.ru_stime,
+            # kilobytes on linux, bytes on macOS
+            maxRss=rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss,
+            voluntaryContextSwitches=rusage.ru_nvcsw,
+            involuntaryContextSwitches=rusage.ru_nivcsw,
+        )
+
+    @property
+    def cpu(self) -> float:
+        """
+        User and system cpu time in seconds.
+        """
+        return self._cpuUser + self._cpuSystem
+
+    @property
+    def cpuUser(self) -> float:
+        return self._cpuUser
+
+    @property
+    def cpuSystem(self) -> float:
+        return self._cpuSystem
+
+    @property
+    def maxRss(self) -> int:
+        """
+        Peak resident set size in KiB of the largest process.
+        """
+        return self._maxRss
+
+    @property
+    def voluntaryContextSwitches(self) -> int:
+        return self._voluntaryContextSwitches
+
+    @property
+    def involuntaryContextSwitches(self) -> int:
+        return self._involuntaryContextSwitches
+
+
+class _ResourceUsagePopen(subprocess.Popen):
+    """
+    Reaps the child with os.wait4 instead of os.waitpid, s.t. its resource usage is kept.
+    """
+    rusage = None
+
+    def _try_wait(self, wait_flags):
+        try:
+            (pid, sts, rusage) = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            # same as subprocess.Popen, the child is dead and we can't get its status
+            return (self.pid, 0)
+        if pid == self.pid:
+            self.rusage = rusage
+        return (pid, sts)
+
+    def reap(self) -> bool:
+        """
+        Reaps the child if it has exited, without blocking. Unlike poll() the resource usage is kept.
+        :return: whether the child has been reaped
+        """
+        try:
+            self.wait(timeout=0)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+
+
+class _SpawnedProcess:
+    """
+    A child started by os.posix_spawnp in a session of its own, with the part of the Popen interface LocalProcess
+    uses. Unlike a fork, posix_spawn does not copy the page tables of this process.
+
+    A child which has to be limited before it runs the command is gated: /bin/sh is spawned, waits until the limits
+    have been applied to it from this process and then execs the command. This costs an exec of /bin/sh per call, but
+    unlike a fork its cost does not grow with the size of this process. Every call of a competition has a cpu limit
+    and is gated, dev/benchmarks/spawnLatency.py compares both.
+    """
+    # signals python ignores, which are reset for the child like Popen(restore_signals=True) does
+    RESTORED_SIGNALS = tuple(getattr(signal, s) for s in ['SIGPIPE', 'SIGXFSZ'] if hasattr(signal, s))
+    # a gated child is a shell waiting for a line on GATE_FD before it execs the command
+    SHELL = '/bin/sh'
+    GATE_FD = 4
+    GATE = 'read line <&{fd} && exec "$0" "$@" {fd}<&-'.format(fd=GATE_FD)
+
+    def __init__(self, argv, *,
+        stdin: bool=False,
+        passFd: tuple=None,
+        gated: bool=False,
+    ):
+        """
+        :param stdin: whether stdin of the child is a pipe (self.stdin), otherwise it is inherited
+        :param passFd: a pair of a fd of this process and the number it gets in the child
+        :param gated: whether the command is held until openGate() is called, e.g. to apply limits to the child first
+        """
+        self.args = argv
+        self.returncode = None
+        self.rusage = None
+        self.stdin = None
+        self._gate = None
+        stdoutRead, stdoutWrite = os.pipe()
+        stderrRead, stderrWrite = os.pipe()
+        stdinRead, stdinWrite = os.pipe() if stdin else (None, None)
+        gateRead, self._gate = _SpawnedProcess._highPipe() if gated else (None, None)
+        # the pipes are not inheritable, only their copies as stdin, stdout and stderr are passed to the child
+        actions = [
+            (os.POSIX_SPAWN_DUP2, stdoutWrite, 1),
+            (os.POSIX_SPAWN_DUP2, stderrWrite, 2),
+        ]
+        if stdin:
+            actions.append((os.POSIX_SPAWN_DUP2, stdinRead, 0))
+        if passFd:
+            actions.append((os.POSIX_SPAWN_DUP2, passFd[0], passFd[1]))
+        if gated:
+            # after passFd, which may be GATE_FD in this process
+            actions.append((os.POSIX_SPAWN_DUP2, gateRead, self.GATE_FD))
+            argv = [self.SHELL, '-c', self.GATE] + list(argv)
+        try:
+            self.pid = os.posix_spawnp(argv[0], argv, dict(os.environ),
+                file_actions=actions,
+                setsid=True,
+                setsigdef=self.RESTORED_SIGNALS,
+            )
+        except:
+            for fd in [stdoutRead, stderrRead, stdinWrite, self._gate]:
+                if fd is not None:
+                    os.close(fd)
+            raise
+        finally:
+            for fd in [stdoutWrite, stderrWrite, stdinRead, gateRead]:
+                if fd is not None:
+                    os.close(fd)
+        self.stdout = os.fdopen(stdoutRead, 'rb')
+        self.stderr = os.fdopen(stderrRead, 'rb')
+        if stdin:
+            self.stdin = os.fdopen(stdinWrite, 'wb')
+
+    @staticmethod
+    def isAvailable() -> bool:
+        # setsid of posix_spawn is available since python 3.8
+        return hasattr(os, 'posix_spawnp') and sys.version_info >= (3, 8)
+
+    @staticmethod
+    def isGateAvailable() -> bool:
+        return os.access(_SpawnedProcess.SHELL, os.X_OK)
+
+    @staticmethod
+    def _highPipe():
+        """
+        A pipe whose fds are above the fds duplicated into the child, s.t. no action overwrites them.
+        """
+        read, write = os.pipe()
+        try:
+            return fcntl.fcntl(read, fcntl.F_DUPFD_CLOEXEC, 10), write
+        finally:
+            os.close(read)
+
+    def openGate(self):
+        """
+        Lets a gated child run its command.
+        """
+        gate, self._gate = self._gate, None
+        try:
+            os.write(gate, b'\n')
+        finally:
+            os.close(gate)
+
+    def _tryWait(self, flags) -> bool:
+        if self.returncode is not None:
+            return True
+        pid, sts, rusage = os.wait4(self.pid, flags)
+        if pid != self.pid:
+            return False
+        self.rusage = rusage
+        self.returncode = -os.WTERMSIG(sts) if os.WIFSIGNALED(sts) else os.WEXITSTATUS(sts)
+        return True
+
+    def reap(self) -> bool:
+        return self._tryWait(os.WNOHANG)
+
+    def poll(self) -> int:
+        self.reap()
+        return self.returncode
+
+    def wait(self, timeout:float=None) -> int:
+        if timeout is None:
+            self._tryWait(0)
+            return self.returncode
+        # the same busy loop with growing delays as Popen.wait
+        end = time.time() + timeout
+        delay = 0.0005
+        while not self.reap():
+            remaining = end - time.time()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            delay = min(delay * 2, remaining, 0.05)
+            time.sleep(delay)
+        return self.returncode
+
+    def kill(self):
+        if self._gate is not None:
+            # the shell exits without running the command
+            os.close(self._gate)
+            self._gate = None
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
 
 
 class LocalProcess(Process):
@@ -21,10 +259,66 @@ class LocalProcess(Process):
     TIMEOUT = 7
     FORCED_TERMINATED = 8
     FORCED_KILLED = 9
+
+    # limits which may cause a TIMEOUT
+    WC_LIMIT = 'wc'
+    CPU_LIMIT = 'cpu'
+
+    # seconds between two checks of the cpu time of the process group
+    CPU_POLL_INTERVAL = 1.0
+    # seconds a process group may take to exit after SIGTERM before it is killed
+    TERMINATION_GRACE_PERIOD = 1.0
+    # bytes read from a pipe at once
+    READ_SIZE = 64 * 1024
+    # the fd an in-memory input file gets in the child, and its path there
+    INPUT_FD = 3
+    INPUT_FD_PATH = '/proc/self/fd/{}'.format(INPUT_FD)
+    # whether children are spawned where possible, see _SpawnedProcess, False always forks them
+    POSIX_SPAWN = True
     
-    def __init__(self, call=None, *, timeout=None):
+    def __init__(self, call=None, *,
+        timeout=None,
+        memoryLimit: int=None,
+        cpuLimit: float=None,
+        coreAllocator=None,
+        outputWatcher=None,
+        captureLimit: int=None,
+        spillOutput: bool=False,
+        supervisor=None,
+        stdin: bytes=None,
+        inputFile: bytes=None,
+    ):
+        """
+        :param timeout: maximum wall clock time in seconds, None for no limit
+        :param memoryLimit: maximum memory of the process and its descendants in bytes, None for no limit
+        :param cpuLimit: maximum cpu time of the process and its descendants in seconds, None for no limit
+        :param coreAllocator: CoreAllocator the process takes the cpus it is pinned to from, None for no pinning
+        :param outputWatcher: called with every chunk of stdout as it arrives, if it returns True the process has
+            given its answer and its process group is terminated
+        :param captureLimit: bytes of stdout and of stderr kept in memory (the start and the end), None for no limit
+        :param spillOutput: whether the bytes of stdout and stderr beyond the captureLimit are kept in a temporary file
+        :param supervisor: ProcessSupervisor watching the process on its event loop, None to watch it in the thread
+            calling communicate()
+        :param stdin: bytes written to stdin of the process, None to inherit stdin of this process
+        :param inputFile: bytes of an in-memory file (memfd) the process can open at INPUT_FD_PATH, None for none
+        """
         self._timeout = timeout
         self._call = call
+        self._memoryLimit = MemoryLimit(memoryLimit) if memoryLimit else None
+        self._isMemoryOut = False
+        self._cpuLimit = CpuLimit(cpuLimit) if cpuLimit else None
+        self._exceededLimit = None
+        self._coreAllocator = coreAllocator
+        self._cores = None
+        self._outputWatcher = outputWatcher
+        self._timeAnswered = None
+        self._captureLimit = captureLimit
+        self._spillOutput = spillOutput
+        self._supervisor = supervisor
+        self._stdin = stdin
+        self._pendingInput = None
+        self._inputFile = inputFile
+        self._inputFd = None
 
         self._timeout_calculated = None
         self._call_calculated = None
@@ -61,6 +355,31 @@ class LocalProcess(Process):
         """
         return self._state == self.TIMEOUT
 
+    def exceededLimit(self) -> str:
+        """
+        The limit which caused a timeout, WC_LIMIT or CPU_LIMIT, None if there was no timeout.
+        """
+        return self._exceededLimit
+
+    def timeAnswered(self) -> float:
+        """
+        Seconds after the start at which the output watcher has recognized the answer, None if it has not.
+        """
+        return self._timeAnswered
+
+    def cores(self) -> frozenset:
+        """
+        The cpus the process has been pinned to, None if it has not been pinned.
+        """
+        return self._cores
+
+    def isMemoryOut(self) -> bool:
+        """
+        Whether the process was killed for exceeding its memory limit.
+        Only detected if the limit is enforced by a cgroup, a process exceeding an rlimit just fails to allocate memory.
+        """
+        return self._isMemoryOut
+
     def isInterupted(self) -> bool:
         """
         Whether the process has beed tried to be canceled, terminated or killed.
@@ -123,17 +442,133 @@ class LocalProcess(Process):
 
         self._state = self.STARTED
 
+        if self._memoryLimit:
+            self._memoryLimit.prepare()
+        if self._coreAllocator:
+            self._cores = self._coreAllocator.acquire()
+
         # The os.setsid() is passed in the argument preexec_fn so
         # it's run after the fork() and before exec() to run the shell.
         # @see https://stackoverflow.com/questions/4789837/how-to-terminate-a-python-subprocess-launched-with-shell-true
-        self._process = subprocess.Popen(
-            self._call_calculated,
-            stdout=subprocess.PIPE, # store the stdout in in the subprocess itself
-            stderr=subprocess.PIPE, # store the stderr in in the subprocess itself
-            preexec_fn=os.setsid,
-            env=os.environ,  # use the environment of the python instance, s.t. we can set enviroment variables for started subprocesses
-            shell=True,
-        )
+        try:
+            if self._inputFile is not None:
+                self._inputFd = LocalProcess.createInputFile(self._inputFile)
+                # the in-memory file has a copy
+                LocalProcess._closeInput(self._inputFile)
+                self._inputFile = None
+            shell = isinstance(self._call_calculated, str)
+            if not shell and LocalProcess.POSIX_SPAWN and _SpawnedProcess.isAvailable() and self._canLimitAfterSpawn():
+                # neither a shell nor a fork of this (possibly large) python process
+                self._process = _SpawnedProcess(self._call_calculated,
+                    stdin=self._stdin is not None,
+                    passFd=(self._inputFd, self.INPUT_FD) if self._inputFd is not None else None,
+                    gated=self._needsPreexec(),
+                )
+                if self._needsPreexec():
+                    self._limitSpawned()
+            else:
+                # python code between fork() and exec() is the fallback, it is not safe in a threaded process
+                self._process = _ResourceUsagePopen(
+                    self._call_calculated,
+                    stdin=subprocess.PIPE if self._stdin is not None else None,
+                    stdout=subprocess.PIPE, # store the stdout in in the subprocess itself
+                    stderr=subprocess.PIPE, # store the stderr in in the subprocess itself
+                    preexec_fn=self._preexec,
+                    env=os.environ,  # use the environment of the python instance, s.t. we can set enviroment variables for started subprocesses
+                    shell=shell,
+                    # kept open, preexec replaces it by the input file
+                    pass_fds=(self.INPUT_FD,) if self._inputFd is not None else (),
+                )
+        except:
+            self._releaseResources()
+            raise
+        if self._inputFd is not None:
+            # the child has its own copy
+            os.close(self._inputFd)
+            self._inputFd = None
+
+    def _needsPreexec(self) -> bool:
+        """
+        Whether the child has to run code before exec() besides starting a new session.
+        """
+        return bool(self._memoryLimit or self._cpuLimit or self._cores)
+
+    def _canLimitAfterSpawn(self) -> bool:
+        """
+        Whether the limits can be applied to a spawned child before it runs the command, see _limitSpawned().
+        """
+        return not self._needsPreexec() or (canLimitOtherProcesses() and _SpawnedProcess.isGateAvailable())
+
+    def _limitSpawned(self):
+        """
+        Applies the limits to a gated child from this process, the same as _preexec() does in a forked child.
+        """
+        pid = self._process.pid
+        try:
+            if self._memoryLimit:
+                self._memoryLimit.applyTo(pid)
+            if self._cpuLimit:
+                self._cpuLimit.applyTo(pid)
+            if self._cores:
+                os.sched_setaffinity(pid, self._cores)
+            self._process.openGate()
+        except:
+            self._process.kill()
+            self._process.wait()
+            for f in [self._process.stdin, self._process.stdout, self._process.stderr]:
+                if f is not None:
+                    f.close()
+            raise
+
+    def _preexec(self):
+        """
+        Runs in the child after fork() and before exec().
+        """
+        os.setsid()
+        if self._memoryLimit:
+            self._memoryLimit.applyInChild()
+        if self._cpuLimit:
+            self._cpuLimit.applyInChild()
+        if self._cores:
+            os.sched_setaffinity(0, self._cores)
+        if self._inputFd is not None:
+            os.dup2(self._inputFd, self.INPUT_FD)
+
+    @staticmethod
+    def isInputFileAvailable() -> bool:
+        """
+        Whether in-memory input files are supported, i.e. memfd_create and /proc are available.
+        """
+        return hasattr(os, 'memfd_create') and os.path.isdir('/proc/self/fd')
+
+    @staticmethod
+    def createInputFile(data:bytes) -> int:
+        """
+        An in-memory file holding data, not inherited by any child unless passed explicitly.
+        :return: its fd, never INPUT_FD, s.t. it can be duplicated to INPUT_FD in the child
+        """
+        fd = os.memfd_create('tptp-input', os.MFD_CLOEXEC)
+        if fd == LocalProcess.INPUT_FD:
+            fd = os.dup(fd)
+            os.close(LocalProcess.INPUT_FD)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        except:
+            os.close(fd)
+            raise
+        return fd
+
+    def resourceUsage(self) -> ResourceUsage:
+        """
+        Resources used by the process, including all processes it has waited for.
+        None if the process has not been reaped yet or its usage is not available.
+        """
+        process = getattr(self, '_process', None)
+        if process is None or process.rusage is None:
+            return None
+        return ResourceUsage.fromRusage(process.rusage)
 
     def call(self):
         if not self.isStarted():
@@ -192,7 +627,7 @@ class LocalProcess(Process):
         Terminates the underlaying execution.
         '''
         # @see https://stackoverflow.com/questions/4789837/how-to-terminate-a-python-subprocess-launched-with-shell-true
-        os.killpg(os.getpgid(self._process.pid), signal.SIGTERM)  # Send the signal to all the process groups
+        self._signalGroup(signal.SIGTERM)  # Send the signal to all the process groups
 
     def _kill(self):
         '''
@@ -200,32 +635,58 @@ class LocalProcess(Process):
         @TODO verify: SIGKILL does not work on windows? use signal.SIGTERM maybe?
         '''
         # @see https://stackoverflow.com/questions/4789837/how-to-terminate-a-python-subprocess-launched-with-shell-true
-        os.killpg(os.getpgid(self._process.pid), signal.SIGKILL)  # Send the signal to all the process groups
+        self._signalGroup(signal.SIGKILL)  # Send the signal to all the process groups
+
+    def _signalGroup(self, signum):
+        # the process is the leader of its own group (setsid), the group outlives the leader as long as members exist
+        try:
+            os.killpg(self._process.pid, signum)
+        except ProcessLookupError:
+            pass
 
     def communicate(self):
+        """
+        Waits for the process.
+        :return: stdout and stderr decoded as utf8 (invalid bytes are replaced) and the return code
+        """
+        stdout, stderr, returncode = self.communicateCaptured()
+        return stdout.bytes().decode('utf8', errors='replace'), stderr.bytes().decode('utf8', errors='replace'), returncode
+
+    def communicateCaptured(self):
+        """
+        Waits for the process.
+        :return: the OutputCapture of stdout and of stderr and the return code
+        """
         if not self.isStarted():
             raise NotYetStartedError()
         
         try:
             stdout, stderr, returncode = self.communicate0()
-        except:
-            raise
         finally:
-            self.timer.end()
-            # set state if anything is terminated
-            if self._isTimeout:
-                self._state = self.TIMEOUT
-            elif self._isForcedTerminated:
-                self._state = self.FORCED_TERMINATED
-            elif self._isForcedKilled:
-                self._state = self.FORCED_KILLED
-            else:
-                self._state = self.COMPLETED
+            self._finishCommunication()
 
-        stdout_utf8 = stdout.decode('utf8')
-        stderr_utf8 = stderr.decode('utf8')
+        return stdout, stderr, returncode
 
-        return stdout_utf8, stderr_utf8, returncode
+    def _finishCommunication(self):
+        """
+        Records the outcome of the process after it has been reaped.
+        """
+        self.timer.end()
+        if self._memoryLimit:
+            self._isMemoryOut = self._memoryLimit.isExceeded()
+        self._releaseResources()
+        if self._cpuLimit and not self._isTimeout and self._isStoppedByRlimitCpu():
+            self._isTimeout = True
+            self._exceededLimit = self.CPU_LIMIT
+        # set state if anything is terminated
+        if self._isTimeout:
+            self._state = self.TIMEOUT
+        elif self._isForcedTerminated:
+            self._state = self.FORCED_TERMINATED
+        elif self._isForcedKilled:
+            self._state = self.FORCED_KILLED
+        else:
+            self._state = self.COMPLETED
 
     def communicate0(self):
         try:
@@ -237,25 +698,218 @@ class LocalProcess(Process):
         return stdout, stderr, returncode
 
     def communicate1(self):
-        if self._timeout:
-            try:
-                stdout, stderr = self._process.communicate(timeout=self._timeout)
-            except subprocess.TimeoutExpired:
-                # remember timeout
-                self._isTimeout = True
-                self._kill()
-                stdout, stderr = self._process.communicate()
-
-                self._state = self.TIMEOUT
-                return stdout, stderr, self._process.returncode
-        else:
-            stdout, stderr = self._process.communicate()
-        return stdout, stderr, self._process.returncode
+        """
+        Reads stdout and stderr until both are closed and the process has exited,
+        while enforcing the limits and watching stdout for an answer.
+        """
+        if self._supervisor:
+            return self._supervisor.supervise(self).result()
+
+        self._beginSupervision()
+        with selectors.DefaultSelector() as selector:
+            for f in [self._process.stdout, self._process.stderr]:
+                selector.register(f, selectors.EVENT_READ)
+            if self._process.stdin is not None:
+                selector.register(self._process.stdin, selectors.EVENT_WRITE)
+            while True:
+                wakeup = self._nextWakeup()
+                wait = max(0, wakeup - time.time()) if wakeup is not None else None
+                if selector.get_map():
+                    for key, events in selector.select(wait):
+                        if key.fileobj is self._process.stdin:
+                            if self._onWritable():
+                                selector.unregister(key.fileobj)
+                                key.fileobj.close()
+                            continue
+                        data = os.read(key.fd, self.READ_SIZE)
+                        if not data:
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()
+                            continue
+                        self._onOutput(key.fileobj, data)
+                else:
+                    try:
+                        self._process.wait(timeout=wait)
+                        break
+                    except subprocess.TimeoutExpired:
+                        pass
+                self._onWakeup(time.time())
+
+        return self._endSupervision()
+
+    def _beginSupervision(self):
+        """
+        Prepares watching the started process, either by communicate1() or by a ProcessSupervisor.
+        The process is watched by feeding its output to _onOutput(), calling _onWakeup() at least at _nextWakeup() and
+        calling _endSupervision() after both pipes are closed and the process has been reaped.
+        """
+        self._supervisionStart = time.time()
+        timeout = self._timeout_calculated
+        self._deadline = self._supervisionStart + timeout if timeout else None
+        # the cpu time of the whole group is checked periodically
+        self._nextCpuCheck = self._supervisionStart + self.CPU_POLL_INTERVAL if self._cpuLimit else None
+        # the process group is killed if it does not exit within a grace period after it has been asked to
+        self._killDeadline = None
+        self._stdoutCapture = self._newCapture()
+        self._stderrCapture = self._newCapture()
+        self._pendingInput = memoryview(self._stdin) if self._stdin is not None else None
+        if self._process.stdin is not None:
+            os.set_blocking(self._process.stdin.fileno(), False)
+
+    def _nextWakeup(self) -> float:
+        """
+        The next point in time _onWakeup() has to be called at, None if there is none.
+        """
+        wakeups = [t for t in [self._deadline, self._nextCpuCheck, self._killDeadline] if t is not None]
+        return min(wakeups) if wakeups else None
+
+    def _onOutput(self, pipe, data:bytes):
+        if pipe is self._process.stderr:
+            self._stderrCapture.write(data)
+            return
+        self._stdoutCapture.write(data)
+        if self._outputWatcher and self._timeAnswered is None and self._outputWatcher(data):
+            # the solver has given its answer, anything it does from now on is not of interest
+            self._timeAnswered = time.time() - self._supervisionStart
+            self._signalGroup(signal.SIGTERM)
+            self._killDeadline = time.time() + self.TERMINATION_GRACE_PERIOD
+            self._deadline = None
+            self._nextCpuCheck = None
+
+    def _onWritable(self) -> bool:
+        """
+        Writes the next part of the input to stdin of the process.
+        :return: whether the input is complete (or the process does not read it any more) and stdin can be closed
+        """
+        try:
+            written = os.write(self._process.stdin.fileno(), self._pendingInput[:self.READ_SIZE])
+        except BlockingIOError:
+            return False
+        except BrokenPipeError:
+            self._releaseStdin()
+            return True
+        self._pendingInput = self._pendingInput[written:]
+        if len(self._pendingInput) > 0:
+            return False
+        self._releaseStdin()
+        return True
+
+    def _releaseStdin(self):
+        """
+        Drops the input of stdin once it has been written, a memory mapped problem holds a file descriptor.
+        """
+        if self._pendingInput is not None:
+            self._pendingInput.release()
+            self._pendingInput = None
+        LocalProcess._closeInput(self._stdin)
+        self._stdin = None
+
+    def releaseInput(self):
+        """
+        Drops stdin and the input file, called when the process has finished or is not started at all.
+        """
+        self._releaseStdin()
+        LocalProcess._closeInput(self._inputFile)
+        self._inputFile = None
+
+    @staticmethod
+    def _closeInput(data):
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+    def _onWakeup(self, now:float):
+        exceeded = None
+        if self._deadline is not None and now >= self._deadline:
+            exceeded = self.WC_LIMIT
+        elif self._nextCpuCheck is not None and now >= self._nextCpuCheck:
+            self._nextCpuCheck = now + self.CPU_POLL_INTERVAL
+            if self._cpuLimit.isExceeded(self._process.pid, cgroup=self._memoryLimit.cgroup if self._memoryLimit else None):
+                exceeded = self.CPU_LIMIT
+        if exceeded:
+            # remember timeout
+            self._isTimeout = True
+            self._exceededLimit = exceeded
+            self._state = self.TIMEOUT
+            self._kill()
+            self._deadline = None
+            self._nextCpuCheck = None
+        if self._killDeadline is not None and now >= self._killDeadline:
+            self._kill()
+            self._killDeadline = None
+
+    def _endSupervision(self):
+        self._stdoutCapture.close()
+        self._stderrCapture.close()
+        return self._stdoutCapture, self._stderrCapture, self._process.returncode
+
+    def _newCapture(self) -> OutputCapture:
+        if self._captureLimit is None:
+            return OutputCapture()
+        return OutputCapture.bounded(self._captureLimit, spill=self._spillOutput)
+
+    def _releaseResources(self):
+        if self._inputFd is not None:
+            os.close(self._inputFd)
+            self._inputFd = None
+        self.releaseInput()
+        if self._memoryLimit:
+            self._memoryLimit.release()
+        if self._coreAllocator and self._cores:
+            self._coreAllocator.release(self._cores)
+
+    def _isStoppedByRlimitCpu(self) -> bool:
+        """
+        Whether the process has been stopped by RLIMIT_CPU, i.e. SIGXCPU at the soft or SIGKILL at the hard limit.
+        """
+        returncode = self._process.returncode
+        if CpuLimit.isRlimitSignal(returncode):
+            return True
+        usage = self.resourceUsage()
+        return returncode == -signal.SIGKILL and not self._isForcedKilled and usage is not None and usage.cpu >= self._cpuLimit.limit
 
     def run(self):
         self.start()
         return self.communicate()
 
+    def runCaptured(self):
+        self.start()
+        return self.communicateCaptured()
+
+    def runSupervised(self, supervisor, *,
+        executor: futures.Executor=None,
+    ) -> futures.Future:
+        """
+        Starts the process and hands it to a ProcessSupervisor instead of waiting for it.
+        :param executor: runs the completion, s.t. it does not stall the loop of the supervisor, None to complete in
+            the thread of the supervisor
+        :return: a future of the OutputCapture of stdout and of stderr and the return code
+        """
+        self.start()
+        if getattr(self, '_process', None) is None:
+            # canceled, terminated or killed before it has been started
+            raise NotYetStartedError()
+        result = futures.Future()
+        result.set_running_or_notify_cancel()
+
+        def finish(supervised):
+            try:
+                self._finishCommunication()
+                result.set_result(supervised.result())
+            except Exception as e:
+                result.set_exception(e)
+
+        def complete(supervised):
+            if executor is None:
+                finish(supervised)
+                return
+            try:
+                executor.submit(finish, supervised)
+            except RuntimeError:
+                # the executor has been shut down
+                finish(supervised)
+        supervisor.supervise(self).add_done_callback(complete)
+        return result
+
     def stateStr(self):
         return '{state} {timer}/{timeout}s'.format(
             state=self._state,
@@ -0,0 +1,155 @@
+import os
+from pathlib import Path
+
+from ..tempFile import TempFileManager
+
+
+class OutputCapture:
+    """
+    Captures a byte stream, e.g. stdout of a process, with bounded memory.
+
+    The first headSize and the last tailSize bytes are kept in memory. Everything in between is either spilled to a
+    temporary file (spill=True) or dropped, in both cases it is counted as omitted. Without limits everything is
+    kept in memory.
+    """
+    def __init__(self, *,
+        headSize: int=None,
+        tailSize: int=None,
+        spill: bool=False,
+    ):
+        self._headSize = headSize
+        self._tailSize = tailSize if tailSize is not None else 0
+        self._spill = spill
+        self._head = bytearray()
+        self._tail = bytearray()
+        self._size = 0
+        self._spilled = 0
+        self._spillFile = None
+
+    @staticmethod
+    def bounded(limit:int, *, spill:bool=False):
+        """
+        A capture keeping at most limit bytes in memory, half of them from the start and half from the end.
+        """
+        return OutputCapture(headSize=limit - limit // 2, tailSize=limit // 2, spill=spill)
+
+    def write(self, data:bytes):
+        self._size += len(data)
+        if self._headSize is None:
+            self._head += data
+            return
+        if len(self._head) < self._headSize:
+            n = self._headSize - len(self._head)
+            self._head += data[:n]
+            data = data[n:]
+        if not data:
+            return
+        self._tail += data
+        # trim lazily, s.t. the tail is not moved for every single write
+        if len(self._tail) > 2 * self._tailSize + 64 * 1024:
+            self._trimTail()
+
+    def _trimTail(self):
+        excess = len(self._tail) - self._tailSize
+        if excess <= 0:
+            return
+        if self._spill:
+            if self._spillFile is None:
+                self._spillFile = TempFileManager.namedFileDescriptor(prefix='tptp-output-')
+            self._spillFile.write(self._tail[:excess])
+            self._spilled += excess
+        del self._tail[:excess]
+
+    def close(self):
+        """
+        Applies the limits to the data captured so far, called when the stream has ended.
+        """
+        if self._headSize is not None:
+            self._trimTail()
+        if self._spillFile:
+            self._spillFile.flush()
+
+    def releaseSpill(self):
+        """
+        Deletes the spill file, the spilled bytes count as dropped afterwards. Called once the whole stream has been
+        copied elsewhere, s.t. a capture which is kept does not keep a file open.
+        """
+        self._spill = False
+        if self._spillFile:
+            self._spillFile.close()
+            self._spillFile = None
+            self._spilled = 0
+
+    @property
+    def size(self) -> int:
+        """
+        Number of bytes of the whole stream.
+        """
+        return self._size
+
+    @property
+    def omitted(self) -> int:
+        """
+        Number of bytes of the stream which are not kept in memory.
+        """
+        return self._size - len(self._head) - len(self._tail)
+
+    @property
+    def spillPath(self) -> Path:
+        """
+        The temporary file holding the omitted bytes, None if nothing has been spilled.
+        The file is deleted with this capture or by releaseSpill().
+        """
+        return Path(self._spillFile.name) if self._spillFile else None
+
+    def bytes(self) -> bytes:
+        """
+        The captured bytes, omitted bytes are replaced by a note how many bytes have been omitted.
+        """
+        if self.omitted == 0:
+            return bytes(self._head) + bytes(self._tail)
+        return bytes(self._head) + '\n... {} bytes omitted ...\n'.format(self.omitted).encode('utf8') + bytes(self._tail)
+
+    def readAll(self) -> bytes:
+        """
+        The whole stream including the spilled bytes, the same as bytes() if bytes have been dropped.
+        """
+        if self._spilled == 0 or self.omitted != self._spilled:
+            return self.bytes()
+        self._spillFile.seek(0)
+        middle = self._spillFile.read()
+        self._spillFile.seek(0, 2)
+        return bytes(self._head) + middle + bytes(self._tail)
+
+    def isAvailable(self, start:int, end:int=None) -> bool:
+        """
+        Whether the bytes [start, end) of the stream are kept, in memory or spilled.
+        """
+        end = self._size if end is None else min(end, self._size)
+        dropped = len(self._head) + self._spilled, self._size - len(self._tail)
+        return start >= end or dropped[0] >= dropped[1] or end <= dropped[0] or start >= dropped[1]
+
+    def chunks(self, start:int=0, end:int=None, *, size:int=1024 * 1024):
+        """
+        Yields the bytes [start, end) of the stream in chunks of at most size bytes, without copying the whole range.
+        :raise ValueError: if a part of the range has been dropped
+        """
+        end = self._size if end is None else min(end, self._size)
+        if not self.isAvailable(start, end):
+            raise ValueError('The bytes {} to {} have not been captured completely.'.format(start, end))
+        headEnd = len(self._head)
+        spillEnd = headEnd + self._spilled
+        tailStart = self._size - len(self._tail)
+        position = start
+        while position < end:
+            if position < headEnd:
+                n = min(end, headEnd, position + size)
+                yield bytes(self._head[position:n])
+            elif position < spillEnd:
+                n = min(end, spillEnd, position + size)
+                self._spillFile.flush()
+                yield os.pread(self._spillFile.fileno(), n - position, position - headEnd)
+            else:
+                n = min(end, position + size)
+                yield bytes(self._tail[position - tailStart:n - tailStart])
+            position = n
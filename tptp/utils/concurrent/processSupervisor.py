@@ -0,0 +1,274 @@
+import collections
+import heapq
+import itertools
+import logging
+import os
+import selectors
+import signal
+import threading
+import time
+from concurrent import futures
+
+logger = logging.getLogger(__name__)
+
+
+# what a registered file of a supervised process is
+_OUTPUT = 'output'
+_INPUT = 'input'
+_EXIT = 'exit'
+
+
+class _Supervised:
+    """
+    A process on the loop of a ProcessSupervisor.
+    """
+    def __init__(self, process, future:futures.Future):
+        self.process = process
+        self.future = future
+        self.openPipes = 2
+        self.pidfd = None
+        # the wakeup of the process which is currently in the deadline heap
+        self.wakeup = None
+        # why the supervision has failed, the killed process is reaped before the future fails
+        self.error = None
+
+
+class ProcessSupervisor:
+    """
+    Watches many started LocalProcesses on a single event loop running in a thread of its own, instead of blocking
+    one thread per process: all pipes and process exits are multiplexed by one selector, all wall clock deadlines,
+    cpu time polls and kill deadlines are kept in a single heap.
+
+    Process exits are watched by pidfds where available (linux 5.3, python 3.9), otherwise a process whose pipes are
+    closed is polled every EXIT_POLL_INTERVAL seconds until it has exited.
+
+    Usage:
+    * supervise(self, process) with a started LocalProcess, returns a future of its output and return code
+    * close(self) to stop the loop, processes still running are killed
+    * LocalProcess.runSupervised(supervisor) and LocalSolverCall.runSupervised(supervisor) wrap supervise(self)
+    """
+    EXIT_POLL_INTERVAL = 0.01
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._deadlines = []
+        self._sequence = itertools.count()
+        self._supervised = set()
+        # processes handed over by other threads, added to the loop by the loop itself
+        self._incoming = collections.deque()
+        self._lock = threading.Lock()
+        self._wakeupRead, self._wakeupWrite = os.pipe()
+        os.set_blocking(self._wakeupWrite, False)
+        self._selector.register(self._wakeupRead, selectors.EVENT_READ)
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name='ProcessSupervisor', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._supervised) + len(self._incoming)
+
+    def supervise(self, process) -> futures.Future:
+        """
+        :param process: a started LocalProcess, it must not be watched by anything else
+        :return: a future of the OutputCapture of stdout and of stderr and the return code of the process
+        """
+        future = futures.Future()
+        future.set_running_or_notify_cancel()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('The supervisor has been closed.')
+            self._incoming.append(_Supervised(process, future))
+        self._wake()
+        return future
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._wake()
+        self._thread.join()
+        os.close(self._wakeupWrite)
+
+    def _wake(self):
+        try:
+            os.write(self._wakeupWrite, b'\0')
+        except BlockingIOError:
+            pass # the loop is already about to wake up
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                closed = self._closed
+            if closed:
+                break
+            self._addIncoming()
+            timeout = None
+            if self._deadlines:
+                timeout = max(0, self._deadlines[0][0] - time.time())
+            for key, events in self._selector.select(timeout):
+                if key.data is None:
+                    os.read(self._wakeupRead, 4096)
+                    continue
+                supervised, kind = key.data
+                self._guarded(supervised, self._onReady, supervised, key.fileobj, kind)
+            self._onDeadlines()
+
+        for supervised in list(self._supervised) + list(self._incoming):
+            self._fail(supervised, RuntimeError('The supervisor has been closed.'))
+            # the loop has stopped, the killed processes are reaped right here
+            try:
+                supervised.process._process.wait()
+            except Exception:
+                pass
+            self._remove(supervised)
+        self._selector.close()
+        os.close(self._wakeupRead)
+
+    def _addIncoming(self):
+        while self._incoming:
+            supervised = self._incoming.popleft()
+            self._guarded(supervised, self._add, supervised)
+
+    def _add(self, supervised:_Supervised):
+        process = supervised.process
+        self._supervised.add(supervised)
+        process._beginSupervision()
+        self._selector.register(process._process.stdout, selectors.EVENT_READ, (supervised, _OUTPUT))
+        self._selector.register(process._process.stderr, selectors.EVENT_READ, (supervised, _OUTPUT))
+        if process._process.stdin is not None:
+            self._selector.register(process._process.stdin, selectors.EVENT_WRITE, (supervised, _INPUT))
+        if hasattr(os, 'pidfd_open'):
+            try:
+                supervised.pidfd = os.pidfd_open(process._process.pid)
+                self._selector.register(supervised.pidfd, selectors.EVENT_READ, (supervised, _EXIT))
+            except OSError:
+                supervised.pidfd = None # e.g. a kernel older than 5.3
+        self._schedule(supervised)
+
+    def _onReady(self, supervised:_Supervised, fileobj, kind:str):
+        process = supervised.process
+        if kind == _INPUT:
+            if process._onWritable():
+                self._selector.unregister(fileobj)
+                fileobj.close()
+            return
+        if kind == _EXIT:
+            self._selector.unregister(fileobj)
+            os.close(fileobj)
+            supervised.pidfd = None
+            self._checkExit(supervised)
+            return
+        data = os.read(fileobj.fileno(), process.READ_SIZE)
+        if not data:
+            self._selector.unregister(fileobj)
+            fileobj.close()
+            supervised.openPipes -= 1
+            self._checkExit(supervised)
+            return
+        process._onOutput(fileobj, data)
+        self._schedule(supervised)
+
+    def _checkExit(self, supervised:_Supervised):
+        """
+        Completes the process if both pipes are closed and it has exited, otherwise waits for the missing event.
+        """
+        if supervised.openPipes > 0:
+            return
+        if not supervised.process._process.reap():
+            # without a pidfd the exit is only noticed by polling
+            self._schedule(supervised)
+            return
+        if supervised.error is not None:
+            self._remove(supervised)
+            return
+        self._complete(supervised, supervised.process._endSupervision())
+
+    def _schedule(self, supervised:_Supervised):
+        wakeup = supervised.process._nextWakeup()
+        if supervised.openPipes == 0 and supervised.pidfd is None:
+            poll = time.time() + self.EXIT_POLL_INTERVAL
+            wakeup = poll if wakeup is None else min(wakeup, poll)
+        if wakeup is None or wakeup == supervised.wakeup:
+            return
+        supervised.wakeup = wakeup
+        heapq.heappush(self._deadlines, (wakeup, next(self._sequence), supervised))
+
+    def _onDeadlines(self):
+        now = time.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            wakeup, _, supervised = heapq.heappop(self._deadlines)
+            # entries are not removed when a wakeup moves, such outdated entries are skipped
+            if supervised not in self._supervised or wakeup != supervised.wakeup:
+                continue
+            supervised.wakeup = None
+            self._guarded(supervised, self._onDeadline, supervised, now)
+
+    def _onDeadline(self, supervised:_Supervised, now:float):
+        if supervised.error is None:
+            supervised.process._onWakeup(now)
+        if supervised.openPipes == 0:
+            self._checkExit(supervised)
+        else:
+            self._schedule(supervised)
+
+    def _guarded(self, supervised:_Supervised, method, *args):
+        """
+        Calls method, a failure of a single process neither stops the loop nor any other process.
+        """
+        try:
+            method(*args)
+        except Exception as e:
+            logger.debug('supervising {} failed: {}'.format(supervised.process, repr(e)))
+            self._fail(supervised, e)
+
+    def _fail(self, supervised:_Supervised, error:Exception):
+        """
+        Kills the process group of a process whose supervision has failed. The future fails once the process has been
+        reaped, which is watched like any other exit, s.t. the loop never blocks.
+        """
+        if supervised.error is not None:
+            # reaping has failed as well
+            self._remove(supervised)
+            return
+        supervised.error = error
+        process = supervised.process._process
+        if process.returncode is None:
+            try:
+                supervised.process._signalGroup(signal.SIGKILL)
+            except Exception:
+                pass
+        for f in [process.stdin, process.stdout, process.stderr]:
+            if f is None or f.closed:
+                continue
+            try:
+                self._selector.unregister(f)
+            except (KeyError, ValueError):
+                pass
+            f.close()
+        supervised.openPipes = 0
+        if supervised in self._supervised:
+            self._guarded(supervised, self._checkExit, supervised)
+
+    def _remove(self, supervised:_Supervised):
+        """
+        Stops watching a process, its future fails if its supervision has failed.
+        """
+        if supervised.pidfd is not None:
+            try:
+                self._selector.unregister(supervised.pidfd)
+            except (KeyError, ValueError):
+                pass
+            os.close(supervised.pidfd)
+            supervised.pidfd = None
+        self._supervised.discard(supervised)
+        if supervised.error is not None and not supervised.future.done():
+            supervised.future.set_exception(supervised.error)
+
+    def _complete(self, supervised:_Supervised, result):
+        stdin = supervised.process._process.stdin
+        if stdin is not None and not stdin.closed:
+            # the process has exited without reading all of its input
+            self._selector.unregister(stdin)
+            stdin.close()
+        # the exit may have been noticed by polling before the pidfd has become readable
+        self._remove(supervised)
+        supervised.future.set_result(result)
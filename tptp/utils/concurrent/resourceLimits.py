@@ -0,0 +1,301 @@
+import itertools
+import logging
+import math
+import os
+import resource
+import signal
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CGROUP_ROOT = Path('/sys/fs/cgroup')
+
+_cgroupParent = None
+_cgroupParentChecked = False
+_cgroupCounter = itertools.count()
+
+# seconds a scan of the cpu time of all process groups is used for, see processGroupCpuTime()
+GROUP_SCAN_INTERVAL = 0.5
+_groupTicks = None
+_groupTicksTime = 0.0
+_groupTicksLock = threading.Lock()
+# whether /proc lists the children of a process, checked on first use
+_hasChildren = None
+
+def delegatedCgroup() -> Path:
+    """
+    The cgroup v2 directory of this process if leaf cgroups with a memory controller can be created in it,
+    None otherwise.
+    """
+    global _cgroupParent, _cgroupParentChecked
+    if _cgroupParentChecked:
+        return _cgroupParent
+    _cgroupParentChecked = True
+    try:
+        with open('/proc/self/cgroup') as f:
+            paths = [l.strip()[3:] for l in f if l.startswith('0::')]
+        if not paths:
+            return None
+        directory = CGROUP_ROOT / paths[0].lstrip('/')
+        controllers = (directory / 'cgroup.subtree_control').read_text().split()
+        if 'memory' in controllers and os.access(str(directory), os.W_OK):
+            _cgroupParent = directory
+    except OSError:
+        pass
+    return _cgroupParent
+
+
+class MemoryLimit:
+    """
+    Caps the memory of a process and all its descendants.
+
+    If this process owns a cgroup v2 with the memory controller enabled for its children, the process is started in
+    a leaf cgroup of its own whose memory.max is the limit. Otherwise the address space (RLIMIT_AS) and data segment
+    (RLIMIT_DATA) of every single process are limited.
+
+    Usage:
+    * prepare() in the parent before the process is started
+    * applyTo(pid) in the parent to a child which has not run its command yet, or applyInChild() in the child before
+      exec (e.g. as part of preexec_fn)
+    * isExceeded() after the process has been reaped
+    * release() after the process has been reaped
+    """
+    def __init__(self, limit:int, *,
+        useCgroup: bool=True,
+    ):
+        """
+        :param limit: in bytes
+        """
+        self._limit = limit
+        self._useCgroup = useCgroup
+        self._cgroup = None
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def cgroup(self) -> Path:
+        """
+        The leaf cgroup of the process, None if the limit is enforced by rlimits.
+        """
+        return self._cgroup
+
+    def prepare(self):
+        parent = delegatedCgroup() if self._useCgroup else None
+        if parent is None:
+            return
+        cgroup = parent / 'tptp-{}-{}'.format(os.getpid(), next(_cgroupCounter))
+        try:
+            cgroup.mkdir()
+            (cgroup / 'memory.max').write_text(str(self._limit))
+            swap = cgroup / 'memory.swap.max'
+            if swap.exists():
+                swap.write_text('0')
+            self._cgroup = cgroup
+        except OSError as e:
+            logger.warning('could not create cgroup {}, falling back to rlimits: {}'.format(cgroup, e))
+            try:
+                cgroup.rmdir()
+            except OSError:
+                pass
+
+    def applyInChild(self):
+        self.applyTo(0)
+
+    def applyTo(self, pid:int):
+        """
+        :param pid: the process, 0 for this process
+        """
+        if self._cgroup is not None:
+            with (self._cgroup / 'cgroup.procs').open('w') as f:
+                f.write(str(pid if pid else os.getpid()))
+            return
+        for r in [resource.RLIMIT_AS, resource.RLIMIT_DATA]:
+            soft, hard = _getrlimit(pid, r)
+            limit = self._limit if hard == resource.RLIM_INFINITY else min(self._limit, hard)
+            _setrlimit(pid, r, (limit, limit))
+
+    def isExceeded(self) -> bool:
+        """
+        Whether a process has been killed for exceeding the limit.
+        Only known for cgroups, since a process exceeding an rlimit just fails to allocate memory.
+        """
+        if self._cgroup is None:
+            return False
+        try:
+            for line in (self._cgroup / 'memory.events').read_text().splitlines():
+                key, value = line.split()
+                if key == 'oom_kill' and int(value) > 0:
+                    return True
+        except (OSError, ValueError):
+            pass
+        return False
+
+    def release(self):
+        if self._cgroup is None:
+            return
+        try:
+            self._cgroup.rmdir()
+        except OSError as e:
+            # a descendant of the process still lives in the cgroup
+            logger.warning('could not remove cgroup {}: {}'.format(self._cgroup, e))
+
+
+def canLimitOtherProcesses() -> bool:
+    """
+    Whether the limits can be applied to a started process by the parent, i.e. prlimit is available (linux).
+    """
+    return hasattr(resource, 'prlimit')
+
+def _getrlimit(pid:int, r:int):
+    return resource.prlimit(pid, r) if pid else resource.getrlimit(r)
+
+def _setrlimit(pid:int, r:int, limits):
+    if pid:
+        resource.prlimit(pid, r, limits)
+    else:
+        resource.setrlimit(r, limits)
+
+
+def _cpuTicks(stat:str) -> int:
+    """
+    utime, stime, cutime and cstime of /proc/<pid>/stat.
+    """
+    # the command name may contain spaces and parentheses, the fields behind it do not
+    fields = stat[stat.rfind(')') + 2:].split()
+    return sum(int(t) for t in fields[11:15])
+
+def processGroupCpuTime(pgid:int) -> float:
+    """
+    Cpu time in seconds used by the living processes of a process group and all descendants they have waited for.
+    None if /proc is not available.
+
+    All processes of the host are read at most once per GROUP_SCAN_INTERVAL for all groups together, s.t. polling
+    many groups does not read /proc once per group.
+    """
+    global _groupTicks, _groupTicksTime
+    with _groupTicksLock:
+        if _groupTicks is None or time.time() - _groupTicksTime >= GROUP_SCAN_INTERVAL:
+            _groupTicks = _scanGroupTicks()
+            _groupTicksTime = time.time()
+        ticks = _groupTicks
+    if ticks is None:
+        return None
+    return ticks.get(pgid, 0) / os.sysconf('SC_CLK_TCK')
+
+def _scanGroupTicks():
+    """
+    The cpu ticks of all process groups of the host by their id, None if /proc is not available.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+    ticks = {}
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open('/proc/{}/stat'.format(pid)) as f:
+                stat = f.read()
+        except OSError:
+            continue # the process has gone
+        pgid = int(stat[stat.rfind(')') + 2:].split()[2])
+        ticks[pgid] = ticks.get(pgid, 0) + _cpuTicks(stat)
+    return ticks
+
+def processTreeCpuTime(pid:int) -> float:
+    """
+    Cpu time in seconds used by a process, its living descendants and all descendants they have waited for.
+    Only the processes of the tree are read, falls back to processGroupCpuTime() of the process as group leader if
+    /proc does not list the children of a process (CONFIG_PROC_CHILDREN).
+    """
+    global _hasChildren
+    if _hasChildren is None:
+        _hasChildren = os.path.exists('/proc/self/task/{}/children'.format(os.getpid()))
+    if not _hasChildren:
+        return processGroupCpuTime(pid)
+    ticks = 0
+    pending = [pid]
+    while pending:
+        p = pending.pop()
+        try:
+            with open('/proc/{}/stat'.format(p)) as f:
+                ticks += _cpuTicks(f.read())
+            for tid in os.listdir('/proc/{}/task'.format(p)):
+                with open('/proc/{}/task/{}/children'.format(p, tid)) as f:
+                    pending.extend(int(c) for c in f.read().split())
+        except OSError:
+            continue # the process or thread has gone
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+def cgroupCpuTime(cgroup:Path) -> float:
+    """
+    Cpu time in seconds used by all processes which have been part of a cgroup (v2), None if it is not known.
+    """
+    try:
+        for line in (cgroup / 'cpu.stat').read_text().splitlines():
+            key, value = line.split()
+            if key == 'usage_usec':
+                return int(value) / 1000000
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class CpuLimit:
+    """
+    Limits the cpu time of a process group.
+
+    Every process of the group is limited by RLIMIT_CPU, on top the cpu time of the whole group can be polled,
+    s.t. a solver cannot multiply its limit by running several processes or threads.
+
+    Usage:
+    * applyTo(pid) in the parent to a child which has not run its command yet, or applyInChild() in the child before
+      exec (e.g. as part of preexec_fn)
+    * isExceeded(pid) while the process is running
+    * isRlimitSignal(returnCode) after the process has been reaped
+    """
+    def __init__(self, limit:float):
+        """
+        :param limit: in seconds
+        """
+        self._limit = limit
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    def applyInChild(self):
+        self.applyTo(0)
+
+    def applyTo(self, pid:int):
+        """
+        :param pid: the process, 0 for this process
+        """
+        soft, hard = _getrlimit(pid, resource.RLIMIT_CPU)
+        # SIGXCPU at the limit, SIGKILL a second later if the process ignores it
+        limit = int(math.ceil(self._limit))
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        _setrlimit(pid, resource.RLIMIT_CPU, (limit, limit + 1 if hard == resource.RLIM_INFINITY else hard))
+
+    def isExceeded(self, pid:int, *,
+        cgroup: Path=None,
+    ) -> bool:
+        """
+        :param pid: the process, its descendants count as well
+        :param cgroup: the leaf cgroup of the process, e.g. of its MemoryLimit, None if it has none
+        """
+        cpu = cgroupCpuTime(cgroup) if cgroup is not None else None
+        if cpu is None:
+            cpu = processTreeCpuTime(pid)
+        return cpu is not None and cpu >= self._limit
+
+    @staticmethod
+    def isRlimitSignal(returnCode:int) -> bool:
+        """
+        Whether the return code tells that the process (or the shell running it) has been stopped by RLIMIT_CPU.
+        """
+        return returnCode in [-signal.SIGXCPU, 128 + signal.SIGXCPU]
@@ -2,6 +2,7 @@ import logging
 
 import collections
 import subprocess
+import time
 from concurrent import futures 
 
 logger = logging.getLogger(__name__)
@@ -21,6 +22,11 @@ class ThreadedTaskExecuter:
       - allows submitting a task using self.submit(task) inside this function call
     * onError(self, error) needs to be overloaded
       - is called iff the task run method has thrown an exception
+    * onTick(self) may be overloaded
+      - is called every tickInterval seconds while waiting, if tickInterval is not None
+    * with a supervisor, tasks having a "runSupervised(supervisor, executor=...)" method returning a future are run
+      by it instead of a thread, s.t. waiting for a process does not block a thread, only their completion runs on
+      a thread of the pool
     
     Behaviour:
     * all callbacks will be call in the same thread as 'wait(self)' is called
@@ -41,12 +47,21 @@ class ThreadedTaskExecuter:
     '''
 
     def __init__(self, *, 
-        threads=2
+        threads=2,
+        tickInterval=None,
+        supervisor=None,
     ):
+        '''
+        :param threads: maximum number of tasks executed at the same time, supervised tasks included
+        :param supervisor: ProcessSupervisor running tasks which support it, None to run all tasks in threads
+        '''
+        # threads of the pool are only created for tasks which are not supervised
         self.executor = futures.ThreadPoolExecutor(max_workers=threads)
         self._scheduledTasks = collections.deque()
         self._activeFutures = set()
         self._threads = threads
+        self._tickInterval = tickInterval
+        self._supervisor = supervisor
 
     def scheduled(self):
         '''
@@ -99,7 +114,10 @@ class ThreadedTaskExecuter:
         for i in range(0, numToAdd):
             task = self._scheduledTasks.popleft()
 
-            future = self.executor.submit(task.run)
+            if self._supervisor is not None and hasattr(task, 'runSupervised'):
+                future = task.runSupervised(self._supervisor, executor=self.executor)
+            else:
+                future = self.executor.submit(task.run)
             future.task = task
             task.future = future
             self._activeFutures.add(future)
@@ -109,11 +127,17 @@ class ThreadedTaskExecuter:
         '''
         Wait for all tasks to be finished.
         '''
+        lastTick = time.time()
         while len(self._scheduledTasks) + len(self._activeFutures) > 0:
             done, not_done = futures.wait(self._activeFutures, 
+                timeout=None if self._tickInterval is None else max(0, lastTick + self._tickInterval - time.time()),
                 return_when=futures.FIRST_COMPLETED
             )
 
+            if self._tickInterval is not None and time.time() - lastTick >= self._tickInterval:
+                lastTick = time.time()
+                self.onTick()
+
             for future in done:
                 self._activeFutures.remove(future)
                 self._onFinish(future)
@@ -139,6 +163,9 @@ class ThreadedTaskExecuter:
     def onStart(self, task):
         raise NotImplementedError()
 
+    def onTick(self):
+        pass
+
     def onFinish(self, task, result):
         raise NotImplementedError()
 
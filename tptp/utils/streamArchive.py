@@ -0,0 +1,202 @@
+"""
+An append-only, compressed container for many small outputs, e.g. stdout and stderr of solver calls.
+
+Layout of an archive file:
+  record*
+  record := header name data
+  header := magic (4 bytes) length of name (uint32, big endian) length of data (uint32, big endian)
+  name   := utf8 encoded entry name
+  data   := zlib compressed entry content
+
+The index file next to the archive (archive path + '.idx') holds one JSON object per record
+{"name": ..., "offset": ..., "length": ...}, where offset points to the header of the record and length is the
+length of the compressed data. The index only speeds up opening an archive, it can always be rebuilt from the archive.
+"""
+
+import json
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+MAGIC = b'TPA1'
+_HEADER = struct.Struct('>4sII')
+
+class InvalidArchiveError(Exception):
+    pass
+
+def indexPath(path:Path) -> Path:
+    return Path(str(path) + '.idx')
+
+def _validEnd(path:Path) -> int:
+    """
+    Offset behind the last complete record.
+    """
+    size = path.stat().st_size
+    offset = 0
+    with path.open('rb') as f:
+        while offset + _HEADER.size <= size:
+            magic, nameLength, dataLength = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or offset + _HEADER.size + nameLength + dataLength > size:
+                break
+            f.seek(nameLength + dataLength, 1)
+            offset += _HEADER.size + nameLength + dataLength
+    return offset
+
+def _truncateIndex(path:Path, end:int):
+    """
+    Drops all index lines of records behind end.
+    """
+    index = indexPath(path)
+    if not index.exists():
+        return
+    lines = []
+    with index.open('r') as f:
+        for line in f:
+            try:
+                if json.loads(line)['offset'] < end:
+                    lines.append(line)
+            except ValueError:
+                break
+    index.write_text(''.join(lines))
+
+class StreamArchiveWriter:
+    """
+    Appends compressed entries to an archive. Entries can be added to an existing archive;
+    an entry added under an existing name shadows the older one.
+    Methods may be called from different threads.
+    """
+    def __init__(self, path:Path, *,
+        compressionLevel: int=6,
+    ):
+        self._path = Path(path)
+        self._compressionLevel = compressionLevel
+        self._lock = threading.Lock()
+        if self._path.exists():
+            # cut off a record torn by a crash, otherwise it would swallow the records appended after it
+            end = _validEnd(self._path)
+            if end != self._path.stat().st_size:
+                with self._path.open('r+b') as f:
+                    f.truncate(end)
+                _truncateIndex(self._path, end)
+        self._archive = self._path.open('ab')
+        self._index = indexPath(self._path).open('a')
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def add(self, name:str, content):
+        """
+        Adds an entry.
+        :param content: str (stored utf8 encoded) or bytes
+        """
+        if isinstance(content, str):
+            content = content.encode('utf8')
+        encodedName = name.encode('utf8')
+        data = zlib.compress(content, self._compressionLevel)
+        with self._lock:
+            offset = self._archive.tell()
+            self._archive.write(_HEADER.pack(MAGIC, len(encodedName), len(data)))
+            self._archive.write(encodedName)
+            self._archive.write(data)
+            self._archive.flush()
+            self._index.write(json.dumps({'name': name, 'offset': offset, 'length': len(data)}) + '\n')
+            self._index.flush()
+
+    def close(self):
+        with self._lock:
+            self._archive.close()
+            self._index.close()
+
+class StreamArchiveReader:
+    """
+    Random access to the entries of an archive without unpacking any other entry.
+    """
+    def __init__(self, path:Path):
+        self._path = Path(path)
+        if not self._path.exists():
+            raise InvalidArchiveError('{} does not exist.'.format(self._path))
+        self._entries = self._readIndex()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _readIndex(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Reads the index file, rebuilds the index if the index file is missing or does not cover the whole archive.
+        """
+        entries = {}
+        try:
+            with indexPath(self._path).open('r') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    e = json.loads(line)
+                    entries[e['name']] = (e['offset'], e['length'])
+        except (OSError, ValueError):
+            return self._scan(0, {})
+        if not entries:
+            return self._scan(0, {})
+        # records appended after the last indexed one, e.g. if writing the index was interrupted
+        offset, length = max(entries.values())
+        name = self._readHeader(offset)[0]
+        return self._scan(offset + _HEADER.size + len(name.encode('utf8')) + length, entries)
+
+    def _readHeader(self, offset:int):
+        with self._path.open('rb') as f:
+            f.seek(offset)
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                raise InvalidArchiveError('Truncated record at {}.'.format(offset))
+            magic, nameLength, dataLength = _HEADER.unpack(header)
+            if magic != MAGIC:
+                raise InvalidArchiveError('No record at {}.'.format(offset))
+            return f.read(nameLength).decode('utf8'), dataLength
+
+    def _scan(self, offset:int, entries:Dict[str, Tuple[int, int]]) -> Dict[str, Tuple[int, int]]:
+        """
+        Indexes all records starting at offset. A truncated last record is ignored.
+        """
+        size = self._path.stat().st_size
+        with self._path.open('rb') as f:
+            f.seek(offset)
+            while offset + _HEADER.size <= size:
+                magic, nameLength, dataLength = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != MAGIC:
+                    raise InvalidArchiveError('No record at {}.'.format(offset))
+                if offset + _HEADER.size + nameLength + dataLength > size:
+                    break
+                name = f.read(nameLength).decode('utf8')
+                entries[name] = (offset, dataLength)
+                f.seek(dataLength, 1)
+                offset += _HEADER.size + nameLength + dataLength
+        return entries
+
+    def names(self) -> List[str]:
+        return sorted(self._entries.keys())
+
+    def __contains__(self, name:str) -> bool:
+        return name in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def read(self, name:str) -> bytes:
+        """
+        The content of an entry.
+        :raise: KeyError if there is no such entry
+        """
+        offset, length = self._entries[name]
+        with self._path.open('rb') as f:
+            f.seek(offset)
+            magic, nameLength, dataLength = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC or dataLength != length:
+                raise InvalidArchiveError('Index does not match record at {}.'.format(offset))
+            f.seek(nameLength, 1)
+            return zlib.decompress(f.read(dataLength))
+
+    def readText(self, name:str) -> str:
+        return self.read(name).decode('utf8', errors='replace')
@@ -1,8 +1,141 @@
+import atexit
+import hashlib
+import logging
+import os
+import shutil
 import tempfile
+import threading
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+# memory backed directories preferred for short lived files, in this order
+TMPFS_DIRS = [Path('/dev/shm')]
+# overrides the directory of the scratch area
+SCRATCH_DIR_ENV = 'TPTP_SCRATCH_DIR'
+
+
+class ScratchArea:
+    """
+    A private directory for temporary files which are shared by several users, e.g. an encoded problem passed to
+    several solver calls. It prefers a tmpfs, s.t. the files never hit the disk.
+
+    Files are addressed by their content and reference counted: acquiring the same content again returns the same
+    file, a file is removed when its last user has released it. Files exceeding the maxSize of the area go to the
+    disk backed temporary directory instead. Everything left is removed by cleanup(), at the latest at exit.
+    """
+    def __init__(self, *,
+        directory: Path=None,
+        maxSize: int=None,
+    ):
+        """
+        :param directory: where the area is created, by default $TPTP_SCRATCH_DIR, a tmpfs or the temporary directory
+        :param maxSize: bytes of all files of the area, None for no limit
+        """
+        self._parent = Path(directory) if directory else ScratchArea.defaultDirectory()
+        self._maxSize = maxSize
+        self._directory = None
+        self._overflowDirectory = None
+        self._size = 0
+        # digest -> [path, references, size in the area (0 if overflown)]
+        self._files = {}
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def defaultDirectory() -> Path:
+        if os.environ.get(SCRATCH_DIR_ENV):
+            return Path(os.environ[SCRATCH_DIR_ENV])
+        for d in TMPFS_DIRS:
+            if d.is_dir() and os.access(str(d), os.W_OK | os.X_OK):
+                return d
+        return Path(tempfile.gettempdir())
+
+    @property
+    def directory(self) -> Path:
+        """
+        The private directory of the area, None until the first file has been acquired.
+        """
+        return self._directory
+
+    @property
+    def size(self) -> int:
+        """
+        Bytes of the files in the area, without the files which have overflown to the temporary directory.
+        """
+        return self._size
+
+    def __len__(self):
+        return len(self._files)
+
+    def acquire(self, content:str, *, suffix:str='') -> Path:
+        """
+        A file with the given content, shared with all other users acquiring the same content.
+        Has to be released by release(path) when it is not used any more.
+        """
+        data = content.encode('utf8')
+        digest = hashlib.sha1(data).hexdigest()
+        with self._lock:
+            entry = self._files.get(digest)
+            if entry:
+                entry[1] += 1
+                return entry[0]
+            inArea = self._maxSize is None or self._size + len(data) <= self._maxSize
+            directory = self._areaDirectory() if inArea else self._overflow()
+            path = directory / (digest + suffix)
+            path.write_bytes(data)
+            self._files[digest] = [path, 1, len(data) if inArea else 0]
+            self._paths[path] = digest
+            self._size += self._files[digest][2]
+            return path
+
+    def release(self, path:Path):
+        with self._lock:
+            digest = self._paths.get(Path(path))
+            if digest is None:
+                return
+            entry = self._files[digest]
+            entry[1] -= 1
+            if entry[1] > 0:
+                return
+            del self._files[digest]
+            del self._paths[entry[0]]
+            self._size -= entry[2]
+            try:
+                entry[0].unlink()
+            except OSError as e:
+                logger.warning('could not remove {}: {}'.format(entry[0], e))
+
+    def cleanup(self):
+        """
+        Removes all files of the area, regardless of their references.
+        """
+        with self._lock:
+            for d in [self._directory, self._overflowDirectory]:
+                if d is not None:
+                    shutil.rmtree(str(d), ignore_errors=True)
+            self._directory = None
+            self._overflowDirectory = None
+            self._files = {}
+            self._paths = {}
+            self._size = 0
+
+    def _areaDirectory(self) -> Path:
+        if self._directory is None:
+            self._directory = Path(tempfile.mkdtemp(prefix='tptp-scratch-', dir=str(self._parent)))
+        return self._directory
+
+    def _overflow(self) -> Path:
+        if self._overflowDirectory is None:
+            self._overflowDirectory = Path(tempfile.mkdtemp(prefix='tptp-scratch-'))
+            logger.warning('the scratch area {} is full ({} bytes), further files go to {}'.format(
+                self._directory, self._maxSize, self._overflowDirectory,
+            ))
+        return self._overflowDirectory
+
 
 class TempFileManager():
+    _scratchArea = None
 
     @staticmethod
     def namedFileDescriptor(
@@ -22,3 +155,30 @@ class TempFileManager():
         tempfile.close()
         return Path(tempfile.name)
 
+    @staticmethod
+    def scratchArea() -> ScratchArea:
+        """
+        The scratch area of this process, removed at exit.
+        """
+        if TempFileManager._scratchArea is None:
+            TempFileManager.configureScratchArea()
+        return TempFileManager._scratchArea
+
+    @staticmethod
+    def configureScratchArea(*,
+        directory: Path=None,
+        maxSize: int=None,
+    ) -> ScratchArea:
+        """
+        Replaces the scratch area of this process, see ScratchArea for the parameters.
+        """
+        if TempFileManager._scratchArea is not None:
+            TempFileManager._scratchArea.cleanup()
+        TempFileManager._scratchArea = ScratchArea(directory=directory, maxSize=maxSize)
+        return TempFileManager._scratchArea
+
+
+@atexit.register
+def _cleanupScratchArea():
+    if TempFileManager._scratchArea is not None:
+        TempFileManager._scratchArea.cleanup()